@@ -149,9 +149,10 @@ impl eframe::App for PaperclipAdjacent {
                         if let Some(index) = to_delete {
                             // get the mem_id before removing
                             if let Some(mem_id) = self.memcells[index].id {
+                                let phone = clean_phone_number(&self.phone);
                                 // fire-and-forget HTTP delete call
                                 tokio::spawn(async move {
-                                    if let Err(err) = delete_memcell(mem_id as i32).await {
+                                    if let Err(err) = delete_memcell(mem_id as i32, &phone).await {
                                         eprintln!("Failed to delete memcell {}: {}", mem_id, err);
                                     }
                                 });
@@ -203,6 +204,7 @@ impl eframe::App for PaperclipAdjacent {
 
                     ui.vertical_centered(|ui| {
                         if let Some(index) = self.selected_memcell {
+                            let phone = clean_phone_number(&self.phone);
                             let cell = &mut self.memcells[index];
                             let response = ui.add(
                                 egui::TextEdit::multiline(&mut cell.task)
@@ -216,7 +218,7 @@ impl eframe::App for PaperclipAdjacent {
                                 if let Some(mem_id) = cell.id {
                                     let task_clone = cell.task.clone();
                                     tokio::spawn(async move {
-                                        if let Err(err) = update_memcell(mem_id, &task_clone).await {
+                                        if let Err(err) = update_memcell(mem_id, &phone, &task_clone).await {
                                             eprintln!("Failed to update memcell {}: {}", mem_id, err);
                                         }
                                     });
@@ -41,12 +41,14 @@ pub async fn create_memcell(phone: &str, task: &str) -> Result<(), reqwest::Erro
 }
 
 
-pub async fn delete_memcell(mem_id: i32) -> Result<(), reqwest::Error> {
+// memcell IDs are only unique per owner, so the owner's phone goes along
+pub async fn delete_memcell(mem_id: i32, phone: &str) -> Result<(), reqwest::Error> {
     let url = format!("http://localhost:5000/memcells/{}", mem_id);
     let client = reqwest::Client::new();
 
     let res = client
         .delete(&url)
+        .query(&[("phone", phone)])
         .send()
         .await?
         .json::<serde_json::Value>()
@@ -56,13 +58,14 @@ pub async fn delete_memcell(mem_id: i32) -> Result<(), reqwest::Error> {
     Ok(())
 }
 
-pub async fn update_memcell(mem_id: u32, task: &str) -> Result<(), reqwest::Error> {
+pub async fn update_memcell(mem_id: u32, phone: &str, task: &str) -> Result<(), reqwest::Error> {
     let url = format!("http://localhost:5000/memcells/{}", mem_id);
     let payload = serde_json::json!({ "task": task });
 
     let client = reqwest::Client::new();
     let res = client
         .put(&url)
+        .query(&[("phone", phone)])
         .json(&payload)
         .send()
         .await?
@@ -78,5 +81,5 @@ pub async fn update_memcell(mem_id: u32, task: &str) -> Result<(), reqwest::Erro
 async fn main() {
     get_all_memcells().await.unwrap();
     create_memcell("1234567890", "Feed dog").await.unwrap();
-    delete_memcell(3).await.unwrap();
+    delete_memcell(3, "1234567890").await.unwrap();
 }
@@ -1,8 +1,8 @@
 import argparse
-from .config import app, IP, PORT, EMAIL, PW, PHONE, PORT, TABLE
+from .config import app, db, IP, PORT, EMAIL, PW, PHONE, PORT, TABLE
 from . import routes
 from .utils.debuggernaut import heimdahl
-from .controllers import Mailman
+from .controllers import Mailman, Scheduler
 import threading
 import os
 
@@ -18,4 +18,6 @@ if __name__ == '__main__':
     if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
         mailman = Mailman(EMAIL, PW, PHONE, IP, PORT, TABLE)
         threading.Thread(target = mailman.start, daemon = True).start()
+        scheduler = Scheduler(db, mailman.o)
+        threading.Thread(target = scheduler.run, daemon = True).start()
     main()
\ No newline at end of file
@@ -1,8 +1,9 @@
 from flask import Flask
 from flask_cors import CORS
 from .utils import GoodDog as dog
-from .models.db import Yamel
+from .models.db import Registry
 from pathlib import Path
+from os import getenv
 
 try:
     EMAIL, PW, PHONE, IP, PORT, TABLE, PATH = dog.fetch(
@@ -22,7 +23,16 @@ except FileNotFoundError:
         
     
 PATH = dog.where_is_it_boy(PATH)
-db = Yamel(path = PATH, tb = TABLE)
+ENGINE = getenv('DB_ENGINE') or 'yaml'
+CODEC = getenv('DB_CODEC') or None
+LOCK = (getenv('DB_LOCK') or '').lower() in ('1', 'true', 'yes')
+CAPACITY = int(getenv('DB_CAPACITY') or 0) or None
+CACHE = (getenv('DB_CACHE') or '1').lower() not in ('0', 'false', 'no')
+HANDLES = int(getenv('DB_HANDLES') or 0) or None
+IDLE = float(getenv('DB_IDLE') or 0) or None
+registry = Registry(handles = HANDLES, idle = IDLE, engine = ENGINE, codec = CODEC, lock = LOCK, capacity = CAPACITY, cache = CACHE)
+# the configured table stays leased for the life of the process (SMS, reminders)
+db = registry.open(PATH, TABLE)
 app = Flask(__name__)
 app.config['JSONIFY_PRETTYPRINT_REGULAR'] = False
 app.config['JSON_AS_ASCII'] = False
@@ -1,2 +1,3 @@
 from .mailman import Mailman
-__all__ = ['Mailman']
\ No newline at end of file
+from .scheduler import Scheduler
+__all__ = ['Mailman', 'Scheduler']
\ No newline at end of file
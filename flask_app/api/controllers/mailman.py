@@ -9,7 +9,9 @@ class Mailman(metaclass = Highlander):
         'new', 
         'all', 
         'help',
-        'del'
+        'del',
+        'find',
+        'count'
     }
 
     @laufeyspawn(summoned = True)
@@ -57,14 +59,14 @@ class Mailman(metaclass = Highlander):
                 return self.o.new_memcell(reply)
 
             case 'all':
-                response = requests.get(self._URL)
+                response = requests.get(self._URL, params = {'phone': self._phone})
                 reply = response.json()
                 heimdahl(f'[STATUS] {response.status_code}', unveil = jotunbane, threat = 1)
                 heimdahl(f'{reply}', unveil = jotunbane, threat = 1)
                 return self.o.all_memcells(reply)
             
             case 'del':
-                response = requests.delete(self._URL + f'/{content}')
+                response = requests.delete(self._URL + f'/{content}', params = {'phone': self._phone})
                 try:
                     reply = response.json()
                 except:
@@ -73,6 +75,20 @@ class Mailman(metaclass = Highlander):
                 heimdahl(f'{reply}', unveil = jotunbane, threat = 1)
                 return self.o.del_memcell(reply)
 
+            case 'find':
+                response = requests.get(self._URL + '/search', params = {'q': content or '', 'phone': self._phone})
+                reply = response.json()
+                heimdahl(f'[STATUS] {response.status_code}', unveil = jotunbane, threat = 1)
+                heimdahl(f'{reply}', unveil = jotunbane, threat = 1)
+                return self.o.found_memcells(reply)
+
+            case 'count':
+                response = requests.get(self._URL + '/stats', params = {'phone': self._phone})
+                reply = response.json()
+                heimdahl(f'[STATUS] {response.status_code}', unveil = jotunbane, threat = 1)
+                heimdahl(f'{reply}', unveil = jotunbane, threat = 1)
+                return self.o.count_memcells(reply)
+
             case 'help':
                 return self.o.help()
             
@@ -0,0 +1,210 @@
+import time
+import heapq
+import threading
+from typing import Callable
+from api.models import Yamel, Smtp
+from api.utils.debuggernaut import heimdahl, laufeyspawn, jotunbane
+
+
+class Scheduler:
+    '''
+    Texts a reminder through `Smtp` when a memcell's `due` time arrives.
+
+    Pending reminders sit in a min-heap keyed by due time, so finding the next
+    one is O(1) and scheduling is O(log n). The heap is built from the store
+    once, then kept in step with `Yamel` through its change feed: inserts and
+    updates push a fresh entry, deletes retire the live one. Retired entries
+    stay in the heap and are skipped when they surface (lazy deletion), so no
+    write ever scans the heap or the table.
+
+    A reminder fires once: its `due` is then cleared on the record. If the
+    text cannot be sent, `due` is kept and the reminder is tried again
+    `RETRY` seconds later. Records marked 'done' are not reminded.
+    '''
+    __slots__ = ['_db', '_smtp', '_clock', '_heap', '_live', '_seq', '_sub']
+
+    MAX_WAIT = 60.0 # longest sleep between checks (seconds)
+    RETRY = 60.0 # seconds before a reminder that failed to send is retried
+
+    def __init__(self, db: Yamel, smtp: Smtp, /, *, clock: Callable[[], float] = time.time):
+        '''
+        Parameters:
+        ----------
+        db : Yamel
+            Store the memcells live in.
+
+        smtp : Smtp
+            Outgoing channel for the reminders.
+
+        clock : Callable, optional
+            Current Unix time (injectable for tests).
+        '''
+        self._db = db
+        self._smtp = smtp
+        self._clock = clock
+        self._heap = []
+        self._live = {}
+        self._seq = 0
+        self._sub = None
+
+    # --- SCHEDULE ---
+
+    @laufeyspawn(summoned = False)
+    def rebuild(self) -> None:
+        '''
+        Reload every pending reminder from the store (startup, or after the
+        change feed lost track).
+        '''
+        if self._sub is not None:
+            self._sub.close()
+        # subscribe before reading, so no change slips in between
+        self._sub = self._db.subscribe()
+        self._heap.clear()
+        self._live.clear()
+        for cell in self._db.all:
+            self.schedule(cell)
+        heimdahl(f'[REMINDERS] {len(self._live)} pending', unveil = jotunbane, threat = 1)
+
+    def schedule(self, cell: dict[str, object]) -> None:
+        '''
+        (Re)schedule the reminder for a memcell, or drop it if it has none.
+
+        Parameters:
+        ----------
+        cell : dict
+            Memcell in its current state.
+        '''
+        key = (cell['phone'], cell['id'])
+        due = cell.get('due')
+        if due is None or cell.get('status') == 'done':
+            self._live.pop(key, None)
+            return
+
+        self._push(due, key, due)
+
+    def _push(self, at: float, key: tuple[str, int], due: float) -> None:
+        '''
+        Queue the live reminder for `key` to fire at `at` for the record's `due`.
+        '''
+        self._seq += 1
+        self._live[key] = self._seq
+        heapq.heappush(self._heap, (at, self._seq, key, due))
+        if len(self._heap) > 2 * len(self._live) + 64:
+            # too many retired entries: keep only the live ones
+            self._heap = [entry for entry in self._heap if self._live.get(entry[2]) == entry[1]]
+            heapq.heapify(self._heap)
+
+    def cancel(self, phone: str, mem_id: int) -> None:
+        '''
+        Drop the reminder for a memcell (no-op if none is pending).
+
+        Parameters:
+        ----------
+        phone : str
+            Owner of the memcell.
+
+        mem_id : int
+            Owner-scoped memcell ID.
+        '''
+        self._live.pop((phone, mem_id), None)
+
+    @property
+    def next_due(self) -> float | None:
+        '''
+        Time the earliest pending reminder fires (its due time, or its
+        retry time after a failed send).
+
+        Returns:
+        -------
+        float | None
+            Unix timestamp, or None if nothing is pending.
+        '''
+        heap = self._heap
+        while heap and self._live.get(heap[0][2]) != heap[0][1]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def __len__(self) -> int:
+        '''
+        Number of pending reminders.
+        '''
+        return len(self._live)
+
+    # --- FIRING ---
+
+    def _follow(self, event) -> None:
+        '''
+        Apply one change-feed event to the schedule.
+        '''
+        match event.kind:
+            case 'insert' | 'update':
+                self.schedule(event.cell)
+            case 'delete':
+                self.cancel(event.cell['phone'], event.cell['id'])
+            case 'reset':
+                self.rebuild()
+
+    def _catch_up(self) -> None:
+        '''
+        Apply every queued change-feed event without blocking.
+        '''
+        if self._sub is None or not self._sub.alive:
+            return self.rebuild()
+        while (event := self._sub.get(timeout = 0)) is not None:
+            self._follow(event)
+
+    @laufeyspawn(summoned = False)
+    def tick(self) -> list[dict[str, object]]:
+        '''
+        Send every reminder that is due now.
+
+        Returns:
+        -------
+        list
+            Memcells reminded, in due order.
+        '''
+        self._catch_up()
+        now = self._clock()
+        fired = []
+        while (at := self.next_due) is not None and at <= now:
+            _, _, key, due = heapq.heappop(self._heap)
+            del self._live[key]
+            phone, mem_id = key
+
+            # the record may have moved (new ID or owner) since it was scheduled
+            cell = next(iter(self._db.where({'id': mem_id, 'phone': phone})), None)
+            if cell is None or cell.get('due') != due or cell['status'] == 'done':
+                continue
+            if not self._smtp.reminder(cell):
+                # keep `due` on the record and try again later
+                self._push(now + self.__class__.RETRY, key, due)
+                heimdahl(f'[REMINDER FAILED] {phone}: {mem_id}', unveil = True, threat = 3)
+                continue
+            self._db.update({'due': None}, {'id': mem_id, 'phone': phone})
+            fired.append(dict(cell))
+            heimdahl(f'[REMINDER SENT] {phone}: {mem_id}', unveil = jotunbane, threat = 1)
+        return fired
+
+    @laufeyspawn(summoned = True)
+    def run(self, stop: threading.Event | None = None) -> None:
+        '''
+        Fire reminders until `stop` is set, sleeping until the next one is
+        due or a change arrives.
+
+        Parameters:
+        ----------
+        stop : threading.Event, optional
+            Set to end the loop.
+        '''
+        stop = stop or threading.Event()
+        self.rebuild()
+        while not stop.is_set():
+            self.tick()
+            due = self.next_due
+            wait = self.__class__.MAX_WAIT if due is None else due - self._clock()
+            event = self._sub.get(timeout = min(max(wait, 0), self.__class__.MAX_WAIT))
+            if event is not None:
+                self._follow(event)
+
+
+__all__ = ['Scheduler']
@@ -1,4 +1,4 @@
-from .db import Yamel
+from .db import Yamel, AsyncYamel, Registry
 from .email import Imap, Smtp
 
-__all__ = ['Yamel', 'Imap', 'Smtp']
\ No newline at end of file
+__all__ = ['Yamel', 'AsyncYamel', 'Registry', 'Imap', 'Smtp']
\ No newline at end of file
@@ -1,4 +1,6 @@
 from .yamel import Yamel
+from .ayamel import AsyncYamel
+from .registry import Registry
 
-__all__ = ['Yamel']
+__all__ = ['Yamel', 'AsyncYamel', 'Registry']
 
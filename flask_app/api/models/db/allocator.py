@@ -0,0 +1,104 @@
+import heapq
+from typing import Iterable
+
+class IdAllocator:
+    '''
+    Lowest-free-ID allocator backed by a min-heap of reclaimed IDs.
+
+    IDs below the high-water mark that are not in use sit in the heap; IDs at
+    or above it are handed out by bumping the mark. Memory is proportional to
+    the number of holes, not the capacity, so capacities in the millions cost
+    nothing until they are used.
+    '''
+    __slots__ = ['_free', '_holes', '_next', '_capacity']
+
+    def __init__(self, used: Iterable[int] = (), capacity: int = 10) -> None:
+        '''
+        Rebuild the allocator from the IDs currently in use.
+
+        Parameters:
+        ----------
+        used : Iterable[int]
+            IDs already taken.
+
+        capacity : int
+            Largest ID that may be handed out.
+        '''
+        self._capacity = capacity
+        used = {i for i in used if isinstance(i, int) and 1 <= i <= capacity}
+        top = max(used, default = 0)
+
+        # range() is already ascending, which is a valid heap
+        self._free = [i for i in range(1, top) if i not in used]
+        self._holes = set(self._free)
+        self._next = top + 1
+
+    @property
+    def capacity(self) -> int:
+        '''
+        Largest ID that may be handed out.
+
+        Returns:
+        -------
+        int
+            Configured capacity.
+        '''
+        return self._capacity
+
+    @property
+    def used(self) -> int:
+        '''
+        Number of IDs currently handed out (O(1), no scan).
+
+        Returns:
+        -------
+        int
+            IDs in use within the capacity.
+        '''
+        return min(self._next - 1, self._capacity) - len(self._holes)
+
+    def allocate(self) -> int:
+        '''
+        Take the lowest free ID in O(log n).
+
+        Returns:
+        -------
+        int
+            Allocated ID, or -1 when the pool is exhausted.
+        '''
+        if self._free:
+            i = heapq.heappop(self._free)
+            self._holes.discard(i)
+            return i
+        if self._next <= self._capacity:
+            self._next += 1
+            return self._next - 1
+        return -1
+
+    def release(self, i: int) -> None:
+        '''
+        Return an ID to the pool in O(log n).
+
+        Parameters:
+        ----------
+        i : int
+            Previously allocated ID.
+        '''
+        if not isinstance(i, int) or not 1 <= i < self._next or i in self._holes:
+            return
+        heapq.heappush(self._free, i)
+        self._holes.add(i)
+
+    def __len__(self) -> int:
+        '''
+        Number of IDs still available.
+        '''
+        return len(self._free) + self._capacity - self._next + 1
+
+    def __contains__(self, i: int) -> bool:
+        '''
+        Whether `i` is currently free.
+        '''
+        return i in self._holes or self._next <= i <= self._capacity
+
+__all__ = ['IdAllocator']
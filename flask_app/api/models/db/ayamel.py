@@ -0,0 +1,203 @@
+import asyncio
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from .yamel import Yamel
+from .memcell import memcell
+
+class AsyncYamel:
+    '''
+    Asyncio facade over a `Yamel` database.
+
+    Every method is a coroutine. Reads run concurrently on a thread pool,
+    each against the snapshot current when it starts, so they never wait
+    for a write; writes are queued to a single writer thread, so they are
+    applied one at a time and in submission order. At most `max_pending`
+    calls are in flight: further callers wait for a slot (backpressure)
+    instead of growing the executor queues. Cancelling a call that has not
+    started yet removes it from the queue; a call that already started runs
+    to completion.
+    '''
+    __slots__ = ['_db', '_readers', '_writer', '_slots', '_max_pending', '_pending']
+
+    READERS = 4 # reader threads
+    MAX_PENDING = 64 # calls queued or running before callers have to wait
+
+    def __init__(self, db: Yamel, /, *, readers: int | None = None, max_pending: int | None = None) -> None:
+        '''
+        Parameters:
+        ----------
+        db : Yamel
+            Database to wrap.
+
+        readers : int, optional
+            Size of the read thread pool.
+
+        max_pending : int, optional
+            Maximum number of queued or running calls.
+        '''
+        self._db = db
+        self._readers = ThreadPoolExecutor(readers or self.__class__.READERS, thread_name_prefix = 'yamel-read')
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix = 'yamel-write')
+        self._max_pending = max_pending or self.__class__.MAX_PENDING
+        self._slots = None
+        self._pending = 0
+
+    @property
+    def db(self) -> Yamel:
+        '''
+        Wrapped synchronous database.
+
+        Returns:
+        -------
+        Yamel
+            The database.
+        '''
+        return self._db
+
+    @property
+    def pending(self) -> int:
+        '''
+        Calls currently queued or running.
+
+        Returns:
+        -------
+        int
+            Queue depth.
+        '''
+        return self._pending
+
+    # --- DISPATCH ---
+
+    async def _submit(self, executor: ThreadPoolExecutor, fn, /, *args, **kwargs):
+        '''
+        Run `fn` on `executor`, waiting for a free slot first.
+        '''
+        if self._slots is None:
+            # created lazily so it binds to the running loop
+            self._slots = asyncio.Semaphore(self._max_pending)
+        async with self._slots:
+            self._pending += 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(executor, partial(fn, *args, **kwargs))
+            finally:
+                self._pending -= 1
+
+    def _read(self, fn, /, *args, **kwargs):
+        '''
+        Queue `fn` on the reader pool.
+        '''
+        return self._submit(self._readers, fn, *args, **kwargs)
+
+    def _write(self, fn, /, *args, **kwargs):
+        '''
+        Queue `fn` on the writer thread.
+        '''
+        return self._submit(self._writer, fn, *args, **kwargs)
+
+    # --- READS ---
+
+    async def all(self) -> list[memcell]:
+        '''
+        Awaitable `Yamel.all`.
+        '''
+        return await self._read(lambda: self._db.all)
+
+    async def where(self, filters: dict[str, object]) -> list[memcell]:
+        '''
+        Awaitable `Yamel.where`.
+        '''
+        return await self._read(self._db.where, filters)
+
+    async def page(self, /, *, after: int | tuple[int, str] | None = None, limit: int | None = None, phone: str | None = None, filters: dict[str, object] | None = None) -> list[memcell]:
+        '''
+        Awaitable `Yamel.iter_all`, materialized in the reader thread.
+        '''
+        return await self._read(lambda: list(self._db.iter_all(after = after, limit = limit, phone = phone, filters = filters)))
+
+    async def stats(self, phone: str | None = None) -> dict[str, object]:
+        '''
+        Awaitable `Yamel.stats`.
+        '''
+        return await self._read(self._db.stats, phone)
+
+    async def usage(self, phone: str) -> dict[str, int]:
+        '''
+        Awaitable `Yamel.usage`.
+        '''
+        return await self._read(self._db.usage, phone)
+
+    # --- WRITES ---
+
+    async def create(self, phone: str, task: str, due: float | None = None) -> dict[str, object]:
+        '''
+        Awaitable `Yamel.create`.
+        '''
+        return await self._write(self._db.create, phone, task, due = due)
+
+    async def create_many(self, items: list[dict[str, str]]) -> list[dict[str, object]]:
+        '''
+        Awaitable `Yamel.create_many`.
+        '''
+        return await self._write(self._db.create_many, items)
+
+    async def update(self, updates: dict[str, object], filters: dict[str, object]) -> list[int]:
+        '''
+        Awaitable `Yamel.update`.
+        '''
+        return await self._write(self._db.update, updates, filters)
+
+    async def update_many(self, changes: list[tuple[dict[str, object], dict[str, object]]]) -> list[int]:
+        '''
+        Awaitable `Yamel.update_many`.
+        '''
+        return await self._write(self._db.update_many, changes)
+
+    async def delete(self, filters: dict[str, object]) -> dict[str, object] | int:
+        '''
+        Awaitable `Yamel.delete`.
+        '''
+        return await self._write(self._db.delete, filters)
+
+    async def delete_many(self, filters: list[dict[str, object]]) -> list[dict[str, object] | None]:
+        '''
+        Awaitable `Yamel.delete_many`.
+        '''
+        return await self._write(self._db.delete_many, filters)
+
+    async def transaction(self, fn, /, *args, **kwargs):
+        '''
+        Run `fn(db, *args, **kwargs)` inside `Yamel.transaction` on the writer thread.
+
+        Parameters:
+        ----------
+        fn : Callable
+            Synchronous unit of work taking the wrapped `Yamel` first.
+
+        Returns:
+        -------
+        object
+            Whatever `fn` returns.
+        '''
+        def run():
+            with self._db.transaction():
+                return fn(self._db, *args, **kwargs)
+        return await self._write(run)
+
+    # --- LIFECYCLE ---
+
+    async def aclose(self) -> None:
+        '''
+        Wait for queued calls to finish and stop the worker threads.
+        '''
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._writer.shutdown)
+        await loop.run_in_executor(None, self._readers.shutdown)
+
+    async def __aenter__(self) -> 'AsyncYamel':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+__all__ = ['AsyncYamel']
@@ -0,0 +1,143 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+
+class ResultCache:
+    '''
+    Bounded LRU cache for query results, keyed by table version and filters.
+
+    The owner bumps its version on every write, so entries from older
+    versions can never be hit again; they simply age out of the LRU order.
+    Safe to share between reader threads.
+    '''
+    __slots__ = ['maxsize', 'hits', 'misses', 'evictions', '_entries', '_lock']
+
+    SIZE = 128 # distinct (version, query) results kept
+
+    def __init__(self, maxsize: int | None = None) -> None:
+        '''
+        Parameters:
+        ----------
+        maxsize : int, optional
+            Maximum number of cached results.
+        '''
+        self.maxsize = self.__class__.SIZE if maxsize is None else maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(version: int, kind: str, filters: dict[str, object] | None = None) -> tuple | None:
+        '''
+        Normalize a query into a cache key.
+
+        Parameters:
+        ----------
+        version : int
+            Table version the result belongs to.
+
+        kind : str
+            Query kind (e.g. 'all', 'where').
+
+        filters : dict, optional
+            Field-condition pairs; their order does not matter. Operator
+            mappings (and the lists inside them) are frozen into tuples.
+
+        Returns:
+        -------
+        tuple | None
+            Hashable key, or None if a filter value is unhashable (not cacheable).
+        '''
+        def freeze(cond):
+            if not isinstance(cond, Mapping):
+                return cond
+            return ('{}',) + tuple(sorted((op, tuple(v) if isinstance(v, (list, tuple, set)) else v) for op, v in cond.items()))
+
+        items = tuple(sorted((k, freeze(v)) for k, v in (filters or {}).items()))
+        try:
+            hash(items)
+        except TypeError:
+            return None
+        return version, kind, items
+
+    def get(self, key: tuple | None) -> object | None:
+        '''
+        Look up a result and mark it as recently used.
+
+        Parameters:
+        ----------
+        key : tuple | None
+            Key from `key`.
+
+        Returns:
+        -------
+        object | None
+            Cached result, or None on a miss.
+        '''
+        if key is None:
+            return None
+        with self._lock:
+            try:
+                result = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key: tuple | None, result: object) -> object:
+        '''
+        Store a result, evicting the least recently used one if full.
+
+        Parameters:
+        ----------
+        key : tuple | None
+            Key from `key` (None is ignored).
+
+        result : object
+            Result to cache.
+
+        Returns:
+        -------
+        object
+            `result`, for chaining.
+        '''
+        if key is None or self.maxsize <= 0:
+            return result
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last = False)
+                self.evictions += 1
+        return result
+
+    def clear(self) -> None:
+        '''
+        Drop every cached result (stats are kept).
+        '''
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        '''
+        Hit/miss/eviction counters.
+
+        Returns:
+        -------
+        dict
+            Counters and current size.
+        '''
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'size': len(self._entries)}
+
+    def __len__(self) -> int:
+        '''
+        Number of cached results.
+        '''
+        return len(self._entries)
+
+__all__ = ['ResultCache']
@@ -0,0 +1,210 @@
+import time
+import queue
+import threading
+from collections import deque
+from typing import Iterator, NamedTuple
+
+class Event(NamedTuple):
+    '''
+    One change-feed entry.
+    '''
+    id: str
+    kind: str # 'insert', 'update', 'delete' or 'reset'
+    cell: dict[str, object] | None
+
+class Subscription:
+    '''
+    A subscriber's bounded queue of events.
+
+    If the subscriber falls more than `maxsize` events behind it is dropped
+    from the feed; `overflowed` is then set and, once the queued events are
+    drained, iteration stops. The client resumes from the last event ID it
+    saw (replayed from the feed history) instead of the feed buffering
+    without bound.
+    '''
+    __slots__ = ['_feed', '_queue', 'overflowed', 'closed']
+
+    def __init__(self, feed: 'ChangeFeed', maxsize: int) -> None:
+        '''
+        Parameters:
+        ----------
+        feed : ChangeFeed
+            Feed the subscription belongs to.
+
+        maxsize : int
+            Events buffered before the subscriber is dropped.
+        '''
+        self._feed = feed
+        self._queue = queue.Queue(maxsize)
+        self.overflowed = False
+        self.closed = False
+
+    def _offer(self, event: Event) -> bool:
+        '''
+        Queue an event without blocking; False if the queue is full.
+        '''
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except queue.Full:
+            self.overflowed = True
+            return False
+
+    def get(self, timeout: float | None = None) -> Event | None:
+        '''
+        Wait for the next event.
+
+        Parameters:
+        ----------
+        timeout : float, optional
+            Seconds to wait (None waits forever).
+
+        Returns:
+        -------
+        Event | None
+            Next event, or None on timeout.
+        '''
+        try:
+            return self._queue.get(timeout = timeout)
+        except queue.Empty:
+            return None
+
+    @property
+    def alive(self) -> bool:
+        '''
+        Whether more events can still arrive or are queued.
+
+        Returns:
+        -------
+        bool
+            False once closed, or overflowed and drained.
+        '''
+        return not self.closed and not (self.overflowed and self._queue.empty())
+
+    def close(self) -> None:
+        '''
+        Unsubscribe.
+        '''
+        self.closed = True
+        self._feed._unsubscribe(self)
+
+    def __iter__(self) -> Iterator[Event]:
+        '''
+        Yield events until the subscription closes or overflows.
+        '''
+        while self.alive:
+            event = self.get(timeout = 0.5)
+            if event is not None:
+                yield event
+
+class ChangeFeed:
+    '''
+    In-process publish/subscribe feed of table changes.
+
+    Every event gets an ID `<epoch>-<seq>`; the epoch changes per process, so
+    an ID from a previous run is recognised as stale. The last `history`
+    events are kept so a subscriber can resume after a given ID; if that ID
+    is unknown or too old, the subscriber first gets a 'reset' event telling
+    it to refetch the table.
+    '''
+    __slots__ = ['_lock', '_subs', '_history', '_epoch', '_seq']
+
+    HISTORY = 1024 # events kept for resuming subscribers
+    QUEUE = 256 # events buffered per subscriber
+
+    def __init__(self, history: int | None = None) -> None:
+        '''
+        Parameters:
+        ----------
+        history : int, optional
+            Number of past events kept for resuming.
+        '''
+        self._lock = threading.Lock()
+        self._subs = set()
+        self._history = deque(maxlen = history or self.__class__.HISTORY)
+        self._epoch = format(time.time_ns() // 1_000_000, 'x')
+        self._seq = 0
+
+    def publish(self, kind: str, cell: dict[str, object] | None = None) -> Event:
+        '''
+        Record an event and hand it to every subscriber.
+
+        Parameters:
+        ----------
+        kind : str
+            'insert', 'update', 'delete' or 'reset'.
+
+        cell : dict, optional
+            Affected memcell (its state after the change, or before a delete).
+
+        Returns:
+        -------
+        Event
+            The published event.
+        '''
+        with self._lock:
+            self._seq += 1
+            event = Event(f'{self._epoch}-{self._seq}', kind, dict(cell) if cell is not None else None)
+            self._history.append((self._seq, event))
+            for sub in list(self._subs):
+                if not sub._offer(event):
+                    self._subs.discard(sub)
+        return event
+
+    def subscribe(self, last_id: str | None = None, /, *, maxsize: int | None = None) -> Subscription:
+        '''
+        Register a subscriber, replaying history after `last_id` first.
+
+        Parameters:
+        ----------
+        last_id : str, optional
+            ID of the last event the client saw (e.g. SSE `Last-Event-ID`).
+
+        maxsize : int, optional
+            Events buffered before the subscriber is dropped.
+
+        Returns:
+        -------
+        Subscription
+            The new subscription.
+        '''
+        with self._lock:
+            replay = []
+            if last_id is not None:
+                seq = self._position(last_id)
+                oldest = self._history[0][0] if self._history else self._seq + 1
+                if seq is None or seq > self._seq or seq < oldest - 1:
+                    replay = [Event(f'{self._epoch}-{self._seq}', 'reset', None)]
+                else:
+                    replay = [event for n, event in self._history if n > seq]
+
+            # room for the replay on top of the live buffer
+            sub = Subscription(self, (maxsize or self.__class__.QUEUE) + len(replay))
+            for event in replay:
+                sub._offer(event)
+            self._subs.add(sub)
+        return sub
+
+    def _position(self, event_id: str) -> int | None:
+        '''
+        Sequence number of an event ID from this process (None if foreign).
+        '''
+        epoch, _, seq = str(event_id).partition('-')
+        if epoch != self._epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def _unsubscribe(self, sub: Subscription) -> None:
+        '''
+        Drop a subscriber (called by `Subscription.close`).
+        '''
+        with self._lock:
+            self._subs.discard(sub)
+
+    def __len__(self) -> int:
+        '''
+        Number of active subscribers.
+        '''
+        return len(self._subs)
+
+__all__ = ['ChangeFeed', 'Subscription', 'Event']
@@ -0,0 +1,545 @@
+import re
+import bisect
+from typing import Iterable, Iterator
+from collections.abc import Hashable
+
+class _CopyOnWrite:
+    '''
+    Copy-on-write bookkeeping shared by the indexes.
+
+    `fork` returns an index sharing every container with this one, after
+    which neither side mutates a shared container in place: the first write
+    to one copies it (and the path of containers leading to it) into the
+    writing side only. Forking is O(1) and a write copies only what it
+    touches, so an index can be published as an immutable snapshot while a
+    writer carries on with its fork. Maps keyed by document ID are split
+    into chunks, so a write copies one chunk rather than the whole map.
+    '''
+    __slots__ = ['_own']
+
+    CHUNK = 6 # document-keyed maps hold 2 ** CHUNK entries per chunk
+
+    def fork(self) -> '_CopyOnWrite':
+        '''
+        Twin index sharing all state with this one (both become copy-on-write).
+
+        Returns:
+        -------
+        _CopyOnWrite
+            The fork.
+        '''
+        twin = object.__new__(self.__class__)
+        for cls in self.__class__.__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                setattr(twin, name, getattr(self, name))
+        self._own = set()
+        twin._own = set()
+        return twin
+
+    def _claim(self, obj):
+        '''
+        `obj` if this side owns it, else an owned copy of it.
+        '''
+        if id(obj) not in self._own:
+            obj = obj.copy()
+            self._own.add(id(obj))
+        return obj
+
+    def _top(self, name: str):
+        '''
+        Owned version of a top-level container attribute.
+        '''
+        obj = self._claim(getattr(self, name))
+        setattr(self, name, obj)
+        return obj
+
+    def _child(self, parent: dict, key: Hashable, factory = None):
+        '''
+        Owned version of `parent[key]` (`parent` must be owned); a missing
+        child is created with `factory`, or None is returned without one.
+        '''
+        child = parent.get(key)
+        if child is None:
+            if factory is None:
+                return None
+            child = factory()
+            self._own.add(id(child))
+        else:
+            child = self._claim(child)
+        parent[key] = child
+        return child
+
+    def _chunk_get(self, chunks: dict, key: int):
+        '''
+        Value for `key` in a chunked map (None if absent).
+        '''
+        chunk = chunks.get(key >> self.CHUNK)
+        return None if chunk is None else chunk.get(key)
+
+    def _chunk_set(self, name: str, key: int, value: object) -> None:
+        '''
+        Store `value` under `key` in the chunked map attribute `name`.
+        '''
+        self._child(self._top(name), key >> self.CHUNK, dict)[key] = value
+
+    def _chunk_pop(self, name: str, key: int):
+        '''
+        Remove and return `key` from the chunked map attribute `name` (None if absent).
+        '''
+        if self._chunk_get(getattr(self, name), key) is None:
+            return None
+        chunks = self._top(name)
+        chunk = self._child(chunks, key >> self.CHUNK)
+        value = chunk.pop(key)
+        if not chunk:
+            del chunks[key >> self.CHUNK]
+        return value
+
+class TextIndex(_CopyOnWrite):
+    '''
+    Inverted index of case-folded word tokens to document IDs.
+
+    The vocabulary is kept sorted, so a prefix resolves with two binary
+    searches to the run of tokens it covers; a query costs in proportion to
+    the matching postings, not the number of documents.
+    '''
+    __slots__ = ['_postings', '_vocab', '_terms']
+
+    _WORD = re.compile(r'\w+')
+
+    def __init__(self) -> None:
+        self._own = set()
+        self._postings = {}
+        self._vocab = []
+        self._terms = {}
+
+    @classmethod
+    def tokenize(cls, text: object) -> list[str]:
+        '''
+        Split text into case-folded word tokens.
+
+        Parameters:
+        ----------
+        text : object
+            Text to tokenize (non-strings yield no tokens).
+
+        Returns:
+        -------
+        list
+            Tokens in order of appearance.
+        '''
+        return cls._WORD.findall(text.casefold()) if isinstance(text, str) else []
+
+    def add(self, doc_id: int, text: object) -> None:
+        '''
+        Index a document's text, replacing what was indexed for it before.
+
+        Parameters:
+        ----------
+        doc_id : int
+            Storage document ID.
+
+        text : object
+            Text to index.
+        '''
+        self.discard(doc_id)
+        terms = frozenset(self.tokenize(text))
+        if not terms:
+            return
+        self._chunk_set('_terms', doc_id, terms)
+        postings = self._top('_postings')
+        for term in terms:
+            if term not in postings:
+                bisect.insort(self._top('_vocab'), term)
+            self._child(postings, term, set).add(doc_id)
+
+    def discard(self, doc_id: int) -> None:
+        '''
+        Drop a document from the index (no-op if it is not indexed).
+
+        Parameters:
+        ----------
+        doc_id : int
+            Storage document ID.
+        '''
+        terms = self._chunk_pop('_terms', doc_id)
+        if not terms:
+            return
+        postings = self._top('_postings')
+        for term in terms:
+            bucket = self._child(postings, term)
+            bucket.discard(doc_id)
+            if not bucket:
+                del postings[term]
+                vocab = self._top('_vocab')
+                del vocab[bisect.bisect_left(vocab, term)]
+
+    def clear(self) -> None:
+        '''
+        Drop every indexed document.
+        '''
+        self._postings = {}
+        self._vocab = []
+        self._terms = {}
+
+    def _prefixed(self, prefix: str) -> set[int]:
+        '''
+        Union of the postings of every token starting with `prefix`.
+        '''
+        lo = bisect.bisect_left(self._vocab, prefix)
+        hi = bisect.bisect_left(self._vocab, prefix + '\U0010ffff')
+        if hi - lo == 1:
+            return self._postings[self._vocab[lo]]
+        return set().union(*(self._postings[term] for term in self._vocab[lo:hi]))
+
+    def search(self, query: str) -> list[int]:
+        '''
+        Documents containing every query word, each word matching as a prefix.
+
+        Parameters:
+        ----------
+        query : str
+            Words to look for.
+
+        Returns:
+        -------
+        list
+            Matching document IDs in ascending order.
+        '''
+        words = set(self.tokenize(query))
+        if not words:
+            return []
+        # intersect starting from the most selective word
+        hits = sorted((self._prefixed(word) for word in words), key = len)
+        result = set(hits[0])
+        for postings in hits[1:]:
+            result &= postings
+        return sorted(result)
+
+    def __len__(self) -> int:
+        '''
+        Number of distinct tokens.
+        '''
+        return len(self._vocab)
+
+class HashIndex(_CopyOnWrite):
+    '''
+    In-memory secondary hash indexes over a table, keyed by document ID.
+
+    Every indexed field maps each value to the set of document IDs holding it,
+    so equality filters on those fields resolve without touching storage. The
+    index also keeps a copy of each document, which lets the residual (non
+    indexed) filters be checked in memory as well. One field can additionally
+    be full-text indexed, and one pair of fields counted per value pair.
+
+    The index is copy-on-write (see `fork`): a fork can be handed to
+    readers as a snapshot that later writes never disturb.
+    '''
+    __slots__ = ['_fields', '_maps', '_docs', '_size', '_text', '_text_field', '_tally', '_tally_fields']
+
+    def __init__(self, fields: Iterable[str], docs: Iterable[tuple[int, dict[str, object]]] = (), /, *, text: str | None = None, tally: tuple[str, str] | None = None) -> None:
+        '''
+        Build the indexes from `(doc_id, document)` pairs.
+
+        Parameters:
+        ----------
+        fields : Iterable[str]
+            Fields to index.
+
+        docs : Iterable[tuple[int, dict]]
+            Documents already stored.
+
+        text : str, optional
+            Field to maintain a full-text `TextIndex` on.
+
+        tally : tuple[str, str], optional
+            `(outer, inner)` fields to keep document counts for, e.g.
+            `('phone', 'status')` for each owner's count per status.
+        '''
+        self._own = set()
+        self._fields = tuple(fields)
+        self._maps = {field: {} for field in self._fields}
+        self._docs = {}
+        self._size = 0
+        self._text_field = text
+        self._text = TextIndex() if text is not None else None
+        self._tally_fields = tally
+        self._tally = {}
+        for doc_id, doc in docs:
+            self.add(doc_id, doc)
+
+    # --- MAINTENANCE ---
+
+    def fork(self) -> 'HashIndex':
+        '''
+        Twin index sharing all state with this one (both become copy-on-write).
+
+        Returns:
+        -------
+        HashIndex
+            The fork.
+        '''
+        twin = super().fork()
+        if self._text is not None:
+            twin._text = self._text.fork()
+        return twin
+
+    def add(self, doc_id: int, doc: dict[str, object]) -> None:
+        '''
+        Index (or re-index) a document.
+
+        Parameters:
+        ----------
+        doc_id : int
+            Storage document ID.
+
+        doc : dict
+            Document content.
+        '''
+        self.discard(doc_id)
+        doc = dict(doc)
+        self._chunk_set('_docs', doc_id, doc)
+        self._size += 1
+        maps = self._top('_maps')
+        for field in self._fields:
+            value = doc.get(field)
+            if isinstance(value, Hashable):
+                self._child(self._child(maps, field), value, set).add(doc_id)
+        if self._text is not None:
+            self._text.add(doc_id, doc.get(self._text_field))
+        if self._tally_fields is not None:
+            self._count(doc, 1)
+
+    def discard(self, doc_id: int) -> None:
+        '''
+        Drop a document from every index (no-op if it is not indexed).
+
+        Parameters:
+        ----------
+        doc_id : int
+            Storage document ID.
+        '''
+        doc = self._chunk_pop('_docs', doc_id)
+        if doc is None:
+            return
+        self._size -= 1
+        if self._text is not None:
+            self._text.discard(doc_id)
+        if self._tally_fields is not None:
+            self._count(doc, -1)
+        maps = self._top('_maps')
+        for field in self._fields:
+            value = doc.get(field)
+            if not isinstance(value, Hashable) or value not in maps[field]:
+                continue
+            values = self._child(maps, field)
+            bucket = self._child(values, value)
+            bucket.discard(doc_id)
+            if not bucket:
+                del values[value]
+
+    def clear(self) -> None:
+        '''
+        Drop every indexed document.
+        '''
+        self._docs = {}
+        self._size = 0
+        self._maps = {field: {} for field in self._fields}
+        if self._text is not None:
+            self._text.clear()
+        self._tally = {}
+
+    def _count(self, doc: dict[str, object], delta: int) -> None:
+        '''
+        Adjust the tally for a document being added (+1) or removed (-1).
+        '''
+        outer, inner = (doc.get(field) for field in self._tally_fields)
+        if not isinstance(outer, Hashable) or not isinstance(inner, Hashable):
+            return
+        tally = self._top('_tally')
+        counts = self._child(tally, outer, dict)
+        counts[inner] = counts.get(inner, 0) + delta
+        if not counts[inner]:
+            del counts[inner]
+            if not counts:
+                del tally[outer]
+
+    # --- LOOKUPS ---
+
+    def lookup(self, filters: dict[str, object]) -> list[int] | None:
+        '''
+        Resolve equality filters to document IDs through the indexes.
+
+        Parameters:
+        ----------
+        filters : dict
+            Field-value pairs to match.
+
+        Returns:
+        -------
+        list | None
+            Matching document IDs in ascending order, or None when no filter
+            is on an indexed field (the caller has to scan).
+        '''
+        keys = [k for k in filters if k in self._maps and isinstance(filters[k], Hashable)]
+        if not keys:
+            return None
+
+        # intersect starting from the most selective bucket
+        buckets = sorted((self._maps[k].get(filters[k], ()) for k in keys), key = len)
+        hits = set(buckets[0])
+        for bucket in buckets[1:]:
+            hits &= bucket
+
+        rest = {k: v for k, v in filters.items() if k not in keys}
+        return sorted(i for i in hits if all(self.get(i).get(k) == v for k, v in rest.items()))
+
+    def search(self, query: str) -> list[int]:
+        '''
+        Full-text search over the text field.
+
+        Parameters:
+        ----------
+        query : str
+            Words to look for (each matches as a prefix).
+
+        Returns:
+        -------
+        list
+            Matching document IDs in ascending order.
+        '''
+        if self._text is None:
+            raise RuntimeError('no text field is indexed')
+        return self._text.search(query)
+
+    def scan(self, filters: dict[str, object]) -> list[int]:
+        '''
+        Resolve filters by checking every indexed document (no index involved).
+
+        Parameters:
+        ----------
+        filters : dict
+            Field-value pairs to match.
+
+        Returns:
+        -------
+        list
+            Matching document IDs in ascending order.
+        '''
+        return sorted(i for i, doc in self.items() if all(doc.get(k) == v for k, v in filters.items()))
+
+    def items(self) -> Iterator[tuple[int, dict[str, object]]]:
+        '''
+        Indexed `(doc_id, document)` pairs.
+
+        Returns:
+        -------
+        Iterator[tuple[int, dict]]
+            Every indexed document.
+        '''
+        return iter([pair for chunk in self._docs.values() for pair in chunk.items()])
+
+    def get(self, doc_id: int) -> dict[str, object] | None:
+        '''
+        Indexed copy of a document.
+
+        Parameters:
+        ----------
+        doc_id : int
+            Storage document ID.
+
+        Returns:
+        -------
+        dict | None
+            Document, or None if it is not indexed.
+        '''
+        return self._chunk_get(self._docs, doc_id)
+
+    def tally(self, value: Hashable) -> dict[object, int]:
+        '''
+        Document counts per inner-field value for one outer-field value.
+
+        Parameters:
+        ----------
+        value : Hashable
+            Outer-field value (e.g. an owner's phone).
+
+        Returns:
+        -------
+        dict
+            Inner value -> count (a copy).
+        '''
+        if self._tally_fields is None:
+            raise RuntimeError('no tally fields are configured')
+        return dict(self._tally.get(value, {}))
+
+    def bucket(self, field: str, value: Hashable) -> set[int]:
+        '''
+        Document IDs holding `value` in an indexed field.
+
+        Parameters:
+        ----------
+        field : str
+            Indexed field.
+
+        value : Hashable
+            Value to look up.
+
+        Returns:
+        -------
+        set
+            Document IDs (the live bucket; do not mutate).
+        '''
+        return self._maps[field].get(value, set())
+
+    def cardinality(self, field: str) -> int:
+        '''
+        Number of distinct values held in an indexed field.
+
+        Parameters:
+        ----------
+        field : str
+            Indexed field.
+
+        Returns:
+        -------
+        int
+            Distinct value count.
+        '''
+        return len(self._maps[field])
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        '''
+        Indexed fields.
+
+        Returns:
+        -------
+        tuple
+            Field names.
+        '''
+        return self._fields
+
+    def values(self, field: str) -> Iterator[object]:
+        '''
+        Distinct values currently held in an indexed field.
+
+        Parameters:
+        ----------
+        field : str
+            Indexed field.
+
+        Returns:
+        -------
+        Iterator
+            Distinct values.
+        '''
+        return iter(self._maps[field])
+
+    def __len__(self) -> int:
+        '''
+        Number of indexed documents.
+        '''
+        return self._size
+
+__all__ = ['HashIndex', 'TextIndex']
@@ -0,0 +1,287 @@
+import os
+import json
+import threading
+from tinydb.storages import Storage
+from .ystore import YStorage, _clone
+
+class JStorage(Storage):
+    '''
+    TinyDB-compatible storage that appends every mutation to a journal
+    and periodically compacts it into a snapshot.
+
+    Layout on disk:
+     - `<path>`                 : snapshot (same format/codec as `YStorage`)
+     - `<path>.journal`         : one JSON record per insert/update/remove
+     - `<path>.journal.old`     : journal segment being compacted (transient)
+
+    A writer that names the documents it changes through `mark` gets the
+    live state from `read` and only those documents are journaled. Plain
+    TinyDB writes get a copy and are diffed against the whole state.
+    '''
+    __slots__ = ['_path', '_snapshot', '_log', '_old', '_state', '_marked', '_fh', '_lock', '_threshold', '_compactor']
+
+    _THRESHOLD = 1 << 20 # journal bytes before a background compaction
+
+    def __init__(self, path: str, threshold: int | None = None, codec: str | None = None):
+        '''
+        Open the snapshot, replay the journal on top of it and start appending.
+
+        Parameters:
+        ----------
+        path : str
+            Path to the YAML snapshot file.
+
+        threshold : int, optional
+            Journal size (bytes) that triggers compaction.
+
+        codec : str, optional
+            Snapshot codec; inferred from the file extension when omitted.
+        '''
+        self._path = str(path)
+        self._snapshot = YStorage(self._path, codec = codec)
+        self._log = f'{self._path}.journal'
+        self._old = f'{self._log}.old'
+        self._lock = threading.Lock()
+        self._threshold = threshold or self.__class__._THRESHOLD
+        self._compactor = None
+        self._marked = {}
+
+        stale = os.path.exists(self._old)
+        self._state = self._replay()
+        self._fh = open(self._log, 'a', encoding = 'utf-8')
+
+        # a leftover segment means a previous compaction never finished
+        if stale:
+            self._rotate()
+            self._compact(self._state)
+
+    # --- STORAGE INTERFACE ---
+
+    def read(self) -> dict[str, object]:
+        '''
+        Return the replayed database state.
+
+        After `mark` this is the live state, which TinyDB updates in place
+        before handing it to `write`. Otherwise callers get their own copy,
+        so `write` can diff against the untouched state.
+
+        Returns:
+        -------
+        dict
+            Database content keyed by table name.
+        '''
+        with self._lock:
+            if self._marked:
+                return self._state
+            state = self._state
+        return _clone(state)
+
+    def mark(self, table: str, doc_ids) -> None:
+        '''
+        Name documents the next `write` changes, so only they are journaled.
+
+        Parameters:
+        ----------
+        table : str
+            Table being written.
+
+        doc_ids : Iterable
+            Document IDs inserted, updated or removed (may be empty, and may
+            be added to until the write).
+        '''
+        with self._lock:
+            self._marked.setdefault(table, set()).update(str(doc_id) for doc_id in doc_ids)
+
+    def write(self, data: dict[str, object]) -> None:
+        '''
+        Append the marked documents of `data` (or, unmarked, its difference
+        from the current state) to the journal.
+
+        Parameters:
+        ----------
+        data : dict
+            Full database content as produced by TinyDB.
+        '''
+        with self._lock:
+            marked, self._marked = self._marked, {}
+            changes = self._records(data, marked) if marked else self._diff(self._state, data)
+            records = [json.dumps(r, separators = (',', ':')) for r in changes]
+            if records:
+                self._fh.write('\n'.join(records) + '\n')
+                self._fh.flush()
+            self._state = data
+
+            if self._fh.tell() >= self._threshold and self._compactor is None:
+                self._rotate()
+                # the live state keeps changing while the snapshot is written
+                self._compactor = threading.Thread(target = self._compact, args = (_clone(data),), daemon = True)
+                self._compactor.start()
+
+    def stream(self, table: str):
+        '''
+        Yield `(doc_id, document)` pairs of one table without copying the state.
+
+        Parameters:
+        ----------
+        table : str
+            Table to read.
+
+        Returns:
+        -------
+        Iterator[tuple]
+            Document ID (as stored) and document.
+        '''
+        with self._lock:
+            docs = list(self._state.get(table, {}).items())
+        for doc_id, doc in docs:
+            yield doc_id, dict(doc)
+
+    def close(self) -> None:
+        '''
+        Wait for any running compaction and close the journal.
+        '''
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        self._fh.close()
+
+    # --- JOURNAL ---
+
+    def _replay(self) -> dict[str, dict]:
+        '''
+        Load the snapshot and apply every journal segment in order.
+
+        Returns:
+        -------
+        dict
+            Reconstructed database state.
+        '''
+        try:
+            state = self._snapshot.read()
+        except FileNotFoundError:
+            state = {}
+        state = state or {}
+
+        for log in (self._old, self._log):
+            try:
+                with open(log, 'r', encoding = 'utf-8') as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            # torn tail from a crash mid-append
+                            break
+                        self._apply(state, record)
+            except FileNotFoundError:
+                continue
+        return state
+
+    @staticmethod
+    def _apply(state: dict[str, dict], record: dict[str, object]) -> None:
+        '''
+        Apply a single journal record to `state` in place.
+
+        Parameters:
+        ----------
+        state : dict
+            Database state being rebuilt.
+
+        record : dict
+            Journal record with an `op` of 'put', 'del' or 'drop'.
+        '''
+        match record['op']:
+            case 'put':
+                state.setdefault(record['tb'], {})[record['id']] = record['doc']
+            case 'del':
+                state.get(record['tb'], {}).pop(record['id'], None)
+            case 'drop':
+                state.pop(record['tb'], None)
+
+    @staticmethod
+    def _records(data: dict[str, dict], marked: dict[str, set[str]]):
+        '''
+        Yield the journal records of the marked documents.
+
+        Parameters:
+        ----------
+        data : dict
+            State handed to `write`.
+
+        marked : dict
+            Changed document IDs keyed by table.
+
+        Returns:
+        -------
+        Iterator[dict]
+            Journal records.
+        '''
+        for tb, doc_ids in marked.items():
+            docs = data.get(tb, {})
+            for k in sorted(doc_ids, key = int):
+                if k in docs:
+                    yield {'op': 'put', 'tb': tb, 'id': k, 'doc': docs[k]}
+                else:
+                    yield {'op': 'del', 'tb': tb, 'id': k}
+
+    @staticmethod
+    def _diff(old: dict[str, dict], new: dict[str, dict]):
+        '''
+        Yield the journal records that turn `old` into `new`.
+
+        Parameters:
+        ----------
+        old : dict
+            Last persisted state.
+
+        new : dict
+            State handed to `write`.
+
+        Returns:
+        -------
+        Iterator[dict]
+            Journal records.
+        '''
+        for tb in old.keys() - new.keys():
+            yield {'op': 'drop', 'tb': tb}
+
+        for tb, docs in new.items():
+            before = old.get(tb, {})
+            if docs is before:
+                continue
+            for k, doc in docs.items():
+                if before.get(k) != doc:
+                    yield {'op': 'put', 'tb': tb, 'id': k, 'doc': doc}
+            for k in before.keys() - docs.keys():
+                yield {'op': 'del', 'tb': tb, 'id': k}
+
+    def _rotate(self) -> None:
+        '''
+        Move the active journal aside so new appends start a fresh segment.
+        '''
+        self._fh.close()
+        if os.path.exists(self._old):
+            # fold the unfinished segment into the one being rotated out
+            with open(self._old, 'a', encoding = 'utf-8') as old, open(self._log, 'r', encoding = 'utf-8') as log:
+                old.write(log.read())
+            os.remove(self._log)
+        else:
+            os.replace(self._log, self._old)
+        self._fh = open(self._log, 'a', encoding = 'utf-8')
+
+    def _compact(self, state: dict[str, dict]) -> None:
+        '''
+        Persist `state` as the new snapshot and drop the rotated segment.
+
+        Parameters:
+        ----------
+        state : dict
+            Database state covering every record in the rotated segment.
+        '''
+        self._snapshot.write(state)
+        try:
+            os.remove(self._old)
+        except FileNotFoundError:
+            pass
+        self._compactor = None
+
+__all__ = ['JStorage']
@@ -3,9 +3,9 @@ from collections.abc import Mapping
 
 class memcell(Mapping):
     '''Memcell factory for typecasting-like behavior.'''
-    __slots__ = ['id', 'phone', 'task', 'status', '_data']
+    __slots__ = ['id', 'phone', 'task', 'status', 'due', '_data']
 
-    def __init__(self, data: dict[str, Any] | None = None, /, *, id: int | None = None, phone: str | None = None, task: str | None = None, status: str = 'pending') -> None:
+    def __init__(self, data: dict[str, Any] | None = None, /, *, id: int | None = None, phone: str | None = None, task: str | None = None, status: str = 'pending', due: float | None = None) -> None:
         '''
         Initialize a memcell from a dictionary or keyword arguments.
 
@@ -25,16 +25,23 @@ class memcell(Mapping):
             
         status : str
             Task status (default: 'pending').
+
+        due : float, optional
+            Reminder time as a Unix timestamp (omitted from the record when unset).
         '''
         if data:
             id = data.get('id')
             phone = data.get('phone')
             task = data.get('task')
             status = data.get('status', 'pending')
+            due = data.get('due')
 
         if task and len(task) > 100:
             raise ValueError('Task description exceeds 100 characters.')
 
+        if due is not None and (isinstance(due, bool) or not isinstance(due, (int, float))):
+            raise ValueError('Due time must be a Unix timestamp.')
+
         assert id is not None, 'memcell.id cannot be NONE'
         assert phone is not None, 'memcell.phone cannot be NONE'
         assert task is not None, 'memcell.task cannot be NONE'
@@ -43,6 +50,7 @@ class memcell(Mapping):
         self.phone = phone
         self.task = task
         self.status = status
+        self.due = due
 
         self._data = {
             'id': self.id,
@@ -50,6 +58,8 @@ class memcell(Mapping):
             'task': self.task,
             'status': self.status
         }
+        if due is not None:
+            self._data['due'] = due
 
     def __repr__(self) -> str:
         '''
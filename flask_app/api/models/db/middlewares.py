@@ -0,0 +1,154 @@
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+from tinydb.middlewares import Middleware
+from .ystore import _clone
+from api.utils.debuggernaut import heimdahl
+
+class WriteBack(Middleware):
+    '''
+    Keep the parsed database in memory and persist it from a background flusher.
+
+    Writes only replace the in-memory document and mark it dirty; the flusher
+    thread coalesces every write that lands within `delay` seconds of the first
+    unflushed one into a single storage write. Pending data is flushed on
+    `close` and at interpreter exit. A failed flush leaves the data dirty;
+    the flusher logs it and retries after another `delay`.
+
+    Like TinyDB's `CachingMiddleware`, `read` hands out the cached document
+    itself; the flusher copies it once per flush instead. Writers updating
+    it in place hold `exclusive` (as `Yamel` does), so that copy never sees
+    a half-applied write.
+    '''
+    DELAY = 0.5 # seconds between the first dirty write and its flush
+
+    def __init__(self, storage_cls, delay: float | None = None) -> None:
+        '''
+        Parameters:
+        ----------
+        storage_cls : type
+            Wrapped storage class (e.g. `YStorage`).
+
+        delay : float, optional
+            Seconds to wait before flushing dirty data.
+        '''
+        super().__init__(storage_cls)
+        self.cache = None
+        self.delay = self.__class__.DELAY if delay is None else delay
+        self.flushes = 0
+        self.writes = 0
+        self._dirty_since = None
+        self._closed = False
+        self._cv = threading.Condition()
+        self._io = threading.Lock()
+        self._mutex = threading.RLock()
+        self._flusher = None
+
+    def __call__(self, *args, **kwargs):
+        super().__call__(*args, **kwargs)
+        self._flusher = threading.Thread(target = self._run, daemon = True)
+        self._flusher.start()
+        atexit.register(self.flush)
+        return self
+
+    # --- STORAGE INTERFACE ---
+
+    def read(self) -> dict[str, object]:
+        '''
+        Return the cached document, loading it once from storage.
+
+        Returns:
+        -------
+        dict
+            Database content keyed by table name (shared, not copied).
+        '''
+        with self._cv:
+            if self.cache is None:
+                self.cache = self.storage.read() or {}
+            return self.cache
+
+    def write(self, data: dict[str, object]) -> None:
+        '''
+        Replace the cached document and schedule a flush.
+
+        Parameters:
+        ----------
+        data : dict
+            Full database content as produced by TinyDB.
+        '''
+        with self._cv:
+            self.cache = data
+            self.writes += 1
+            if self._dirty_since is None:
+                self._dirty_since = time.monotonic()
+                self._cv.notify()
+
+    @contextmanager
+    def exclusive(self):
+        '''
+        Hold off flushes around a read-modify-write of the cached document
+        (and take the wrapped storage's own write lock).
+        '''
+        with self._mutex, self.storage.exclusive():
+            yield
+
+    def flush(self) -> None:
+        '''
+        Persist the cached document now if it has unflushed changes.
+
+        The dirty mark is only cleared once the write succeeded (and no newer
+        write came in meanwhile), so a failed flush is retried.
+        '''
+        with self._io:
+            # copy between writes, then serialize without blocking them
+            with self._mutex, self._cv:
+                if self._dirty_since is None:
+                    return
+                writes = self.writes
+                data = _clone(self.cache)
+            self.storage.write(data)
+            with self._cv:
+                if self.writes == writes:
+                    self._dirty_since = None
+            self.flushes += 1
+
+    def close(self) -> None:
+        '''
+        Stop the flusher, write any pending data and close the storage.
+        '''
+        with self._cv:
+            self._closed = True
+            self._cv.notify()
+        if self._flusher is not None:
+            self._flusher.join()
+        atexit.unregister(self.flush)
+        self.flush()
+        self.storage.close()
+
+    # --- FLUSHER ---
+
+    def _run(self) -> None:
+        '''
+        Background loop that flushes dirty data once `delay` has elapsed.
+        '''
+        while True:
+            with self._cv:
+                while self._dirty_since is None and not self._closed:
+                    self._cv.wait()
+                if self._closed:
+                    return
+                remaining = self._dirty_since + self.delay - time.monotonic()
+                if remaining > 0:
+                    self._cv.wait(remaining)
+                    continue
+            try:
+                self.flush()
+            except Exception as e:
+                heimdahl(f'[FLUSH ERROR] {e}', unveil = True, threat = 3)
+                with self._cv:
+                    # still dirty: retry after another delay
+                    if self._dirty_since is not None:
+                        self._dirty_since = time.monotonic()
+
+__all__ = ['WriteBack']
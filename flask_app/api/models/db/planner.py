@@ -0,0 +1,217 @@
+from functools import lru_cache
+from typing import Callable
+from collections.abc import Hashable, Mapping
+from .index import HashIndex
+
+OPERATORS = ('eq', 'in', 'gt', 'gte', 'lt', 'lte', 'prefix')
+_RANGE = {'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+
+def predicates(filters: dict[str, object]) -> tuple[tuple[str, str, object], ...]:
+    '''
+    Normalize filters into `(field, op, value)` predicates.
+
+    A plain value means equality; a mapping spells out operators, e.g.
+    `{'due': {'gte': 0, 'lt': 100}, 'status': {'in': ['pending']},
+    'task': {'prefix': 'Buy'}}`. Predicates are ANDed.
+
+    Parameters:
+    ----------
+    filters : dict
+        Field-condition pairs.
+
+    Returns:
+    -------
+    tuple
+        Predicates sorted by field and operator.
+
+    Raises:
+    ------
+    ValueError
+        On an unknown operator or a badly typed operand.
+    '''
+    preds = []
+    for field, cond in filters.items():
+        if not isinstance(cond, Mapping):
+            preds.append((field, 'eq', cond))
+            continue
+        for op, value in cond.items():
+            if op not in OPERATORS:
+                raise ValueError(f'unknown operator for {field}: {op}')
+            if op == 'in':
+                if isinstance(value, (str, bytes)) or not hasattr(value, '__iter__'):
+                    raise ValueError(f'{field}.in expects a list')
+                value = tuple(value)
+            elif op == 'prefix' and not isinstance(value, str):
+                raise ValueError(f'{field}.prefix expects a string')
+            preds.append((field, op, value))
+    return tuple(sorted(preds, key = lambda p: (p[0], p[1])))
+
+@lru_cache(maxsize = 256)
+def _compile(shape: tuple[tuple[str, str], ...]) -> Callable[[dict, tuple], bool]:
+    '''
+    Generate the matching function for a filter shape (fields and operators,
+    no values), so each shape is compiled once however often it is queried.
+    '''
+    terms = []
+    for i, (field, op) in enumerate(shape):
+        get = f'doc.get({field!r})'
+        if op == 'eq':
+            terms.append(f'{get} == p[{i}]')
+        elif op == 'in':
+            terms.append(f'{get} in p[{i}]')
+        elif op == 'prefix':
+            terms.append(f'isinstance(v := {get}, str) and v.startswith(p[{i}])')
+        else:
+            terms.append(f'(v := {get}) is not None and v {_RANGE[op]} p[{i}]')
+
+    source = (
+        'def match(doc, p):\n'
+        '    try:\n'
+        f'        return {" and ".join(terms) or "True"}\n'
+        '    except TypeError:\n'
+        '        return False\n'
+    )
+    namespace = {}
+    exec(compile(source, f'<filter {shape!r}>', 'exec'), namespace)
+    return namespace['match']
+
+class Plan:
+    '''
+    Execution plan for one filter: the access path plus a compiled predicate.
+
+    The access path is either the union of some index buckets of one field
+    ('index'), or every indexed document ('scan'). The full predicate is
+    then checked on each candidate.
+    '''
+    __slots__ = ['_index', '_match', '_params', 'shape', 'strategy', 'field', 'keys', 'estimate']
+
+    def __init__(self, index: HashIndex, preds: tuple[tuple[str, str, object], ...]) -> None:
+        '''
+        Parameters:
+        ----------
+        index : HashIndex
+            Index the plan reads from.
+
+        preds : tuple
+            Normalized predicates from `predicates`.
+        '''
+        self._index = index
+        self.shape = tuple((field, op) for field, op, _ in preds)
+        self._match = _compile(self.shape)
+        self._params = tuple(value for _, _, value in preds)
+        self.strategy = 'scan'
+        self.field = None
+        self.keys = None
+        self.estimate = len(index)
+
+    def matches(self, doc: dict[str, object]) -> bool:
+        '''
+        Whether a document satisfies every predicate.
+
+        Parameters:
+        ----------
+        doc : dict
+            Document to test.
+
+        Returns:
+        -------
+        bool
+            True on a match.
+        '''
+        return self._match(doc, self._params)
+
+    def run(self) -> list[int]:
+        '''
+        Execute the plan.
+
+        Returns:
+        -------
+        list
+            Matching document IDs in ascending order.
+        '''
+        index, match, params = self._index, self._match, self._params
+        if self.strategy == 'index':
+            candidates = set().union(*(index.bucket(self.field, key) for key in self.keys))
+            docs = ((doc_id, index.get(doc_id)) for doc_id in candidates)
+        else:
+            docs = index.items()
+        return sorted(doc_id for doc_id, doc in docs if match(doc, params))
+
+    def explain(self) -> dict[str, object]:
+        '''
+        Describe the plan (for debugging).
+
+        Returns:
+        -------
+        dict
+            Strategy, index field and keys, estimated candidates, filter shape.
+        '''
+        return {
+            'strategy': self.strategy,
+            'field': self.field,
+            'keys': list(self.keys) if self.keys is not None else None,
+            'estimate': self.estimate,
+            'shape': [f'{field} {op}' for field, op in self.shape]
+        }
+
+class QueryPlanner:
+    '''
+    Plans filtered reads over a `HashIndex`.
+
+    Equality and `in` predicates on an indexed field resolve to index
+    buckets; range and prefix predicates on an indexed field with few
+    distinct values are resolved by testing those values. The predicate
+    touching the fewest documents drives the read; without one, every
+    document is scanned.
+    '''
+    __slots__ = ['_index']
+
+    def __init__(self, index: HashIndex) -> None:
+        '''
+        Parameters:
+        ----------
+        index : HashIndex
+            Index to plan against.
+        '''
+        self._index = index
+
+    def plan(self, filters: dict[str, object]) -> Plan:
+        '''
+        Choose an access path for filters.
+
+        Parameters:
+        ----------
+        filters : dict
+            Field-condition pairs (see `predicates`).
+
+        Returns:
+        -------
+        Plan
+            Executable plan.
+        '''
+        index = self._index
+        preds = predicates(filters)
+        plan = Plan(index, preds)
+        fields = index.fields
+
+        for field, op, value in preds:
+            if field not in fields:
+                continue
+            if op == 'eq':
+                keys = (value,) if isinstance(value, Hashable) else None
+            elif op == 'in':
+                keys = value if all(isinstance(v, Hashable) for v in value) else None
+            elif index.cardinality(field) * 2 <= len(index):
+                test = _compile(((field, op),))
+                keys = tuple(v for v in index.values(field) if test({field: v}, (value,)))
+            else:
+                keys = None
+            if keys is None:
+                continue
+
+            estimate = sum(len(index.bucket(field, key)) for key in keys)
+            if estimate < plan.estimate or plan.strategy == 'scan':
+                plan.strategy, plan.field, plan.keys, plan.estimate = 'index', field, keys, estimate
+        return plan
+
+__all__ = ['QueryPlanner', 'Plan', 'predicates', 'OPERATORS']
@@ -0,0 +1,270 @@
+import re
+import time
+import threading
+from pathlib import Path
+from typing import Callable, Iterator
+from collections import OrderedDict
+from contextlib import contextmanager
+from tinydb import TinyDB
+from .yamel import Yamel
+from api.utils.debuggernaut import heimdahl, laufeyspawn, jotunbane
+
+class _Handle:
+    '''
+    One open database with its lease count and last use.
+    '''
+    __slots__ = ['db', 'users', 'used']
+
+    def __init__(self, db: Yamel, used: float) -> None:
+        self.db = db
+        self.users = 0
+        self.used = used
+
+class _Store:
+    '''
+    One database file shared by its open tables, with their write lock.
+    '''
+    __slots__ = ['db', 'guard', 'tables']
+
+    def __init__(self, db: TinyDB | None) -> None:
+        self.db = db
+        self.guard = threading.RLock()
+        self.tables = 0
+
+class Registry:
+    '''
+    Open `Yamel` databases keyed by `(path, table)`, so one process can serve
+    several tables and files.
+
+    A database is opened on its first lease and kept open for the next one.
+    Once no lease holds it, it is closed after `idle` seconds unused, or
+    straight away (least recently used first) while more than `handles`
+    databases are open. A leased database is never closed; if every open
+    one is leased, the cap is exceeded until leases are returned.
+
+    Tables of the same file share one opened storage (so a write-back cache
+    or journal sees every table) and one write lock (so their whole-file
+    read-modify-writes never interleave). The file is closed with its last
+    table.
+    '''
+    __slots__ = ['handles', 'idle', '_options', '_clock', '_entries', '_stores', '_lock']
+
+    HANDLES = 16 # open databases kept before idle ones are closed
+    IDLE = 300.0 # seconds an unleased database stays open
+    TABLE = re.compile(r'[A-Za-z_][A-Za-z0-9_]{0,63}') # table names every engine accepts (SQLite needs identifiers)
+
+    def __init__(self, /, *, handles: int | None = None, idle: float | None = None, clock: Callable[[], float] = time.monotonic, **options) -> None:
+        '''
+        Parameters:
+        ----------
+        handles : int, optional
+            Cap on open databases.
+
+        idle : float, optional
+            Seconds an unleased database stays open.
+
+        clock : Callable, optional
+            Monotonic time source (injectable for tests).
+
+        **options
+            Passed to every `Yamel` opened (engine, codec, lock, capacity, cache).
+        '''
+        self.handles = handles or self.__class__.HANDLES
+        self.idle = self.__class__.IDLE if idle is None else idle
+        self._options = options
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._stores = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(path: str | Path, table: str) -> tuple[str, str]:
+        '''
+        Registry key of a table: its file's resolved path and its name.
+
+        Parameters:
+        ----------
+        path : str | Path
+            Database file.
+
+        table : str
+            Table name.
+
+        Returns:
+        -------
+        tuple
+            `(path, table)`.
+        '''
+        return str(Path(path).resolve()), table
+
+    # --- LEASES ---
+
+    @laufeyspawn(summoned = False)
+    def open(self, path: str | Path, table: str) -> Yamel:
+        '''
+        Lease a table's database, opening it if needed. Every `open` must be
+        matched by a `release`. Raises ValueError if `table` is not a valid
+        table name (see `TABLE`).
+
+        Parameters:
+        ----------
+        path : str | Path
+            Database file.
+
+        table : str
+            Table name.
+
+        Returns:
+        -------
+        Yamel
+            The open database.
+        '''
+        if not isinstance(table, str) or not self.__class__.TABLE.fullmatch(table):
+            raise ValueError(f'invalid table name: {table!r}')
+        key = self.key(path, table)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Handle(self._connect(*key), self._clock())
+                heimdahl(f'[OPEN TABLE] {table} ({len(self._entries)} open)', unveil = jotunbane, threat = 1)
+            self._entries.move_to_end(key)
+            entry.users += 1
+            entry.used = self._clock()
+            self._evict()
+            return entry.db
+
+    def release(self, path: str | Path, table: str) -> None:
+        '''
+        Return a lease taken by `open`.
+
+        Parameters:
+        ----------
+        path : str | Path
+            Database file.
+
+        table : str
+            Table name.
+        '''
+        key = self.key(path, table)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                # the registry was closed meanwhile
+                return
+            if not entry.users:
+                raise KeyError(f'no lease on {key}')
+            entry.users -= 1
+            entry.used = self._clock()
+            self._evict()
+
+    @contextmanager
+    def lease(self, path: str | Path, table: str) -> Iterator[Yamel]:
+        '''
+        Hold a table's database for the duration of a `with` block.
+
+        Parameters:
+        ----------
+        path : str | Path
+            Database file.
+
+        table : str
+            Table name.
+        '''
+        db = self.open(path, table)
+        try:
+            yield db
+        finally:
+            self.release(path, table)
+
+    def _connect(self, path: str, table: str) -> Yamel:
+        '''
+        Open a table on the shared storage of its file (registry lock held).
+        '''
+        store = self._stores.get(path)
+        if store is None:
+            options = {k: v for k, v in self._options.items() if k in ('engine', 'codec', 'lock')}
+            store = _Store(Yamel.connect(path, **options))
+        try:
+            db = Yamel(path = path, tb = table, store = store.db, guard = store.guard, **self._options)
+        except Exception:
+            if not store.tables and store.db is not None:
+                store.db.close()
+            raise
+        self._stores[path] = store
+        store.tables += 1
+        return db
+
+    def _disconnect(self, key: tuple[str, str], db: Yamel) -> None:
+        '''
+        Close a table, and its file once no other table uses it.
+        '''
+        db.close()
+        store = self._stores.get(key[0])
+        if store is None:
+            return
+        store.tables -= 1
+        if not store.tables:
+            del self._stores[key[0]]
+            if store.db is not None:
+                store.db.close()
+
+    # --- EVICTION ---
+
+    def _evict(self) -> int:
+        '''
+        Close unleased databases that are idle, or least recently used while
+        over the cap (registry lock held).
+
+        Returns:
+        -------
+        int
+            Number of databases closed.
+        '''
+        now = self._clock()
+        excess = len(self._entries) - self.handles
+        closed = 0
+        for key, entry in list(self._entries.items()):
+            if entry.users:
+                continue
+            if excess > 0 or now - entry.used >= self.idle:
+                del self._entries[key]
+                self._disconnect(key, entry.db)
+                excess -= 1
+                closed += 1
+                heimdahl(f'[CLOSE TABLE] {key[1]}', unveil = jotunbane, threat = 1)
+        return closed
+
+    def sweep(self) -> int:
+        '''
+        Close idle databases now (also done on every `open` and `release`).
+
+        Returns:
+        -------
+        int
+            Number of databases closed.
+        '''
+        with self._lock:
+            return self._evict()
+
+    def close(self) -> None:
+        '''
+        Close every open database, leased or not (shutdown).
+        '''
+        with self._lock:
+            entries, self._entries = self._entries, OrderedDict()
+            for key, entry in entries.items():
+                self._disconnect(key, entry.db)
+
+    def __contains__(self, key: tuple[str | Path, str]) -> bool:
+        '''
+        Whether a `(path, table)` database is open.
+        '''
+        return self.key(*key) in self._entries
+
+    def __len__(self) -> int:
+        '''
+        Number of open databases.
+        '''
+        return len(self._entries)
+
+__all__ = ['Registry']
@@ -0,0 +1,206 @@
+import bisect
+import threading
+from time import perf_counter
+from contextlib import contextmanager
+
+class Histogram:
+    '''
+    Fixed-bucket latency histogram (seconds).
+    '''
+    __slots__ = ['counts', 'count', 'total', 'max']
+
+    BOUNDS = (0.0001, 0.001, 0.01, 0.1, 1.0) # bucket upper bounds; one more bucket catches the rest
+    LABELS = ('<=0.1ms', '<=1ms', '<=10ms', '<=100ms', '<=1s', '>1s')
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(self.__class__.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        '''
+        Add one sample.
+
+        Parameters:
+        ----------
+        seconds : float
+            Duration to record.
+        '''
+        self.counts[bisect.bisect_left(self.__class__.BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def summary(self) -> dict[str, object]:
+        '''
+        Snapshot of the histogram.
+
+        Returns:
+        -------
+        dict
+            Bucket counts by label, plus sample count, mean and max (ms).
+        '''
+        return {
+            'buckets': dict(zip(self.__class__.LABELS, self.counts)),
+            'count': self.count,
+            'mean_ms': round(1000 * self.total / self.count, 3) if self.count else 0.0,
+            'max_ms': round(1000 * self.max, 3)
+        }
+
+class RWLock:
+    '''
+    Fair reader/writer lock with an update mode and contention metrics.
+
+    - `shared`: any number of readers at once.
+    - `update`: one writer at a time, granted in arrival order (FIFO
+      tickets), while readers keep running; slow storage I/O happens here.
+    - `exclusive`: an update holder upgrades to keep readers out for a short
+      critical section. New readers queue behind a pending upgrade, so a
+      steady read load cannot starve it.
+
+    `update` and `exclusive` are reentrant for the owning thread, which may
+    also read under its own lock. Every outermost acquisition records how
+    long it waited and how long it was held, per caller-supplied method name
+    and mode.
+    '''
+    __slots__ = ['_cv', '_readers', '_owner', '_depth', '_exclusive', '_pending', '_ticket', '_serving', '_stats', '_stats_lock']
+
+    def __init__(self) -> None:
+        self._cv = threading.Condition()
+        self._readers = 0
+        self._owner = None
+        self._depth = 0
+        self._exclusive = False
+        self._pending = 0
+        self._ticket = 0
+        self._serving = 0
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    @contextmanager
+    def shared(self, name: str = '?'):
+        '''
+        Hold the lock for reading.
+
+        Parameters:
+        ----------
+        name : str
+            Method name the metrics are recorded under.
+        '''
+        start = perf_counter()
+        with self._cv:
+            nested = self._owner == threading.get_ident()
+            if not nested:
+                while self._exclusive or self._pending:
+                    self._cv.wait()
+                self._readers += 1
+        acquired = perf_counter()
+        try:
+            yield
+        finally:
+            if not nested:
+                with self._cv:
+                    self._readers -= 1
+                    if not self._readers and self._pending:
+                        self._cv.notify_all()
+                self._record(name, 'shared', acquired - start, perf_counter() - acquired)
+
+    @contextmanager
+    def update(self, name: str = '?'):
+        '''
+        Hold the writer slot (readers still admitted).
+
+        Parameters:
+        ----------
+        name : str
+            Method name the metrics are recorded under.
+        '''
+        me = threading.get_ident()
+        start = perf_counter()
+        with self._cv:
+            nested = self._owner == me
+            if nested:
+                self._depth += 1
+            else:
+                ticket = self._ticket
+                self._ticket += 1
+                while self._owner is not None or ticket != self._serving:
+                    self._cv.wait()
+                self._serving += 1
+                self._owner = me
+                self._depth = 1
+        acquired = perf_counter()
+        try:
+            yield
+        finally:
+            with self._cv:
+                self._depth -= 1
+                if not self._depth:
+                    self._owner = None
+                    self._cv.notify_all()
+            if not nested:
+                self._record(name, 'update', acquired - start, perf_counter() - acquired)
+
+    @contextmanager
+    def exclusive(self, name: str = '?'):
+        '''
+        Hold the lock alone (takes the writer slot first if not held).
+
+        Parameters:
+        ----------
+        name : str
+            Method name the metrics are recorded under.
+        '''
+        with self.update(name):
+            start = perf_counter()
+            with self._cv:
+                nested = self._exclusive
+                if not nested:
+                    self._pending += 1
+                    while self._readers:
+                        self._cv.wait()
+                    self._pending -= 1
+                    self._exclusive = True
+            acquired = perf_counter()
+            try:
+                yield
+            finally:
+                if not nested:
+                    with self._cv:
+                        self._exclusive = False
+                        self._cv.notify_all()
+                    self._record(name, 'exclusive', acquired - start, perf_counter() - acquired)
+
+    def _record(self, name: str, mode: str, wait: float, hold: float) -> None:
+        '''
+        Add one acquisition to the metrics.
+        '''
+        with self._stats_lock:
+            waits, holds = self._stats.setdefault((name, mode), (Histogram(), Histogram()))
+            waits.record(wait)
+            holds.record(hold)
+
+    def stats(self) -> dict[str, dict[str, dict[str, object]]]:
+        '''
+        Wait-time and hold-time histograms per method and mode.
+
+        Returns:
+        -------
+        dict
+            `{method: {mode: {'wait': ..., 'hold': ...}}}`.
+        '''
+        with self._stats_lock:
+            out = {}
+            for (name, mode), (waits, holds) in sorted(self._stats.items()):
+                out.setdefault(name, {})[mode] = {'wait': waits.summary(), 'hold': holds.summary()}
+            return out
+
+    def reset(self) -> None:
+        '''
+        Drop the collected metrics.
+        '''
+        with self._stats_lock:
+            self._stats.clear()
+
+__all__ = ['RWLock', 'Histogram']
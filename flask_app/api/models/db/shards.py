@@ -0,0 +1,305 @@
+import re
+import heapq
+import hashlib
+import threading
+from pathlib import Path
+from tinydb import TinyDB
+from tinydb.table import Document, Table
+from .ystore import YStorage
+
+class ShardedTable:
+    '''
+    Routing layer that partitions a table into one TinyDB file per `phone`.
+
+    Shards live in `<path>.shards/`, one file per owner, so a write for one
+    phone only rewrites that owner's file. Document IDs stay globally unique:
+    the router hands them out and remembers which shard owns each one.
+    Exposes the subset of TinyDB's `Table` API used by `Yamel`.
+    '''
+    __slots__ = ['_dir', '_suffix', '_name', '_shards', '_owner', '_next', '_lock']
+
+    _SAFE = re.compile(r'^[\w@.+-]{1,64}$')
+
+    def __init__(self, path: str, tb: str) -> None:
+        '''
+        Open every existing shard and rebuild the document routing map.
+
+        Parameters:
+        ----------
+        path : str
+            Database file path; shards are stored next to it.
+
+        tb : str
+            Table name inside every shard.
+        '''
+        path = Path(path)
+        self._dir = Path(f'{path}.shards')
+        self._dir.mkdir(exist_ok = True)
+        self._suffix = path.suffix or '.yaml'
+        self._name = tb
+        self._shards = {}
+        self._owner = {}
+        self._next = 1
+        self._lock = threading.RLock()
+
+        for file in sorted(self._dir.glob(f'*{self._suffix}')):
+            table = TinyDB(str(file), storage = YStorage).table(tb)
+            docs = table.all()
+            if not docs:
+                continue
+            phone = docs[0]['phone']
+            self._shards[phone] = table
+            for doc in docs:
+                self._owner[doc.doc_id] = phone
+        if self._owner:
+            self._next = max(self._owner) + 1
+
+    @property
+    def name(self) -> str:
+        '''
+        Table name.
+
+        Returns:
+        -------
+        str
+            Name of the table inside every shard.
+        '''
+        return self._name
+
+    # --- ROUTING ---
+
+    def _shard(self, phone: str, /, *, create: bool = False) -> Table | None:
+        '''
+        Return the shard table for `phone`, optionally creating its file.
+
+        Parameters:
+        ----------
+        phone : str
+            Owner of the shard.
+
+        create : bool
+            Create the shard if it does not exist yet.
+
+        Returns:
+        -------
+        Table | None
+            Shard table, or None if missing and not created.
+        '''
+        if phone in self._shards or not create:
+            return self._shards.get(phone)
+
+        key = str(phone)
+        if not self.__class__._SAFE.match(key):
+            key = hashlib.sha1(key.encode()).hexdigest()
+        file = self._dir / f'{key}{self._suffix}'
+        file.touch()
+        self._shards[phone] = TinyDB(str(file), storage = YStorage).table(self._name)
+        return self._shards[phone]
+
+    def _by_shard(self, doc_ids: list[int]) -> dict[str, list[int]]:
+        '''
+        Group document IDs by the phone owning them.
+        '''
+        groups = {}
+        for doc_id in doc_ids:
+            if doc_id in self._owner:
+                groups.setdefault(self._owner[doc_id], []).append(doc_id)
+        return groups
+
+    # --- TABLE INTERFACE ---
+
+    def __iter__(self):
+        '''
+        Lazily merge every shard's documents in document-ID order.
+        '''
+        streams = [iter(sorted(shard.all(), key = lambda d: d.doc_id)) for shard in list(self._shards.values())]
+        return heapq.merge(*streams, key = lambda d: d.doc_id)
+
+    def all(self) -> list[Document]:
+        '''
+        Fetch every document across shards, ordered by document ID.
+
+        Returns:
+        -------
+        list
+            All documents.
+        '''
+        return list(self)
+
+    def insert(self, document: dict[str, object]) -> int:
+        '''
+        Insert a document into its owner's shard.
+
+        Parameters:
+        ----------
+        document : dict
+            Document with a `phone` field.
+
+        Returns:
+        -------
+        int
+            Global document ID.
+        '''
+        return self.insert_multiple([document])[0]
+
+    def insert_multiple(self, documents: list[dict[str, object]]) -> list[int]:
+        '''
+        Insert documents with one write per touched shard.
+
+        Parameters:
+        ----------
+        documents : list
+            Documents with a `phone` field.
+
+        Returns:
+        -------
+        list
+            Global document IDs in insertion order.
+        '''
+        ids, groups = [], {}
+        with self._lock:
+            for doc in documents:
+                doc_id = getattr(doc, 'doc_id', None) or self._next
+                self._next = max(self._next, doc_id + 1)
+                groups.setdefault(doc['phone'], []).append(Document(doc, doc_id))
+                self._owner[doc_id] = doc['phone']
+                ids.append(doc_id)
+            for phone, docs in groups.items():
+                self._shard(phone, create = True).insert_multiple(docs)
+        return ids
+
+    def update(self, fields: dict[str, object], doc_ids: list[int]) -> list[int]:
+        '''
+        Merge `fields` into the given documents, moving them if `phone` changes.
+
+        Parameters:
+        ----------
+        fields : dict
+            Fields and values to set.
+
+        doc_ids : list
+            Document IDs.
+
+        Returns:
+        -------
+        list
+            IDs of updated documents.
+        '''
+        with self._lock:
+            groups = self._by_shard(doc_ids)
+
+            updated = []
+            for phone, ids in groups.items():
+                if 'phone' in fields and fields['phone'] != phone:
+                    moved = [{**doc, **fields} for doc in self._shards[phone].get(doc_ids = ids)]
+                    self._shards[phone].remove(doc_ids = ids)
+                    self.insert_multiple([Document(doc, doc_id) for doc, doc_id in zip(moved, ids)])
+                else:
+                    self._shards[phone].update(fields, doc_ids = ids)
+                updated.extend(ids)
+        return updated
+
+    def update_docs(self, changes: dict[int, dict[str, object]]) -> list[int]:
+        '''
+        Merge different fields into several documents with one write per touched shard.
+
+        Documents whose `phone` changes are moved to their new owner's shard.
+
+        Parameters:
+        ----------
+        changes : dict
+            Fields to set, keyed by document ID.
+
+        Returns:
+        -------
+        list
+            IDs of updated documents.
+        '''
+        with self._lock:
+            updated, moved = [], []
+            for phone, ids in self._by_shard(list(changes)).items():
+                shard = self._shards[phone]
+                stay = [doc_id for doc_id in ids if changes[doc_id].get('phone', phone) == phone]
+                leave = [doc_id for doc_id in ids if changes[doc_id].get('phone', phone) != phone]
+                if leave:
+                    moved.extend(Document({**doc, **changes[doc.doc_id]}, doc.doc_id) for doc in shard.get(doc_ids = leave))
+                    shard.remove(doc_ids = leave)
+                if stay:
+                    def apply(table: dict, stay: list[int] = stay) -> None:
+                        for doc_id in stay:
+                            table[doc_id].update(changes[doc_id])
+                    shard._update_table(apply)
+                updated.extend(ids)
+            if moved:
+                self.insert_multiple(moved)
+        return updated
+
+    def apply(self, removed: list[int], changed: dict[int, dict[str, object]], added: list[dict[str, object]]) -> list[int]:
+        '''
+        Commit a unit of work (removals, replacements, inserts).
+
+        Shards are separate files, so this is one write per touched shard and
+        operation kind rather than a single atomic write.
+
+        Parameters:
+        ----------
+        removed : list
+            IDs of documents to delete.
+
+        changed : dict
+            Full replacement documents, keyed by document ID.
+
+        added : list
+            New documents.
+
+        Returns:
+        -------
+        list
+            IDs assigned to `added`, in order.
+        '''
+        with self._lock:
+            if removed:
+                self.remove(doc_ids = removed)
+            if changed:
+                self.update_docs(changed)
+            return self.insert_multiple(added) if added else []
+
+    def remove(self, doc_ids: list[int]) -> list[int]:
+        '''
+        Delete the given documents from their shards.
+
+        Parameters:
+        ----------
+        doc_ids : list
+            Document IDs.
+
+        Returns:
+        -------
+        list
+            IDs of removed documents.
+        '''
+        with self._lock:
+            removed = []
+            for phone, ids in self._by_shard(doc_ids).items():
+                self._shards[phone].remove(doc_ids = ids)
+                for doc_id in ids:
+                    del self._owner[doc_id]
+                removed.extend(ids)
+        return removed
+
+    def truncate(self) -> None:
+        '''
+        Empty every shard.
+        '''
+        with self._lock:
+            for shard in self._shards.values():
+                shard.truncate()
+            self._owner.clear()
+
+    def __len__(self) -> int:
+        '''
+        Number of documents across shards.
+        '''
+        return len(self._owner)
+
+__all__ = ['ShardedTable']
@@ -0,0 +1,328 @@
+import os
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from tinydb.table import Document
+from .ystore import load
+
+class SqliteTable:
+    '''
+    Stdlib `sqlite3` engine exposing the subset of TinyDB's `Table` API used by `Yamel`.
+
+    Each document is stored whole as JSON in `doc`; `id`, `phone` and `status`
+    are mirrored into indexed columns so equality filters on them use an index
+    instead of a full scan (for ad-hoc SQL and other readers of the file).
+    `Yamel` itself resolves lookups through its in-memory index and addresses
+    the table by document ID (the SQLite rowid).
+    '''
+    __slots__ = ['_conn', '_name', '_lock']
+
+    _COLUMNS = ('id', 'phone', 'status')
+
+    def __init__(self, path: str, tb: str) -> None:
+        '''
+        Open (or create) the database file and the table with its indexes.
+
+        Parameters:
+        ----------
+        path : str
+            Path to the SQLite database file.
+
+        tb : str
+            Table name.
+        '''
+        if not tb.isidentifier():
+            raise ValueError(f'invalid table name: {tb}')
+
+        self._name = tb
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(path), check_same_thread = False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        with self._conn:
+            self._conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{tb}" ('
+                'doc_id INTEGER PRIMARY KEY, id INTEGER, phone TEXT, status TEXT, doc TEXT NOT NULL)'
+            )
+            for col in self.__class__._COLUMNS:
+                self._conn.execute(f'CREATE INDEX IF NOT EXISTS "{tb}_{col}" ON "{tb}" ({col})')
+
+    @property
+    def name(self) -> str:
+        '''
+        Table name.
+
+        Returns:
+        -------
+        str
+            Name of the SQLite table.
+        '''
+        return self._name
+
+    # --- QUERIES ---
+
+    @staticmethod
+    def _where(doc_ids: list[int]) -> tuple[str, tuple]:
+        '''
+        SQL condition selecting documents by ID.
+
+        Filters never reach SQL: `Yamel`'s query planner resolves them on its
+        in-memory index (including operators SQL equality could not serve),
+        so the engine is only ever asked for document IDs.
+        '''
+        ids = tuple(doc_ids)
+        return f'doc_id IN ({",".join("?" * len(ids))})' if ids else '0', ids
+
+    def _select(self, clause: str, params: tuple) -> list[Document]:
+        '''
+        Run a SELECT and wrap rows as TinyDB `Document`s.
+        '''
+        with self._lock:
+            rows = self._conn.execute(f'SELECT doc_id, doc FROM "{self._name}" WHERE {clause} ORDER BY doc_id', params).fetchall()
+        return [Document(json.loads(doc), doc_id) for doc_id, doc in rows]
+
+    @staticmethod
+    def _values(doc: dict[str, object]) -> tuple:
+        '''
+        Column values (indexed fields + JSON body) for a document.
+        '''
+        return doc.get('id'), doc.get('phone'), doc.get('status'), json.dumps(dict(doc))
+
+    # --- TABLE INTERFACE ---
+
+    def all(self) -> list[Document]:
+        '''
+        Fetch every document ordered by document ID.
+
+        Returns:
+        -------
+        list
+            All documents.
+        '''
+        return self._select('1', ())
+
+    def insert(self, document: dict[str, object]) -> int:
+        '''
+        Insert a document, keeping its `doc_id` if it is a TinyDB `Document`.
+
+        Parameters:
+        ----------
+        document : dict
+            Document to insert.
+
+        Returns:
+        -------
+        int
+            Document ID.
+        '''
+        return self.insert_multiple([document])[0]
+
+    def insert_multiple(self, documents: list[dict[str, object]]) -> list[int]:
+        '''
+        Insert several documents in one transaction.
+
+        Parameters:
+        ----------
+        documents : list
+            Documents to insert.
+
+        Returns:
+        -------
+        list
+            Document IDs in insertion order.
+        '''
+        ids = []
+        with self._lock, self._conn:
+            for doc in documents:
+                cur = self._conn.execute(
+                    f'INSERT INTO "{self._name}" (doc_id, id, phone, status, doc) VALUES (?, ?, ?, ?, ?)',
+                    (getattr(doc, 'doc_id', None), *self._values(doc))
+                )
+                ids.append(cur.lastrowid)
+        return ids
+
+    def update(self, fields: dict[str, object], doc_ids: list[int]) -> list[int]:
+        '''
+        Merge `fields` into the given documents.
+
+        Parameters:
+        ----------
+        fields : dict
+            Fields and values to set.
+
+        doc_ids : list
+            Document IDs.
+
+        Returns:
+        -------
+        list
+            IDs of updated documents.
+        '''
+        clause, params = self._where(doc_ids)
+        with self._lock, self._conn:
+            rows = self._conn.execute(f'SELECT doc_id, doc FROM "{self._name}" WHERE {clause}', params).fetchall()
+            for doc_id, doc in rows:
+                doc = {**json.loads(doc), **fields}
+                self._conn.execute(
+                    f'UPDATE "{self._name}" SET id = ?, phone = ?, status = ?, doc = ? WHERE doc_id = ?',
+                    (*self._values(doc), doc_id)
+                )
+        return [doc_id for doc_id, _ in rows]
+
+    def update_docs(self, changes: dict[int, dict[str, object]]) -> list[int]:
+        '''
+        Merge different fields into several documents in one transaction.
+
+        Parameters:
+        ----------
+        changes : dict
+            Fields to set, keyed by document ID.
+
+        Returns:
+        -------
+        list
+            IDs of updated documents.
+        '''
+        clause, params = self._where(list(changes))
+        with self._lock, self._conn:
+            rows = self._conn.execute(f'SELECT doc_id, doc FROM "{self._name}" WHERE {clause}', params).fetchall()
+            self._conn.executemany(
+                f'UPDATE "{self._name}" SET id = ?, phone = ?, status = ?, doc = ? WHERE doc_id = ?',
+                [(*self._values({**json.loads(doc), **changes[doc_id]}), doc_id) for doc_id, doc in rows]
+            )
+        return [doc_id for doc_id, _ in rows]
+
+    def apply(self, removed: list[int], changed: dict[int, dict[str, object]], added: list[dict[str, object]]) -> list[int]:
+        '''
+        Commit a unit of work (removals, replacements, inserts) in one transaction.
+
+        Parameters:
+        ----------
+        removed : list
+            IDs of documents to delete.
+
+        changed : dict
+            Full replacement documents, keyed by document ID.
+
+        added : list
+            New documents.
+
+        Returns:
+        -------
+        list
+            IDs assigned to `added`, in order.
+        '''
+        ids = []
+        with self._lock, self._conn:
+            if removed:
+                clause, params = self._where(removed)
+                self._conn.execute(f'DELETE FROM "{self._name}" WHERE {clause}', params)
+            self._conn.executemany(
+                f'UPDATE "{self._name}" SET id = ?, phone = ?, status = ?, doc = ? WHERE doc_id = ?',
+                [(*self._values(doc), doc_id) for doc_id, doc in changed.items()]
+            )
+            for doc in added:
+                cur = self._conn.execute(
+                    f'INSERT INTO "{self._name}" (doc_id, id, phone, status, doc) VALUES (NULL, ?, ?, ?, ?)',
+                    self._values(doc)
+                )
+                ids.append(cur.lastrowid)
+        return ids
+
+    def remove(self, doc_ids: list[int]) -> list[int]:
+        '''
+        Delete the given documents.
+
+        Parameters:
+        ----------
+        doc_ids : list
+            Document IDs.
+
+        Returns:
+        -------
+        list
+            IDs of removed documents.
+        '''
+        clause, params = self._where(doc_ids)
+        with self._lock, self._conn:
+            removed = [r[0] for r in self._conn.execute(f'SELECT doc_id FROM "{self._name}" WHERE {clause}', params)]
+            self._conn.execute(f'DELETE FROM "{self._name}" WHERE {clause}', params)
+        return removed
+
+    def truncate(self) -> None:
+        '''
+        Delete every document in the table.
+        '''
+        with self._lock, self._conn:
+            self._conn.execute(f'DELETE FROM "{self._name}"')
+
+    def close(self) -> None:
+        '''
+        Close the connection.
+        '''
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        '''
+        Number of documents in the table.
+        '''
+        with self._lock:
+            return self._conn.execute(f'SELECT COUNT(*) FROM "{self._name}"').fetchone()[0]
+
+    def __iter__(self):
+        '''
+        Iterate over every document.
+        '''
+        return iter(self.all())
+
+def migrate(src: str | Path, dst: str | Path, /, *, overwrite: bool = False) -> Path:
+    '''
+    Copy every table of a YAML/JSON/msgpack (TinyDB) store into a SQLite file.
+
+    Document IDs are preserved and the source is left untouched.
+
+    Parameters:
+    ----------
+    src : str | Path
+        Existing TinyDB store (pending journal records are folded in).
+
+    dst : str | Path
+        Target SQLite file.
+
+    overwrite : bool
+        Replace `dst` if it already exists.
+
+    Returns:
+    -------
+    Path
+        Path of the SQLite database.
+    '''
+    dst = Path(dst)
+    if dst.exists():
+        if not overwrite:
+            raise FileExistsError(f'filepath: {dst}')
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(f'{dst}{suffix}'):
+                os.remove(f'{dst}{suffix}')
+
+    for tb, docs in load(src).items():
+        table = SqliteTable(str(dst), tb)
+        table.insert_multiple([Document(doc, int(k)) for k, doc in docs.items()])
+        if len(table) != len(docs):
+            raise RuntimeError(f'migration mismatch in table: {tb}')
+        table.close()
+    return dst
+
+__all__ = ['SqliteTable', 'migrate']
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description = 'Migrate a TinyDB store into SQLite.')
+    parser.add_argument('src', help = 'existing database file (.yaml, .json, .msgpack)')
+    parser.add_argument('dst', help = 'target SQLite file')
+    parser.add_argument('--overwrite', action = 'store_true', help = 'replace dst if it exists')
+    args = parser.parse_args()
+    print(migrate(args.src, args.dst, overwrite = args.overwrite))
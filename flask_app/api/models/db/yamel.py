@@ -1,17 +1,42 @@
-from tinydb import TinyDB, Query
-from tinydb.queries import QueryInstance
+import heapq
+import threading
+from typing import Iterator
+from contextlib import AbstractContextManager, nullcontext, contextmanager
+from tinydb import TinyDB
+from tinydb.table import Table
 from .ystore import YStorage
+from .journal import JStorage
+from .middlewares import WriteBack
+from .sqlite import SqliteTable
+from .shards import ShardedTable
+from .allocator import IdAllocator
+from .index import HashIndex
+from .planner import QueryPlanner
+from .cache import ResultCache
+from .rwlock import RWLock
+from .feed import ChangeFeed, Subscription
 from .memcell import memcell
-from api.utils import Highlander
 from api.utils.debuggernaut import heimdahl, laufeyspawn, jotunbane
 
-class Yamel(metaclass = Highlander):
+class Yamel:
     
-    __slots__ = ('_db', '_query', '_ids')
+    __slots__ = ('_db', '_ids', '_index', '_head', '_rw', '_guard', '_shared', '_owner', '_gen', '_capacity', '_version', '_cache', '_txn', '_feed', '_events', '_closed')
     _MAX_CELLS = 10
+    _INDEXED = ('id', 'phone', 'status')
+    _TEXT = 'task' # full-text indexed field
+    _TALLY = ('phone', 'status') # counted per owner and status
+    _ENGINES = {
+        'yaml': YStorage,
+        'journal': JStorage,
+        'cache': lambda *args, **kwargs: WriteBack(YStorage)(*args, **kwargs)
+    }
+    _TABLES = {
+        'sqlite': SqliteTable,
+        'shards': ShardedTable
+    }
 
     @laufeyspawn(summoned = True)
-    def __init__(self, /, *, path: str | None = None, tb : str | None = None) -> None:
+    def __init__(self, /, *, path: str | None = None, tb : str | None = None, engine: str = 'yaml', codec: str | None = None, lock: bool = False, capacity: int | None = None, cache: bool = True, store: TinyDB | None = None, guard: AbstractContextManager | None = None) -> None:
         '''
         Initialize the TinyDB instance with YAML storage.
 
@@ -19,59 +44,322 @@ class Yamel(metaclass = Highlander):
         ----------
         path : str
             Path to the YAML database file.
+
+        tb : str
+            Name of the table holding memcells.
+
+        engine : str
+            Storage engine: 'yaml' (whole-file rewrites), 'journal' (append-only log),
+            'cache' (in-memory with debounced write-back), 'sqlite' (indexed SQLite file)
+            or 'shards' (one file per phone).
+
+        codec : str, optional
+            File codec ('yaml', 'json', 'msgpack'); inferred from `path` when omitted.
+
+        lock : bool
+            Share the file with other worker processes ('yaml' engine only).
+
+        capacity : int, optional
+            Per-phone quota: highest memcell ID an owner may be handed
+            (default: cls._MAX_CELLS).
+
+        cache : bool
+            Cache `all`/`where` results between writes.
+
+        store : TinyDB, optional
+            Database file already opened by `connect` and shared with other
+            tables; it stays open when this table is closed.
+
+        guard : AbstractContextManager, optional
+            Reentrant write lock shared by every table of the same file, so their
+            read-modify-writes of the file never interleave.
         '''
         assert tb is not None, 'tb cannot be None'
         assert path is not None, 'path cannot be None'
 
-        db = TinyDB(path, storage = YStorage)
-        self._db = db.table(tb)
-        self._query = Query()
-        self._ids = self._available_ids()
+        self._shared = store is not None
+        if engine in self.__class__._TABLES:
+            self._db = self.__class__._TABLES[engine](path, tb)
+        else:
+            # an empty TinyDB is falsy, so `store or ...` would not do
+            if store is None:
+                store = self.__class__.connect(path, engine = engine, codec = codec, lock = lock)
+            self._db = store.table(tb)
+        self._guard = guard or threading.RLock()
+        self._capacity = capacity or self.__class__._MAX_CELLS
+        self._gen = self._generation()
+        self._version = 0
+        self._head = None
+        self._rw = RWLock()
+        self._owner = None
+        self._cache = ResultCache() if cache else None
+        self._txn = None
+        self._feed = ChangeFeed()
+        self._events = []
+        self._closed = False
+        with self._guard:
+            self._rebuild()
         heimdahl(f'[INIT YAMEL] ', unveil = jotunbane, threat = 2)
 
-    @property
-    def next_id(self) -> int:
+    @classmethod
+    def connect(cls, path: str, /, *, engine: str = 'yaml', codec: str | None = None, lock: bool = False) -> TinyDB | None:
         '''
-        Get the next available ID.
+        Open a database file for the TinyDB engines.
+
+        Parameters:
+        ----------
+        path : str
+            Path to the database file.
+
+        engine : str
+            Storage engine (see `__init__`).
+
+        codec : str, optional
+            File codec; inferred from `path` when omitted.
+
+        lock : bool
+            Share the file with other worker processes ('yaml' engine only).
+
+        Returns:
+        -------
+        TinyDB | None
+            The open database, or None for engines that open per table
+            ('sqlite', 'shards').
+        '''
+        assert engine in cls._ENGINES or engine in cls._TABLES, f'unknown engine: {engine}'
+        assert not lock or engine == 'yaml', 'cross-process locking requires the yaml engine'
+
+        if engine in cls._TABLES:
+            return None
+        if lock:
+            return TinyDB(path, storage = cls._ENGINES[engine], codec = codec, lock = True)
+        return TinyDB(path, storage = cls._ENGINES[engine], codec = codec)
+
+    def next_id(self, phone: str) -> int:
+        '''
+        Take the lowest available ID from `phone`'s own pool.
+
+        Memcell IDs are short per-owner numbers (what SMS commands refer to);
+        the storage document ID is the global key.
+
+        Parameters:
+        ----------
+        phone : str
+            Owner of the new memcell.
 
         Returns:
         -------
         int
-            Next ID from the available list.
+            Next ID, or -1 when the owner's quota is used up.
         '''
-        if not self._available_ids():
-            return -1
+        return self._pool(phone).allocate()
 
-        try:
-            return self._ids.pop(0)
-        except IndexError:
-            return 1
+    def usage(self, phone: str) -> dict[str, int]:
+        '''
+        Quota usage of one owner, from the current snapshot (never waits
+        for a writer).
+
+        Parameters:
+        ----------
+        phone : str
+            Owner to report on.
+
+        Returns:
+        -------
+        dict
+            Used and free slots and the quota.
+        '''
+        index, _ = self._pin('usage')
+        pool = IdAllocator((index.get(doc_id)['id'] for doc_id in index.bucket('phone', phone)), self._capacity)
+        return {'used': pool.used, 'free': len(pool), 'quota': pool.capacity}
+
+    def _pool(self, phone: str) -> IdAllocator:
+        '''
+        ID pool of one owner, built on first use from the `phone` index.
+
+        Parameters:
+        ----------
+        phone : str
+            Owner of the pool.
+
+        Returns:
+        -------
+        IdAllocator
+            The owner's allocator.
+        '''
+        pool = self._ids.get(phone)
+        if pool is None:
+            doc_ids = self._index.lookup({'phone': phone}) or []
+            pool = self._ids[phone] = IdAllocator((self._index.get(doc_id)['id'] for doc_id in doc_ids), self._capacity)
+        return pool
+
+    def _release(self, doc: dict[str, object]) -> None:
+        '''
+        Hand a removed memcell's ID back to its owner's pool.
+        '''
+        self._pool(doc['phone']).release(doc['id'])
     
     @property
     def all(self) -> list[dict[str, object]]:
         '''
-        Fetch all records from the database.
+        Fetch all records from the database, sorted by ID, then owner.
+
+        The list is cached until the next write and shared between callers,
+        so it must not be mutated.
 
         Returns:
         -------
         list
             All stored records.
         '''
-        results = self._db.all()
-        return sorted([memcell(doc) for doc in results], key = lambda d: d['id'])
-    
+        index, version = self._pin('all')
+        compute = lambda: sorted((memcell(doc) for _, doc in index.items()), key = lambda d: (d['id'], str(d['phone'])))
+        return self._cached('all', None, compute, version)
+
+    def iter_all(self, /, *, after: int | tuple[int, str] | None = None, limit: int | None = None, phone: str | None = None, filters: dict[str, object] | None = None) -> Iterator[memcell]:
+        '''
+        Lazily yield records in `(id, phone)` order, one page at a time if asked.
+
+        Only the sort keys are ordered up front; each record is wrapped as it
+        is consumed, so a caller streaming the result never holds the whole
+        listing.
+
+        Parameters:
+        ----------
+        after : int | tuple, optional
+            Cursor: only yield records after this ID, or after this
+            `(id, phone)` position (IDs repeat across owners).
+
+        limit : int, optional
+            Maximum number of records to yield.
+
+        phone : str, optional
+            Only list this owner's records.
+
+        filters : dict, optional
+            Further conditions, as taken by `where`.
+
+        Returns:
+        -------
+        Iterator[memcell]
+            Records ordered by ID, then owner.
+        '''
+        index, _ = self._pin('iter_all')
+        filters = {**(filters or {}), **({'phone': phone} if phone is not None else {})}
+        if filters:
+            docs = ((doc_id, index.get(doc_id)) for doc_id in self._lookup(filters, index))
+        else:
+            docs = index.items()
+        if isinstance(after, int):
+            after = (after, None)
+
+        keys = []
+        for doc_id, doc in docs:
+            key = (doc.get('id'), str(doc.get('phone')), doc_id)
+            if not isinstance(key[0], int):
+                continue
+            if after is None or key[0] > after[0] or (key[0] == after[0] and after[1] is not None and key[1] > after[1]):
+                keys.append(key)
+        keys = heapq.nsmallest(limit, keys) if limit is not None else sorted(keys)
+
+        for _, _, doc_id in keys:
+            yield memcell(index.get(doc_id))
+
+    @property
+    def cache_stats(self) -> dict[str, int] | None:
+        '''
+        Result cache counters.
+
+        Returns:
+        -------
+        dict | None
+            Hits, misses, evictions and size, or None if caching is disabled.
+        '''
+        return self._cache.stats if self._cache is not None else None
+
+    def scan(self, filters: dict[str, object] | None = None) -> Iterator[memcell]:
+        '''
+        Lazily yield records (optionally filtered) from the current snapshot.
+
+        Inside a transaction its own thread scans the uncommitted state.
+
+        Parameters:
+        ----------
+        filters : dict, optional
+            Conditions to match, as taken by `where`.
+
+        Returns:
+        -------
+        Iterator[memcell]
+            Matching records.
+        '''
+        index, _ = self._pin('scan')
+        plan = QueryPlanner(index).plan(filters or {})
+        for _, doc in index.items():
+            if plan.matches(doc):
+                yield memcell(doc)
+
+    def _documents(self) -> Iterator[tuple[int, dict[str, object]]]:
+        '''
+        Yield raw `(doc_id, document)` pairs straight from the engine.
+
+        Returns:
+        -------
+        Iterator[tuple[int, dict]]
+            Stored documents with their storage IDs.
+        '''
+        if isinstance(self._db, Table) and isinstance(self._db.storage, (YStorage, JStorage)):
+            return ((int(doc_id), doc) for doc_id, doc in self._db.storage.stream(self._db.name))
+        return ((doc.doc_id, doc) for doc in self._db)
+
     @laufeyspawn(summoned = False)
-    def _available_ids(self) -> list[int]:
+    def _rebuild(self) -> None:
+        '''
+        Rebuild the ID pool and the secondary indexes from the stored records
+        (once per open or external write).
         '''
-        Find all unused IDs from 1 to cls._max_cells.
+        self._index = HashIndex(self.__class__._INDEXED, self._documents(), text = self.__class__._TEXT, tally = self.__class__._TALLY)
+        self._ids = {}
+        self._publish()
+
+    def _lookup(self, filters: dict[str, object], index: HashIndex | None = None) -> list[int]:
+        '''
+        Resolve filters to storage document IDs through the query planner.
+
+        The index mirrors every document (including uncommitted ones inside
+        a transaction), so storage is never searched.
+
+        Parameters:
+        ----------
+        filters : dict
+            Conditions to match, as taken by `where`.
+
+        index : HashIndex, optional
+            Snapshot to read (default: the writer's working index).
 
         Returns:
-        --------
-        list[int]
-            Sorted list of available IDs.
+        -------
+        list
+            Matching document IDs.
         '''
-        used = {cell['id'] for cell in self.all if 'id' in cell}
-        return sorted([i for i in range(1, self.__class__._MAX_CELLS + 1) if i not in used])
+        return QueryPlanner(self._index if index is None else index).plan(filters).run()
+
+    def explain(self, filters: dict[str, object]) -> dict[str, object]:
+        '''
+        Show how `where(filters)` would be executed.
+
+        Parameters:
+        ----------
+        filters : dict
+            Conditions, as taken by `where`.
+
+        Returns:
+        -------
+        dict
+            Plan description (see `Plan.explain`).
+        '''
+        index, _ = self._pin('explain')
+        return QueryPlanner(index).plan(filters).explain()
     
     @laufeyspawn(summoned = False)
     def clear(self) -> None:
@@ -88,11 +376,19 @@ class Yamel(metaclass = Highlander):
         if pin != self._PIN:
             return print('[ABORTING]')
             
-        self._db.truncate()
+        with self._locked('clear'):
+            if self._txn is not None:
+                self._remove([doc_id for doc_id, _ in self._index.items()])
+            else:
+                self._db.truncate()
+            self._index.clear()
+            self._ids = {}
+            self._emit('reset')
+            self._touch()
         print('[DELETED]')
 
     @laufeyspawn(summoned = True)
-    def create(self, phone: str, task: str) -> int | str:
+    def create(self, phone: str, task: str, due: float | None = None) -> int | str:
         '''
         Create a memcell with auto-assigned ID from available pool.
 
@@ -104,17 +400,29 @@ class Yamel(metaclass = Highlander):
         task : str
             Task description.
 
+        due : float, optional
+            Reminder time as a Unix timestamp.
+
         Returns:
         --------
-        int
-            TinyDB internal document ID.
+        dict
+            Owner-scoped ID and task of the new memcell.
         '''
-        mem_id = self.next_id
-        if mem_id < 0:
-            raise RuntimeError('No memcell slots available (max = 10).')
+        with self._locked('create'):
+            self._sync()
+            mem_id = self.next_id(phone)
+            if mem_id < 0:
+                raise RuntimeError(f'No memcell slots available for {phone} (max = {self._capacity}).')
 
-        cell = memcell(id = mem_id, phone = phone, task = task, status = 'pending')
-        self._db.insert(cell)
+            try:
+                cell = memcell(id = mem_id, phone = phone, task = task, status = 'pending', due = due)
+                doc_id, = self._insert([cell])
+            except Exception:
+                self._pool(phone).release(mem_id)
+                raise
+            self._index.add(doc_id, cell)
+            self._emit('insert', cell)
+            self._touch()
         cell = {k: cell[k] for k in ('id', 'task')}
         return cell
 
@@ -123,25 +431,90 @@ class Yamel(metaclass = Highlander):
         '''
         Fetch records that match given filters.
 
+        A plain value matches by equality; a mapping of operators (`eq`,
+        `in`, `gt`, `gte`, `lt`, `lte`, `prefix`) gives richer conditions,
+        e.g. `{'phone': 'alice', 'due': {'lt': 1700000000}}`. All conditions
+        must hold.
+
         Parameters:
         ----------
         filters : dict
-            Field-value pairs to match.
+            Field-condition pairs to match.
 
         Returns:
         -------
         list
-            Matching records.
+            Matching records (cached until the next write; do not mutate).
         '''
-        q = self._build_query(filters)
-        results = self._db.search(q)
-        return [memcell(doc) for doc in results]
+        index, version = self._pin('where')
+        return self._cached('where', filters, lambda: self._search(filters, index), version)
+
+    def _search(self, filters: dict[str, object], index: HashIndex) -> list[memcell]:
+        '''
+        Uncached `where` against one snapshot.
+        '''
+        return [memcell(index.get(doc_id)) for doc_id in self._lookup(filters, index)]
+
+    def search(self, query: str, phone: str | None = None) -> list[dict[str, object]]:
+        '''
+        Full-text search over task text.
+
+        Every word of `query` has to appear in the task, each matching as a
+        prefix and ignoring case ('buy mil' finds 'Buy milk').
+
+        Parameters:
+        ----------
+        query : str
+            Words to look for.
+
+        phone : str, optional
+            Only search this owner's records.
+
+        Returns:
+        -------
+        list
+            Matching records sorted by ID, then owner (cached until the next
+            write; do not mutate).
+        '''
+        index, version = self._pin('search')
+        def compute():
+            docs = (index.get(doc_id) for doc_id in index.search(query))
+            hits = [memcell(doc) for doc in docs if phone is None or doc.get('phone') == phone]
+            return sorted(hits, key = lambda d: (d['id'], str(d['phone'])))
+        return self._cached('search', {'q': query, 'phone': phone}, compute, version)
+
+    def stats(self, phone: str | None = None) -> dict[str, object]:
+        '''
+        Record counts, kept up to date by every write (no table scan).
+
+        Parameters:
+        ----------
+        phone : str, optional
+            Only count this owner's records.
+
+        Returns:
+        -------
+        dict
+            `total` and `by_status` counts; without `phone`, also `by_phone`.
+        '''
+        index, _ = self._pin('stats')
+        if phone is not None:
+            by_status = index.tally(phone)
+            return {'total': sum(by_status.values()), 'by_status': by_status}
+        return {
+            'total': len(index),
+            'by_status': {status: len(index.bucket('status', status)) for status in index.values('status')},
+            'by_phone': {owner: len(index.bucket('phone', owner)) for owner in index.values('phone')}
+        }
 
     @laufeyspawn(summoned = True)
-    def update(self, updates: dict[str, object], filters: dict[str, object]) -> int:
+    def update(self, updates: dict[str, object], filters: dict[str, object]) -> list[int]:
         '''
         Update matching records with new data.
 
+        Changing `id` or `phone` is rejected with ValueError if it would give
+        two memcells the same ID under one owner.
+
         Parameters:
         ----------
         updates : dict
@@ -152,14 +525,35 @@ class Yamel(metaclass = Highlander):
 
         Returns:
         -------
-        int
-            Number of records updated.
+        list
+            Document IDs of the updated records (empty if none matched).
         '''
-        q = self._build_query(filters)
-        return self._db.update(updates, q)
+        with self._locked('update'):
+            self._sync()
+            doc_ids = self._lookup(filters)
+            if not doc_ids:
+                return []
+
+            for doc_id in doc_ids:
+                try:
+                    memcell({**self._index.get(doc_id), **updates})
+                except (TypeError, ValueError, AssertionError) as e:
+                    raise ValueError(f'memcell {self._index.get(doc_id).get("id")}: {e}') from e
+            if 'id' in updates or 'phone' in updates:
+                self._check_keys({doc_id: {**self._index.get(doc_id), **updates} for doc_id in doc_ids})
+            self._update_docs({doc_id: updates for doc_id in doc_ids})
+            updated = doc_ids
+            for doc_id in doc_ids:
+                self._index.add(doc_id, {**self._index.get(doc_id), **updates})
+                self._emit('update', self._index.get(doc_id))
+            if 'id' in updates or 'phone' in updates:
+                # ids or owners were rewritten in place; pools are rebuilt on next use
+                self._ids = {}
+            self._touch()
+        return updated
 
     @laufeyspawn(summoned = True)
-    def delete(self, filters: dict[str, object]) -> int:
+    def delete(self, filters: dict[str, object]) -> dict[str, object] | int:
         '''
         Delete memcells matching filters and reclaim their IDs.
 
@@ -170,42 +564,606 @@ class Yamel(metaclass = Highlander):
 
         Returns:
         -------
-        int
-            Number of records deleted.
+        dict | int
+            `{'id', 'task'}` of the first deleted record, or -1 if none matched.
         '''
         cell = {}
-        matches = self.where(filters)
-        if not matches:
-            return -1
+        with self._locked('delete'):
+            self._sync()
+            doc_ids = self._lookup(filters)
+            if not doc_ids:
+                return -1
 
-        cell['id'] = matches[0].get('id', -1)
-        cell['task'] = matches[0].get('task', -1)
-        if cell['id'] != -1:
-            self._ids.append(cell['id'])
-            self._ids.sort()
+            matches = [self._index.get(doc_id) for doc_id in doc_ids]
+            cell['id'] = matches[0].get('id', -1)
+            cell['task'] = matches[0].get('task', -1)
 
-        self._db.remove(self._build_query(filters))
+            self._remove(doc_ids)
+            for doc_id, match in zip(doc_ids, matches):
+                self._index.discard(doc_id)
+                self._release(match)
+                self._emit('delete', match)
+            self._touch()
         return cell
 
-    def _build_query(self, filters: dict[str, object]) -> QueryInstance:
+    def _check_keys(self, docs: dict[int, dict[str, object]]) -> None:
         '''
-        Build a TinyDB query from filter conditions.
+        Reject rewritten records that would share an `(id, phone)` pair with
+        each other or with any record left as it is.
 
         Parameters:
         ----------
-        filters : dict
-            Field-value pairs to match.
+        docs : dict
+            Records as they would be after the write, keyed by document ID.
+        '''
+        seen = set()
+        for doc_id, doc in docs.items():
+            key = (doc.get('id'), doc.get('phone'))
+            taken = any(other not in docs for other in self._lookup({'id': key[0], 'phone': key[1]}))
+            if key in seen or taken:
+                raise ValueError(f'memcell {key[0]} already exists for {key[1]}')
+            seen.add(key)
+
+    # --- BULK OPERATIONS ---
+
+    @laufeyspawn(summoned = True)
+    def create_many(self, items: list[dict[str, str]]) -> list[dict[str, object]]:
+        '''
+        Create several memcells with a single storage write.
+
+        Every item is validated and every ID allocated before anything is
+        written; if one item is invalid or the pool runs out, nothing is stored.
+
+        Parameters:
+        ----------
+        items : list
+            Dicts with `phone`, `task` and optionally `due`.
+
+        Returns:
+        -------
+        list
+            `{'id', 'task'}` of each created memcell, in input order.
+        '''
+        for i, item in enumerate(items):
+            try:
+                memcell(id = 0, phone = item['phone'], task = item['task'], due = item.get('due'))
+            except (KeyError, TypeError, ValueError, AssertionError) as e:
+                raise ValueError(f'item {i}: {e}') from e
+
+        with self._locked('create_many'):
+            self._sync()
+            cells = []
+            for item in items:
+                mem_id = self.next_id(item['phone'])
+                if mem_id < 0:
+                    for cell in cells:
+                        self._release(cell)
+                    raise RuntimeError(f'No memcell slots available for {item["phone"]} (max = {self._capacity}).')
+                cells.append(memcell(id = mem_id, phone = item['phone'], task = item['task'], status = 'pending', due = item.get('due')))
+
+            try:
+                doc_ids = self._insert(cells) if cells else []
+            except Exception:
+                for cell in cells:
+                    self._release(cell)
+                raise
+            for doc_id, cell in zip(doc_ids, cells):
+                self._index.add(doc_id, cell)
+                self._emit('insert', cell)
+            self._touch()
+        return [{'id': cell['id'], 'task': cell['task']} for cell in cells]
+
+    @laufeyspawn(summoned = True)
+    def update_many(self, changes: list[tuple[dict[str, object], dict[str, object]]]) -> list[int]:
+        '''
+        Apply several `(updates, filters)` pairs with a single storage write.
+
+        Filters are all resolved against the state before the batch; when
+        several pairs touch the same record, later updates win. As with
+        `update`, nothing is written if the result would repeat an
+        `(id, phone)` pair.
+
+        Parameters:
+        ----------
+        changes : list
+            `(updates, filters)` pairs, as taken by `update`.
+
+        Returns:
+        -------
+        list
+            Number of records matched by each pair, in input order.
+        '''
+        with self._locked('update_many'):
+            self._sync()
+            plan, counts = {}, []
+            for updates, filters in changes:
+                doc_ids = self._lookup(filters)
+                for doc_id in doc_ids:
+                    plan.setdefault(doc_id, {}).update(updates)
+                counts.append(len(doc_ids))
+
+            merged = {doc_id: {**self._index.get(doc_id), **fields} for doc_id, fields in plan.items()}
+            for doc in merged.values():
+                try:
+                    memcell(doc)
+                except (TypeError, ValueError, AssertionError) as e:
+                    raise ValueError(f'memcell {doc.get("id")}: {e}') from e
+            if any('id' in fields or 'phone' in fields for fields in plan.values()):
+                self._check_keys(merged)
+
+            if plan:
+                self._update_docs(plan)
+            for doc_id, doc in merged.items():
+                self._index.add(doc_id, doc)
+                self._emit('update', doc)
+            if any('id' in fields or 'phone' in fields for fields in plan.values()):
+                self._ids = {}
+            self._touch()
+        return counts
+
+    @laufeyspawn(summoned = True)
+    def delete_many(self, filters: list[dict[str, object]]) -> list[dict[str, object] | None]:
+        '''
+        Delete the records matching any of several filters with a single storage write.
+
+        Parameters:
+        ----------
+        filters : list
+            Filter dicts, as taken by `delete`.
+
+        Returns:
+        -------
+        list
+            `{'id', 'task'}` of the first record each filter matched (None if
+            it matched nothing), in input order.
+        '''
+        with self._locked('delete_many'):
+            self._sync()
+            results, doomed = [], {}
+            for f in filters:
+                doc_ids = self._lookup(f)
+                first = self._index.get(doc_ids[0]) if doc_ids else None
+                results.append({'id': first['id'], 'task': first['task']} if first else None)
+                doomed.update(dict.fromkeys(doc_ids))
+
+            if doomed:
+                self._remove(list(doomed))
+            for doc_id in doomed:
+                doc = self._index.get(doc_id)
+                self._release(doc)
+                self._index.discard(doc_id)
+                self._emit('delete', doc)
+            self._touch()
+        return results
+
+    # --- TRANSACTIONS ---
+
+    @contextmanager
+    def transaction(self) -> Iterator['Yamel']:
+        '''
+        Unit of work: buffer every mutation in memory and commit them in one write.
+
+        Reads inside the block see the uncommitted changes. On a clean exit
+        the net effect is written to storage at once and the change-feed
+        events are published; if the block (or the commit) raises, nothing is
+        written or published and the in-memory state is rolled back. Nested
+        blocks join the outermost transaction.
+
+        Other threads keep reading the last committed snapshot, and their
+        writes wait until the transaction ends.
+
+        Returns:
+        -------
+        Yamel
+            This database.
+        '''
+        if self._txn is not None and self._owner == threading.get_ident():
+            yield self
+            return
+
+        with self._locked('transaction'):
+            self._sync()
+            self._txn = {}
+            self._owner = threading.get_ident()
+            try:
+                yield self
+                self._commit()
+            except BaseException:
+                self._rollback()
+                self._events.clear()
+                raise
+            finally:
+                self._txn = None
+                self._owner = None
+                self._touch()
+            self._flush_events()
+
+    def _commit(self) -> None:
+        '''
+        Write the net effect of the open transaction to storage.
+        '''
+        removed, changed, added = [], {}, []
+        for doc_id, original in self._txn.items():
+            doc = self._index.get(doc_id)
+            if doc is None and original is not None:
+                removed.append(doc_id)
+            elif doc is not None and original is None:
+                added.append((doc_id, doc))
+            elif doc is not None and doc != original:
+                changed[doc_id] = doc
+        if not (removed or changed or added):
+            return
+
+        doc_ids = self._apply(removed, changed, [doc for _, doc in added])
+        # swap the placeholder IDs of new documents for the real ones
+        for (temp, doc), doc_id in zip(added, doc_ids):
+            self._index.discard(temp)
+            self._index.add(doc_id, doc)
+
+    def _rollback(self) -> None:
+        '''
+        Restore the in-memory state from before the open transaction: the
+        last published snapshot is still intact, so the working index is
+        simply forked from it again.
+        '''
+        self._index = self._head[0].fork()
+        self._ids = {}
+
+    def _apply(self, removed: list[int], changed: dict[int, dict[str, object]], added: list[dict[str, object]]) -> list[int]:
+        '''
+        Persist removals, full-document replacements and inserts in one write.
+
+        Parameters:
+        ----------
+        removed : list
+            Document IDs to delete.
+
+        changed : dict
+            Replacement documents keyed by document ID.
+
+        added : list
+            New documents.
+
+        Returns:
+        -------
+        list
+            Document IDs assigned to `added`.
+        '''
+        if not isinstance(self._db, Table):
+            return self._db.apply(removed, changed, added)
+
+        doc_ids = []
+        def apply(table: dict) -> None:
+            next_id = max([*table, *removed, (self._db._next_id or 1) - 1], default = 0) + 1
+            for doc_id in removed:
+                table.pop(doc_id, None)
+            for doc_id, doc in changed.items():
+                table[doc_id] = dict(doc)
+            for doc in added:
+                table[next_id] = dict(doc)
+                doc_ids.append(next_id)
+                next_id += 1
+            self._mark(doc_ids)
+        self._mark([*removed, *changed])
+        self._db._update_table(apply)
+        self._db._next_id = None
+        return doc_ids
+
+    # --- STORAGE WRITES ---
+
+    def _insert(self, cells: list[memcell]) -> list[int]:
+        '''
+        Insert documents, or stage them under placeholder IDs inside a transaction.
+
+        Parameters:
+        ----------
+        cells : list
+            Documents to insert.
+
+        Returns:
+        -------
+        list
+            Document IDs (negative placeholders while a transaction is open).
+        '''
+        if self._txn is None:
+            if isinstance(self._db, Table):
+                # IDs are picked by `_apply`, so a journal can be told about them
+                return self._apply([], {}, cells)
+            return self._db.insert_multiple(cells)
+
+        doc_ids = []
+        for _ in cells:
+            # the transaction log only grows, so its size never repeats as a placeholder
+            doc_id = -(len(self._txn) + 1)
+            self._txn[doc_id] = None
+            doc_ids.append(doc_id)
+        return doc_ids
+
+    def _remove(self, doc_ids: list[int]) -> None:
+        '''
+        Delete documents, or only journal them inside a transaction.
+
+        Parameters:
+        ----------
+        doc_ids : list
+            Document IDs to delete.
+        '''
+        if self._txn is None:
+            self._mark(doc_ids)
+            self._db.remove(doc_ids = doc_ids)
+            return
+        for doc_id in doc_ids:
+            self._txn.setdefault(doc_id, self._index.get(doc_id))
+
+    def _update_docs(self, changes: dict[int, dict[str, object]]) -> None:
+        '''
+        Merge per-document fields into storage in one write (journal only
+        inside a transaction).
+
+        TinyDB's public API only applies the same fields to every match, so
+        plain tables are patched through a single `_update_table` pass.
+
+        Parameters:
+        ----------
+        changes : dict
+            Fields to set, keyed by document ID.
+        '''
+        if self._txn is not None:
+            for doc_id in changes:
+                self._txn.setdefault(doc_id, self._index.get(doc_id))
+            return
+        if not isinstance(self._db, Table):
+            self._db.update_docs(changes)
+            return
+
+        def apply(table: dict) -> None:
+            for doc_id, fields in changes.items():
+                table[doc_id].update(fields)
+        self._mark(changes)
+        self._db._update_table(apply)
+
+    def _mark(self, doc_ids) -> None:
+        '''
+        Tell a journaling storage which documents the next write changes, so
+        it appends only those instead of diffing the whole file.
+
+        Parameters:
+        ----------
+        doc_ids : Iterable
+            Document IDs about to be written.
+        '''
+        storage = getattr(self._db, 'storage', None)
+        if hasattr(storage, 'mark'):
+            storage.mark(self._db.name, doc_ids)
+
+    # --- CHANGE FEED ---
+
+    def subscribe(self, last_id: str | None = None, /, *, maxsize: int | None = None) -> Subscription:
+        '''
+        Subscribe to insert/update/delete events on this table.
+
+        Parameters:
+        ----------
+        last_id : str, optional
+            Last event ID the subscriber saw; later events are replayed first.
+
+        maxsize : int, optional
+            Events buffered before a slow subscriber is dropped.
+
+        Returns:
+        -------
+        Subscription
+            Bounded event queue.
+        '''
+        return self._feed.subscribe(last_id, maxsize = maxsize)
+
+    def _emit(self, kind: str, doc: dict[str, object] | None = None) -> None:
+        '''
+        Queue a change-feed event; published right away unless a transaction is open.
+        '''
+        self._events.append((kind, doc))
+        if self._txn is None:
+            self._flush_events()
+
+    def _flush_events(self) -> None:
+        '''
+        Publish queued change-feed events.
+        '''
+        events, self._events = self._events, []
+        for kind, doc in events:
+            self._feed.publish(kind, doc)
+
+    # --- CROSS-PROCESS STATE ---
+
+    @contextmanager
+    def _locked(self, name: str):
+        '''
+        Exclusive access for a read-modify-write: the writer slot of the
+        in-process lock (readers keep running), the write lock of the file
+        (shared with its other tables), plus the cross-process storage lock
+        if the storage has one.
+
+        Parameters:
+        ----------
+        name : str
+            Calling method, for the lock metrics.
+        '''
+        storage = getattr(self._db, 'storage', None)
+        with self._rw.update(name), self._guard, (storage.exclusive() if hasattr(storage, 'exclusive') else nullcontext()):
+            if self._closed:
+                raise RuntimeError(f'database is closed: {self._db.name}')
+            yield
+
+    def _touch(self) -> None:
+        '''
+        Record a local write: remember the storage generation and, outside a
+        transaction, publish the result as the new snapshot.
+        '''
+        self._gen = self._generation()
+        if self._txn is None:
+            self._publish()
+
+    def _publish(self) -> None:
+        '''
+        Make the working index the current read snapshot (a new table
+        version, which retires every cached result) and fork a fresh
+        working copy from it. The fork is O(1); the next write copies only
+        the parts of the index it touches.
+        '''
+        with self._rw.exclusive('publish'):
+            self._version += 1
+            self._head = (self._index, self._version)
+            self._index = self._index.fork()
+
+    def _view(self) -> tuple[HashIndex, int | None]:
+        '''
+        Index a read should use, with its version for the result cache.
+
+        Returns:
+        -------
+        tuple
+            The published snapshot, or inside this thread's own transaction
+            the working index with no version (not cached).
+        '''
+        if self._txn is not None and self._owner == threading.get_ident():
+            return self._index, None
+        return self._head
+
+    def _pin(self, name: str) -> tuple[HashIndex, int | None]:
+        '''
+        Catch up with other processes, then pick the snapshot a read uses
+        (under the shared lock, held only for the pick).
+
+        Parameters:
+        ----------
+        name : str
+            Calling method, for the lock metrics.
+
+        Returns:
+        -------
+        tuple
+            As returned by `_view`.
+        '''
+        self._sync()
+        with self._rw.shared(name):
+            return self._view()
+
+    @property
+    def lock_stats(self) -> dict[str, dict[str, dict[str, object]]]:
+        '''
+        Lock contention metrics: wait-time and hold-time histograms per
+        method and mode ('shared' reads, 'update' writes, 'exclusive'
+        snapshot publishes).
+
+        Returns:
+        -------
+        dict
+            `{method: {mode: {'wait': ..., 'hold': ...}}}`.
+        '''
+        return self._rw.stats()
+
+    def _cached(self, kind: str, filters: dict[str, object] | None, compute, version: int | None) -> list[memcell]:
+        '''
+        Serve a query from the result cache for a snapshot version.
+
+        Parameters:
+        ----------
+        kind : str
+            Query kind.
+
+        filters : dict | None
+            Query filters.
+
+        compute : Callable
+            Produces the result on a miss.
+
+        version : int | None
+            Snapshot version the result belongs to (None bypasses the cache).
+
+        Returns:
+        -------
+        list
+            Cached or freshly computed result.
+        '''
+        if self._cache is None or version is None:
+            return compute()
+        key = self._cache.key(version, kind, filters)
+        result = self._cache.get(key)
+        if result is None:
+            result = self._cache.put(key, compute())
+        return result
+
+    def _generation(self) -> int:
+        '''
+        On-disk write generation of the storage (0 when it has none).
+
+        Returns:
+        -------
+        int
+            Current generation.
+        '''
+        return getattr(getattr(self._db, 'storage', None), 'generation', 0)
+
+    def _sync(self) -> None:
+        '''
+        Drop process-local state if another process has written since we last looked.
+        '''
+        if self._closed or self._generation() == self._gen or self._txn is not None:
+            return
+
+        with self._rw.update('sync'), self._guard:
+            gen = self._generation()
+            if self._closed or gen == self._gen or self._txn is not None:
+                # another thread already caught up
+                return
+            self._resync(gen)
+
+    def _resync(self, gen: int) -> None:
+        '''
+        Rebuild from storage after another process wrote (writer lock held).
+        '''
+        self._gen = gen
+        if isinstance(self._db, Table):
+            # TinyDB caches query results and the next doc_id per table
+            self._db.clear_cache()
+            self._db._next_id = None
+        self._rebuild()
+        # another process changed the table; subscribers have to refetch
+        self._emit('reset')
+
+    # --- LIFECYCLE ---
+
+    @laufeyspawn(summoned = False)
+    def close(self) -> None:
+        '''
+        Close the storage once any running write is done (a shared `store`
+        is left to its owner).
+
+        Later writes raise RuntimeError; reads keep being served from the
+        last published snapshot, so a handle closed under a reader does not
+        fail it.
+        '''
+        with self._rw.update('close'), self._guard:
+            if self._closed:
+                return
+            self._closed = True
+            if hasattr(self._db, 'close'):
+                self._db.close()
+            elif isinstance(self._db, Table) and not self._shared:
+                self._db.storage.close()
+        heimdahl(f'[CLOSE YAMEL] {self._db.name}', unveil = jotunbane, threat = 1)
+
+    @property
+    def closed(self) -> bool:
+        '''
+        Whether `close` has been called.
 
         Returns:
         -------
-        Query
-            Combined query object.
+        bool
+            True once closed.
         '''
-        q = None
-        for k, v in filters.items():
-            condition = (self._query[k] == v)
-            q = condition if q is None else q & condition
-        return q
+        return self._closed
 
 __all__ = ['Yamel']
 
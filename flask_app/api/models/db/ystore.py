@@ -1,20 +1,733 @@
+import os
+import json
+import mmap
+import time
+import threading
 import yaml
+from pathlib import Path
+from contextlib import contextmanager
 from tinydb.storages import Storage
 
+try:
+    # libyaml bindings are an order of magnitude faster than the pure-python parser
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import fcntl
+except ImportError:
+    # no advisory locks on this platform; locking degrades to in-process only
+    fcntl = None
+
+# --- CODECS ---
+
+class Codec:
+    '''
+    Serializer used by `YStorage` to turn database content into bytes and back.
+    '''
+    __slots__ = []
+    name = None
+    binary = False
+
+    def load(self, f) -> dict[str, object]:
+        '''
+        Parse database content from a readable binary buffer.
+
+        Parameters:
+        ----------
+        f : file | mmap
+            Readable binary stream.
+
+        Returns:
+        -------
+        dict
+            Parsed database content.
+        '''
+        raise NotImplementedError
+
+    def dump(self, data: dict[str, object], f) -> None:
+        '''
+        Serialize database content into an open file.
+
+        Parameters:
+        ----------
+        data : dict
+            Database content.
+
+        f : file
+            Writable file (binary when `binary` is set).
+        '''
+        raise NotImplementedError
+
+class YamlCodec(Codec):
+    '''
+    YAML codec backed by libyaml's `CSafeLoader`/`CSafeDumper` when available.
+    '''
+    __slots__ = []
+    name = 'yaml'
+
+    def load(self, f) -> dict[str, object]:
+        return yaml.load(f, Loader = _Loader)
+
+    def dump(self, data: dict[str, object], f) -> None:
+        yaml.dump(data, f, Dumper = _Dumper)
+
+class JsonCodec(Codec):
+    '''
+    JSON codec using the stdlib C encoder/decoder.
+    '''
+    __slots__ = []
+    name = 'json'
+
+    def load(self, f) -> dict[str, object]:
+        return json.load(f)
+
+    def dump(self, data: dict[str, object], f) -> None:
+        json.dump(data, f, separators = (',', ':'))
+
+class MsgpackCodec(Codec):
+    '''
+    Binary msgpack codec (requires the optional `msgpack` package).
+    '''
+    __slots__ = []
+    name = 'msgpack'
+    binary = True
+
+    def __init__(self) -> None:
+        if msgpack is None:
+            raise RuntimeError('msgpack codec requested but `msgpack` is not installed.')
+
+    def load(self, f) -> dict[str, object]:
+        return msgpack.unpackb(f.read(), raw = False, strict_map_key = False)
+
+    def dump(self, data: dict[str, object], f) -> None:
+        f.write(msgpack.packb(data, use_bin_type = True))
+
+_CODECS = {
+    'yaml': YamlCodec,
+    'json': JsonCodec,
+    'msgpack': MsgpackCodec
+}
+
+_EXTENSIONS = {
+    '.yaml': 'yaml',
+    '.yml': 'yaml',
+    '.json': 'json',
+    '.msgpack': 'msgpack',
+    '.mpk': 'msgpack'
+}
+
+def codec_for(path: str | Path, name: str | None = None) -> Codec:
+    '''
+    Pick a codec by explicit name, falling back to the file extension (then YAML).
+
+    Parameters:
+    ----------
+    path : str | Path
+        Database file path.
+
+    name : str, optional
+        Codec name ('yaml', 'json' or 'msgpack').
+
+    Returns:
+    -------
+    Codec
+        Codec instance.
+    '''
+    name = name or _EXTENSIONS.get(Path(path).suffix.lower(), 'yaml')
+    if name not in _CODECS:
+        raise ValueError(f'unknown codec: {name}')
+    return _CODECS[name]()
+
+@contextmanager
+def _noop():
+    '''
+    Stand-in context manager when locking is disabled.
+    '''
+    yield
+
+def _clone(data: dict[str, dict]) -> dict[str, dict]:
+    '''
+    Copy database content down to the document level.
+
+    TinyDB mutates the dicts handed out by `read` before calling `write`,
+    so anything held onto by a storage layer must not be shared with it.
+
+    Parameters:
+    ----------
+    data : dict
+        Database content keyed by table name.
+
+    Returns:
+    -------
+    dict
+        Independent copy of `data`.
+    '''
+    return {tb: {k: dict(doc) for k, doc in docs.items()} for tb, docs in data.items()}
+
+# --- COMMIT ---
+
+class GroupCommit:
+    '''
+    Crash-safe, batched writer for a single database file.
+
+    Every commit is written to a temp file, fsynced and renamed over the target.
+    Writers arriving while a commit is pending join it: the first one becomes
+    the leader and persists the newest document on everyone's behalf. One
+    fsync covers the whole batch. Only when other writers are already queued
+    behind the leader does it wait `window` seconds for more to join, so an
+    uncontended write (e.g. one serialized by a per-file lock) never sleeps.
+    '''
+    __slots__ = ['_path', '_window', '_cv', '_pending', '_seq', '_done', '_leader', '_last', 'writes', 'fsyncs', '_t0']
+
+    _WINDOW = 0.002 # seconds a leader with queued writers waits for more
+
+    def __init__(self, path: str, window: float | None = None) -> None:
+        '''
+        Parameters:
+        ----------
+        path : str
+            Target database file.
+
+        window : float, optional
+            Batching window in seconds.
+        '''
+        self._path = path
+        self._window = self.__class__._WINDOW if window is None else window
+        self._cv = threading.Condition()
+        self._pending = None
+        self._seq = 0
+        self._done = 0
+        self._leader = False
+        self._last = None
+        self.writes = 0
+        self.fsyncs = 0
+        self._t0 = time.monotonic()
+
+    @property
+    def stats(self) -> dict[str, float]:
+        '''
+        Logical writes versus physical commits since creation.
+
+        Returns:
+        -------
+        dict
+            Counts and per-second rates of logical writes and fsyncs.
+        '''
+        elapsed = max(time.monotonic() - self._t0, 1e-9)
+        return {
+            'writes': self.writes,
+            'fsyncs': self.fsyncs,
+            'writes_per_sec': self.writes / elapsed,
+            'fsyncs_per_sec': self.fsyncs / elapsed
+        }
+
+    def commit(self, data: dict[str, object], codec: Codec, /, *, batch: bool = True) -> tuple[dict[str, object], os.stat_result]:
+        '''
+        Durably persist `data`, possibly batched with concurrent writers.
+
+        Parameters:
+        ----------
+        data : dict
+            Full database content.
+
+        codec : Codec
+            Codec used to serialize the content.
+
+        batch : bool
+            Wait `window` for more followers when some are queued; callers
+            already serialized by an exclusive lock pass False.
+
+        Returns:
+        -------
+        tuple
+            The document that actually reached disk (the newest in the batch) and its stat.
+        '''
+        with self._cv:
+            self._seq += 1
+            ticket = self._seq
+            self._pending = (data, codec)
+            self.writes += 1
+            while self._done < ticket:
+                if not self._leader:
+                    self._leader = True
+                    crowded = self._seq > ticket
+                    break
+                self._cv.wait()
+            else:
+                return self._last
+
+        ok = False
+        try:
+            if batch and crowded and self._window:
+                time.sleep(self._window)
+            with self._cv:
+                (data, codec), upto = self._pending, self._seq
+            st = self._write(data, codec)
+            ok = True
+        finally:
+            with self._cv:
+                if ok:
+                    self._done = max(self._done, upto)
+                    self._last = (data, st)
+                    self.fsyncs += 1
+                self._leader = False
+                self._cv.notify_all()
+        return self._last
+
+    def _write(self, data: dict[str, object], codec: Codec) -> os.stat_result:
+        '''
+        Write to a temp file, fsync it and atomically rename it into place.
+
+        Parameters:
+        ----------
+        data : dict
+            Full database content.
+
+        codec : Codec
+            Codec used to serialize the content.
+
+        Returns:
+        -------
+        os.stat_result
+            Stat of the committed file.
+        '''
+        tmp = f'{self._path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb' if codec.binary else 'w') as f:
+            codec.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._path)
+
+        # persist the rename itself
+        try:
+            fd = os.open(os.path.dirname(os.path.abspath(self._path)), os.O_RDONLY)
+        except OSError:
+            return os.stat(self._path)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        return os.stat(self._path)
+
+_COMMITTERS = {}
+_COMMITTERS_LOCK = threading.Lock()
+
+def committer(path: str | Path, window: float | None = None) -> GroupCommit:
+    '''
+    Return the process-wide `GroupCommit` for `path` so every storage instance
+    pointing at the same file batches together.
+
+    Parameters:
+    ----------
+    path : str | Path
+        Database file path.
+
+    window : float, optional
+        Batching window used if the committer is created by this call.
+
+    Returns:
+    -------
+    GroupCommit
+        Shared committer.
+    '''
+    key = os.path.realpath(path)
+    with _COMMITTERS_LOCK:
+        if key not in _COMMITTERS:
+            _COMMITTERS[key] = GroupCommit(key, window)
+        return _COMMITTERS[key]
+
+# --- LOCKING ---
+
+class FileLock:
+    '''
+    Reader/writer lock shared between threads and processes for one database file.
+
+    Threads coordinate through a condition variable; the process as a whole
+    holds an advisory `flock` on `<path>.lock` (shared while any thread reads,
+    exclusive while one thread writes). The first 8 bytes of the lock file
+    store a generation counter bumped by every committed write, so other
+    processes can tell when their in-memory state went stale.
+
+    The exclusive side is reentrant and a writer may read under its own lock;
+    upgrading a shared hold to exclusive is not supported.
+    '''
+    __slots__ = ['_path', '_fd', '_cv', '_readers', '_writer', '_depth']
+
+    def __init__(self, path: str) -> None:
+        '''
+        Parameters:
+        ----------
+        path : str
+            Database file path; the lock lives next to it.
+        '''
+        self._path = f'{path}.lock'
+        self._fd = None
+        self._reopen()
+
+    def _reopen(self) -> None:
+        '''
+        Open a private descriptor and reset thread state.
+
+        `flock` is tied to the open file description, which a forked child
+        shares with its parent, so children must reopen to be excluded.
+        '''
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._cv = threading.Condition()
+        self._readers = 0
+        self._writer = None
+        self._depth = 0
+
+    def _flock(self, op: int) -> None:
+        '''
+        Apply a process-level `flock` operation (no-op without `fcntl`).
+        '''
+        if fcntl is not None:
+            fcntl.flock(self._fd, op)
+
+    @contextmanager
+    def shared(self):
+        '''
+        Hold the lock for reading.
+        '''
+        me = threading.get_ident()
+        with self._cv:
+            nested = self._writer == me
+            if nested:
+                self._depth += 1
+            else:
+                while self._writer is not None:
+                    self._cv.wait()
+                if not self._readers:
+                    self._flock(fcntl.LOCK_SH if fcntl else 0)
+                self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cv:
+                if nested:
+                    self._depth -= 1
+                else:
+                    self._readers -= 1
+                    if not self._readers:
+                        self._flock(fcntl.LOCK_UN if fcntl else 0)
+                        self._cv.notify_all()
+
+    @contextmanager
+    def exclusive(self):
+        '''
+        Hold the lock for writing (reentrant for the owning thread).
+        '''
+        me = threading.get_ident()
+        with self._cv:
+            if self._writer == me:
+                self._depth += 1
+            else:
+                while self._writer is not None or self._readers:
+                    self._cv.wait()
+                self._writer = me
+                self._depth = 1
+                self._flock(fcntl.LOCK_EX if fcntl else 0)
+        try:
+            yield
+        finally:
+            with self._cv:
+                self._depth -= 1
+                if not self._depth:
+                    self._writer = None
+                    self._flock(fcntl.LOCK_UN if fcntl else 0)
+                    self._cv.notify_all()
+
+    @property
+    def generation(self) -> int:
+        '''
+        Current on-disk write generation.
+
+        Returns:
+        -------
+        int
+            Number of committed writes recorded in the lock file.
+        '''
+        return int.from_bytes(os.pread(self._fd, 8, 0).ljust(8, b'\0'), 'little')
+
+    def bump(self) -> int:
+        '''
+        Increment the generation (caller must hold the exclusive lock).
+
+        Returns:
+        -------
+        int
+            New generation.
+        '''
+        gen = self.generation + 1
+        os.pwrite(self._fd, gen.to_bytes(8, 'little'), 0)
+        return gen
+
+_LOCKS = {}
+_LOCKS_LOCK = threading.Lock()
+
+def _after_fork() -> None:
+    '''
+    Give a forked worker its own lock descriptors.
+    '''
+    global _LOCKS_LOCK
+    _LOCKS_LOCK = threading.Lock()
+    for lock in _LOCKS.values():
+        lock._reopen()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child = _after_fork)
+
+def file_lock(path: str | Path) -> FileLock:
+    '''
+    Return the process-wide `FileLock` for `path`.
+
+    Parameters:
+    ----------
+    path : str | Path
+        Database file path.
+
+    Returns:
+    -------
+    FileLock
+        Shared lock.
+    '''
+    key = os.path.realpath(path)
+    with _LOCKS_LOCK:
+        if key not in _LOCKS:
+            _LOCKS[key] = FileLock(key)
+        return _LOCKS[key]
+
+# --- STREAMING ---
+
+def _compose(loader, anchors: dict[str, yaml.Node]) -> yaml.Node:
+    '''
+    Build the node for the next value in the event stream (one subtree only).
+
+    Mirrors `yaml.composer.Composer` but works on both the pure-python and the
+    libyaml parser, which does not expose `compose_node`.
+
+    Parameters:
+    ----------
+    loader : yaml.Loader
+        Loader positioned at the start of a node.
+
+    anchors : dict
+        Anchors seen so far in the stream.
+
+    Returns:
+    -------
+    yaml.Node
+        Composed node.
+    '''
+    event = loader.get_event()
+    if isinstance(event, yaml.AliasEvent):
+        return anchors[event.anchor]
+
+    if isinstance(event, yaml.ScalarEvent):
+        tag = event.tag
+        if tag is None or tag == '!':
+            tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+        node = yaml.ScalarNode(tag, event.value, event.start_mark, event.end_mark, style = event.style)
+
+    elif isinstance(event, yaml.SequenceStartEvent):
+        tag = event.tag
+        if tag is None or tag == '!':
+            tag = loader.resolve(yaml.SequenceNode, None, event.implicit)
+        node = yaml.SequenceNode(tag, [], event.start_mark, None, flow_style = event.flow_style)
+        while not loader.check_event(yaml.SequenceEndEvent):
+            node.value.append(_compose(loader, anchors))
+        node.end_mark = loader.get_event().end_mark
+
+    else:
+        tag = event.tag
+        if tag is None or tag == '!':
+            tag = loader.resolve(yaml.MappingNode, None, event.implicit)
+        node = yaml.MappingNode(tag, [], event.start_mark, None, flow_style = event.flow_style)
+        while not loader.check_event(yaml.MappingEndEvent):
+            node.value.append((_compose(loader, anchors), _compose(loader, anchors)))
+        node.end_mark = loader.get_event().end_mark
+
+    if event.anchor is not None:
+        anchors[event.anchor] = node
+    return node
+
+def _skip(loader) -> None:
+    '''
+    Consume the events of the next node without building it.
+
+    Parameters:
+    ----------
+    loader : yaml.Loader
+        Loader positioned at the start of a node.
+    '''
+    depth = 0
+    while True:
+        event = loader.get_event()
+        if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+            depth += 1
+        elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+            depth -= 1
+        if not depth:
+            return
+
+def _stream(f, table: str):
+    '''
+    Yield `(doc_id, document)` pairs of one table from a TinyDB YAML file,
+    holding at most one document in memory at a time.
+
+    Parameters:
+    ----------
+    f : file
+        Binary file positioned at the start.
+
+    table : str
+        Table to read.
+
+    Returns:
+    -------
+    Iterator[tuple]
+        Document ID (as stored) and document.
+    '''
+    loader = _Loader(f)
+    anchors = {}
+    try:
+        loader.get_event()                                  # stream start
+        if not loader.check_event(yaml.DocumentStartEvent):
+            return
+        loader.get_event()
+        if not loader.check_event(yaml.MappingStartEvent):  # empty / null document
+            return
+        loader.get_event()
+
+        while not loader.check_event(yaml.MappingEndEvent):
+            name = loader.construct_document(_compose(loader, anchors))
+            if name != table or not loader.check_event(yaml.MappingStartEvent):
+                _skip(loader)
+                continue
+
+            loader.get_event()
+            while not loader.check_event(yaml.MappingEndEvent):
+                doc_id = loader.construct_document(_compose(loader, anchors))
+                yield doc_id, loader.construct_document(_compose(loader, anchors))
+            loader.get_event()
+    finally:
+        loader.dispose()
+
+# --- STORAGE ---
+
 class YStorage(Storage):
     '''
-    TinyDB-compatible storage that reads/writes YAML.
+    TinyDB-compatible storage that reads/writes YAML (or another codec).
+
+    The last parsed document is kept alongside the file's (inode, size, mtime_ns);
+    reads only re-parse when another writer has changed the file since. With
+    locking enabled the write generation joins the key, since inode numbers are
+    recycled and mtime is only as fine as the kernel clock tick.
+
+    With `lock` enabled, reads take a shared and writes an exclusive advisory
+    lock so several worker processes can share the file safely. Locked writes
+    are already serialized, so they skip the group-commit batching window.
     '''
-    __slots__ = ['_path']
-    
-    def __init__(self, path: str):
+    __slots__ = ['_path', '_codec', '_committer', '_lock', '_snap', '_key', 'hits', 'misses']
+
+    def __init__(self, path: str, codec: str | None = None, window: float | None = None, lock: bool = False):
+        '''
+        Parameters:
+        ----------
+        path : str
+            Path to the database file.
+
+        codec : str, optional
+            Codec name; inferred from the file extension when omitted.
+
+        window : float, optional
+            Group-commit batching window in seconds.
+
+        lock : bool
+            Coordinate reads/writes with other processes through `<path>.lock`.
+        '''
         self._path = path
+        self._codec = codec_for(path, codec)
+        self._committer = committer(path, window)
+        self._lock = file_lock(path) if lock else None
+        self._snap = None
+        self._key = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def codec(self) -> Codec:
+        '''
+        Codec used to (de)serialize the database file.
+
+        Returns:
+        -------
+        Codec
+            Active codec instance.
+        '''
+        return self._codec
+
+    @property
+    def stats(self) -> dict[str, int]:
+        '''
+        Snapshot cache counters.
+
+        Returns:
+        -------
+        dict
+            Number of reads served from the snapshot ('hits') and parsed from disk ('misses').
+        '''
+        return {'hits': self.hits, 'misses': self.misses}
+
+    @property
+    def commits(self) -> dict[str, float]:
+        '''
+        Group-commit counters for this file (shared by every storage on it).
+
+        Returns:
+        -------
+        dict
+            Logical writes and fsyncs, with per-second rates.
+        '''
+        return self._committer.stats
+
+    @property
+    def generation(self) -> int:
+        '''
+        On-disk write generation shared by every process using this file.
+
+        Returns:
+        -------
+        int
+            Generation counter (always 0 without locking).
+        '''
+        return self._lock.generation if self._lock else 0
+
+    def exclusive(self):
+        '''
+        Hold the cross-process write lock, e.g. around a read-modify-write.
+
+        Returns:
+        -------
+        ContextManager
+            Lock context (a no-op without locking).
+        '''
+        return self._lock.exclusive() if self._lock else _noop()
 
     # --- STORAGE INTERFACE ---
 
     def read(self) -> dict[str, object]:
         '''
-        Read and load YAML content into TinyDB format.
+        Read and load file content into TinyDB format.
 
         Returns:
         -------
@@ -22,26 +735,188 @@ class YStorage(Storage):
             Parsed database content or empty dict.
         '''
         try:
-            with open(self._path, 'r') as f:
-                return yaml.safe_load(f) or {}
+            with self._lock.shared() if self._lock else _noop(), open(self._path, 'rb') as f:
+                st = os.fstat(f.fileno())
+                key = (st.st_ino, st.st_size, st.st_mtime_ns, self.generation)
+                if key == self._key:
+                    self.hits += 1
+                    return _clone(self._snap)
+
+                self.misses += 1
+                if not st.st_size:
+                    data = {}
+                else:
+                    with mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ) as mm:
+                        data = self._codec.load(mm) or {}
         except FileNotFoundError:
             # return {}
             raise FileNotFoundError(f'filepath: {self._path}')
 
+        self._snap, self._key = data, key
+        return _clone(data)
+
     def write(self, data: dict[str, object]) -> None:
         '''
-        Write database content to YAML file.
+        Atomically write database content to file through the group committer.
 
         Parameters:
         ----------
         data : dict
             Database data to write.
         '''
-        with open(self._path, 'w') as f:
-            yaml.dump(data, f)
+        if self._lock is None:
+            data, st = self._committer.commit(data, self._codec)
+            gen = 0
+        else:
+            with self._lock.exclusive():
+                data, st = self._committer.commit(data, self._codec, batch = False)
+                gen = self._lock.bump()
+
+        # the committed document is already parsed; skip the re-read on the next call
+        self._snap, self._key = data, (st.st_ino, st.st_size, st.st_mtime_ns, gen)
+
+    def stream(self, table: str):
+        '''
+        Yield `(doc_id, document)` pairs of one table in near-constant memory.
+
+        A still-valid snapshot is served from memory; otherwise YAML files are
+        parsed event by event and never cached. Other codecs have no
+        incremental parser and fall back to a regular read.
+
+        Parameters:
+        ----------
+        table : str
+            Table to read.
+
+        Returns:
+        -------
+        Iterator[tuple]
+            Document ID (as stored) and document.
+        '''
+        try:
+            f = open(self._path, 'rb')
+        except FileNotFoundError:
+            raise FileNotFoundError(f'filepath: {self._path}')
+
+        # writes replace the file by rename, so this descriptor keeps
+        # reading one consistent version without holding the lock
+        with f:
+            st = os.fstat(f.fileno())
+            if (st.st_ino, st.st_size, st.st_mtime_ns, self.generation) == self._key:
+                self.hits += 1
+                for doc_id, doc in self._snap.get(table, {}).items():
+                    yield doc_id, dict(doc)
+                return
+
+            if not isinstance(self._codec, YamlCodec) or not st.st_size:
+                yield from self.read().get(table, {}).items()
+                return
+
+            self.misses += 1
+            yield from _stream(f, table)
 
     def close(self) -> None:
         '''
         Close the storage (noop for YAML).
         '''
         pass
+
+def load(src: str | Path, /, *, codec: str | None = None) -> dict[str, object]:
+    '''
+    Read a whole store, folding in any pending journal records next to it.
+
+    Parameters:
+    ----------
+    src : str | Path
+        Existing database file.
+
+    codec : str, optional
+        Source codec; inferred from `src` extension when omitted.
+
+    Returns:
+    -------
+    dict
+        Database content keyed by table name.
+    '''
+    if Path(f'{src}.journal').exists():
+        from .journal import JStorage
+        source = JStorage(str(src), codec = codec)
+        data = source.read()
+        source.close()
+        return data
+    return YStorage(str(src), codec = codec).read()
+
+def convert(src: str | Path, dst: str | Path, /, *, codec: str | None = None, overwrite: bool = False) -> Path:
+    '''
+    Copy an existing store into another format, verifying the result.
+
+    Pending journal records next to `src` are folded in, and `src` itself is
+    left untouched so the original history is kept.
+
+    Parameters:
+    ----------
+    src : str | Path
+        Existing database file.
+
+    dst : str | Path
+        Target database file.
+
+    codec : str, optional
+        Target codec; inferred from `dst` extension when omitted.
+
+    overwrite : bool
+        Replace `dst` if it already exists.
+
+    Returns:
+    -------
+    Path
+        Path of the converted store.
+    '''
+    src, dst = Path(src), Path(dst)
+    if dst.exists() and not overwrite:
+        raise FileExistsError(f'filepath: {dst}')
+
+    data = load(src)
+    YStorage(str(dst), codec = codec).write(data)
+
+    # fresh instance so the check parses the file instead of the write snapshot
+    if YStorage(str(dst), codec = codec).read() != data:
+        raise RuntimeError(f'conversion mismatch: {src} -> {dst}')
+    return dst
+
+__all__ = ['YStorage', 'GroupCommit', 'FileLock', 'Codec', 'YamlCodec', 'JsonCodec', 'MsgpackCodec', 'codec_for', 'committer', 'file_lock', 'load', 'convert']
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description = 'YStorage utilities.')
+    sub = parser.add_subparsers(dest = 'cmd', required = True)
+
+    conv = sub.add_parser('convert', help = 'convert a database file to another codec')
+    conv.add_argument('src', help = 'existing database file')
+    conv.add_argument('dst', help = 'target database file (.yaml, .json, .msgpack)')
+    conv.add_argument('--codec', default = None, help = 'override codec inferred from dst')
+    conv.add_argument('--overwrite', action = 'store_true', help = 'replace dst if it exists')
+
+    bench = sub.add_parser('bench', help = 'report logical writes vs fsyncs under concurrent writers')
+    bench.add_argument('path', help = 'scratch database file')
+    bench.add_argument('--threads', type = int, default = 8)
+    bench.add_argument('--writes', type = int, default = 100, help = 'writes per thread')
+    args = parser.parse_args()
+
+    match args.cmd:
+        case 'convert':
+            print(convert(args.src, args.dst, codec = args.codec, overwrite = args.overwrite))
+
+        case 'bench':
+            store = YStorage(args.path)
+            doc = {'memcells': {str(i): {'id': i, 'phone': '555', 'task': f'task {i}', 'status': 'pending'} for i in range(1, 101)}}
+            workers = [
+                threading.Thread(target = lambda: [store.write(doc) for _ in range(args.writes)])
+                for _ in range(args.threads)
+            ]
+            for w in workers:
+                w.start()
+            for w in workers:
+                w.join()
+            print(store.commits)
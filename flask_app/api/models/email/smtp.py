@@ -69,6 +69,53 @@ class Smtp:
         
         self.send(body)
     
+    @laufeyspawn(summoned = True)
+    def found_memcells(self, reply: dict | list):
+        '''
+        EXAMPLE
+        =======
+        [
+            {
+                "id": 2,
+                "phone": "9104592653",
+                "status": "pending",
+                "task": "buy milk"
+            }
+        ]
+        '''
+        if not isinstance(reply, list):
+            return self.malformed()
+
+        body = '[FIND]'
+        if not reply:
+            body += '\nNo memcells match that search.'
+        else:
+            for doc in reply:
+                body += f'''\n - id: {doc['id']}\n - task: {doc['task']}'''
+
+        self.send(body)
+
+    @laufeyspawn(summoned = True)
+    def count_memcells(self, reply: dict):
+        '''
+        EXAMPLE
+        =======
+        {
+            "total": 3,
+            "by_status": {
+                "pending": 2,
+                "done": 1
+            }
+        }
+        '''
+        if 'total' not in reply:
+            return self.malformed()
+
+        body = f'[COUNT]\n - total: {reply["total"]}'
+        for status, n in sorted(reply.get('by_status', {}).items()):
+            body += f'\n - {status}: {n}'
+        self.send(body)
+
     @laufeyspawn(summoned = True)
     def del_memcell(self, reply: dict):
         '''
@@ -92,6 +139,28 @@ class Smtp:
         )
         self.send(body)
 
+    @laufeyspawn(summoned = True)
+    def reminder(self, cell: dict):
+        '''
+        EXAMPLE
+        =======
+        {
+            "id": 2,
+            "phone": "9104592653",
+            "status": "pending",
+            "task": "buy milk",
+            "due": 1767225600
+        }
+
+        Returns True if the text was sent.
+        '''
+        body = (
+            f'[REMINDER]'
+            f'\n - task: "{cell["task"][:30]}"'
+            f'\n - ID: {cell["id"]}'
+        )
+        return self.send(body, phone = cell['phone'])
+
     @laufeyspawn(summoned = True)
     def help(self):
         body = (
@@ -99,6 +168,8 @@ class Smtp:
             " - 'del' followed by a task ID will remove it.\n"
             " - 'new' then a description will create a task.\n"
             " - 'all' will return all current tasks.\n"
+            " - 'find' then some words will search your tasks.\n"
+            " - 'count' will return how many tasks you have.\n"
             " - 'help' will return all valid commands."
         )
         self.send(body)
@@ -110,13 +181,19 @@ class Smtp:
             " - 'del' followed by a task ID will remove it.\n"
             " - 'new' then a description will create a task.\n"
             " - 'all' will return all current tasks.\n"
+            " - 'find' then some words will search your tasks.\n"
+            " - 'count' will return how many tasks you have.\n"
             " - 'help' will return all valid commands."
         )
         self.send(body)
 
     @laufeyspawn(summoned = True)
-    def send(self, body: str):
-        mail_to = f'{self._phone}{self.__class__._GATEWAY_MMS}'
+    def send(self, body: str, phone: str | None = None) -> bool:
+        '''
+        Text `body` to `phone` (default: the configured phone); returns
+        whether the gateway accepted it.
+        '''
+        mail_to = f'{phone or self._phone}{self.__class__._GATEWAY_MMS}'
         msg = MIMEText(body, _subtype = 'plain', _charset = 'utf-8')
         msg['From'] = self._email
         msg['To'] = mail_to
@@ -130,9 +207,11 @@ class Smtp:
             server.quit()
 
             heimdahl('[SMS SENT]', unveil = jotunbane, threat = 1)
+            return True
 
         except Exception as e:
             heimdahl(f'[SMS FAIL] {e}', unveil = True, threat = 3)
+            return False
 
 
 __all__ = ['Smtp']
\ No newline at end of file
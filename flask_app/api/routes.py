@@ -1,5 +1,9 @@
-from flask import request, jsonify
-from .config import db, app
+import json
+from typing import Iterator
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+from flask import request, jsonify, Response, abort, g, stream_with_context
+from .config import db, app, registry, PATH, TABLE
+from .models.db.planner import predicates
 from api.utils.debuggernaut import heimdahl, laufeyspawn, jotunbane
 
 @app.route('/ping', methods = ['GET'])
@@ -16,38 +20,223 @@ def root():
         'status': 'OK'
     }), 200
 
+_KEEPALIVE = 15 # seconds between SSE keep-alive comments
+_LISTING = ('limit', 'after', 'stream', 'phone') # GET /memcells parameters that are not filters
+_NUMERIC = ('id', 'due') # fields whose filter values are numbers
+
+@app.url_value_preprocessor
+def _open_table(endpoint, values) -> None:
+    '''
+    Lease the table named by a `/<table>/memcells` URL for the request;
+    `/memcells` serves the configured table. An invalid table name is a 404.
+    '''
+    table = (values or {}).pop('table', None)
+    if table is None:
+        return
+    try:
+        g.db = registry.open(PATH, table)
+    except ValueError as e:
+        heimdahl(f'[TABLE ERROR] {e}', unveil = True, threat = 2)
+        abort(404)
+    g.table = table
+
+@app.teardown_request
+def _release_table(exc) -> None:
+    '''
+    Return the lease taken by `_open_table`.
+    '''
+    table = g.pop('table', None)
+    if table is not None:
+        g.pop('db', None)
+        registry.release(PATH, table)
+
+def _db():
+    '''
+    Database the current request works on.
+    '''
+    return g.get('db', db)
+
+def _due_error(data) -> str | None:
+    '''
+    Error for a `due` reminder time on a table the scheduler does not
+    follow (it only watches the configured table).
+    '''
+    if isinstance(data, dict) and data.get('due') is not None and _db() is not db:
+        return f'due reminders are only sent for the {TABLE} table'
+    return None
+
+def _cursor(cell) -> str:
+    '''
+    Encode a memcell's listing position (ID, owner) as an opaque pagination cursor.
+    '''
+    return urlsafe_b64encode(json.dumps({'id': cell['id'], 'phone': cell['phone']}).encode()).decode().rstrip('=')
+
+def _uncursor(cursor: str) -> int | tuple[int, str]:
+    '''
+    Decode a cursor from `_cursor`; raises ValueError if it is malformed.
+    '''
+    try:
+        pos = json.loads(urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        mem_id = pos['id']
+    except Exception as e:
+        raise ValueError(f'invalid cursor: {cursor}') from e
+    if not isinstance(mem_id, int):
+        raise ValueError(f'invalid cursor: {cursor}')
+    return (mem_id, str(pos['phone'])) if 'phone' in pos else mem_id
+
+def _owner(db, mem_id: int, phone: str | None = None) -> tuple[dict[str, object] | None, bool]:
+    '''
+    Filters selecting one owner's memcell ID.
+
+    IDs are only unique per owner, so without a phone the owner is looked
+    up and pinned into the filters; a write made with them cannot spread
+    to another owner's memcell created meanwhile.
+
+    Returns:
+    -------
+    tuple
+        Filters (None if no memcell has the ID), and whether memcells of
+        more than one owner have it.
+    '''
+    if phone is not None:
+        return {'id': mem_id, 'phone': phone}, False
+    owners = {cell['phone'] for cell in db.where({'id': mem_id})}
+    if len(owners) != 1:
+        return None, len(owners) > 1
+    return {'id': mem_id, 'phone': owners.pop()}, False
+
+def _scope(mem_id: int) -> tuple[dict[str, object] | None, bool]:
+    '''
+    `_owner` filters for a memcell ID, narrowed to the `phone` query
+    parameter if given.
+    '''
+    return _owner(_db(), mem_id, request.args.get('phone'))
+
+def _ambiguous(mem_id: int):
+    '''
+    409 response for an ID shared by several owners.
+    '''
+    heimdahl(f'[AMBIGUOUS ID] {mem_id}', unveil = True, threat = 2)
+    return jsonify({'error': 'Memcell ID is used by several owners; pass ?phone='}), 409
+
+def _filters(args) -> dict[str, object]:
+    '''
+    Filters from query parameters: `field=value` for equality, or
+    `field__op=value` with `op` one of in (comma-separated), gt, gte, lt,
+    lte, prefix. Raises ValueError on a malformed value.
+    '''
+    filters = {}
+    for key, raw in args.items():
+        if key in _LISTING:
+            continue
+        field, _, op = key.partition('__')
+        values = raw.split(',') if op == 'in' else [raw]
+        if field in _NUMERIC:
+            try:
+                values = [float(v) if '.' in v else int(v) for v in values]
+            except ValueError:
+                raise ValueError(f'{key} expects a number') from None
+        value = values if op == 'in' else values[0]
+        filters.setdefault(field, {})[op or 'eq'] = value
+    predicates(filters)
+    return filters
+
+def _stream_json(cells) -> Iterator[str]:
+    '''
+    Write memcells as a JSON array, one element per chunk.
+    '''
+    yield '['
+    for i, cell in enumerate(cells):
+        yield (',' if i else '') + json.dumps(dict(cell), ensure_ascii = False)
+    yield ']'
+
 @laufeyspawn(summoned = False)
 @app.route('/memcells', methods = ['GET'])
+@app.route('/<table>/memcells', methods = ['GET'])
 def get_all_memcells():
     '''
-    Return all memcells in the database.
+    Return memcells in ID order, optionally paginated and/or streamed.
+
+    Query parameters:
+    ----------
+    limit : int, optional
+        Page size; when more records follow, the `X-Next-Cursor` header
+        carries the cursor for the next page.
+
+    after : str, optional
+        Cursor returned by the previous page.
+
+    stream : bool, optional
+        Write the JSON array incrementally instead of building it in memory.
+
+    phone : str, optional
+        Only list this owner's memcells.
+
+    <field>[__<op>] : str, optional
+        Any other parameter filters on a field, e.g. `status=pending`,
+        `status__in=pending,done`, `due__lt=1700000000`, `task__prefix=Buy`.
 
     Returns:
     -------
-    JSON response containing all memcells.
+    JSON response containing the (paged) memcells.
     '''
     heimdahl('GET /memcells called', unveil = True, threat = 1)
-    return jsonify([dict(cell) for cell in db.all])
+    db = _db()
+    args = request.args
+    stream = args.get('stream', '').lower() in ('1', 'true', 'yes')
+    phone = args.get('phone')
+    if not args.keys() - {'stream'} and not stream:
+        return jsonify([dict(cell) for cell in db.all])
+
+    try:
+        limit = int(args['limit']) if 'limit' in args else None
+        after = _uncursor(args['after']) if 'after' in args else None
+        filters = _filters(args)
+        if limit is not None and limit < 1:
+            raise ValueError('limit must be positive')
+    except ValueError as e:
+        heimdahl(f'[PAGINATION ERROR] {e}', unveil = True, threat = 3)
+        return jsonify({'error': str(e)}), 400
+
+    headers = {}
+    if limit is None:
+        cells = db.iter_all(after = after, phone = phone, filters = filters)
+    else:
+        # one extra record tells whether another page exists
+        cells = list(db.iter_all(after = after, limit = limit + 1, phone = phone, filters = filters))
+        if len(cells) > limit:
+            cells = cells[:limit]
+            headers['X-Next-Cursor'] = _cursor(cells[-1])
+
+    if stream:
+        # keep the request (and its table lease) alive while streaming
+        return Response(stream_with_context(_stream_json(cells)), mimetype = 'application/json', headers = headers)
+    return jsonify([dict(cell) for cell in cells]), 200, headers
 
 @laufeyspawn(summoned = False)
 @app.route('/memcells', methods = ['POST'])
+@app.route('/<table>/memcells', methods = ['POST'])
 def create_memcell():
     '''
     Create a new memcell using JSON payload.
 
-    Expected keys: 'user_id', 'task'
+    Expected keys: 'phone', 'task' and optionally 'due' (Unix timestamp
+    at which a reminder is texted).
 
     Returns:
     -------
     JSON response with inserted doc_id or error message.
     '''
     heimdahl('POST /memcells called', unveil = True, threat = 1)
+    db = _db()
     data = request.get_json()
+    if (error := _due_error(data)) is not None:
+        return jsonify({'error': error}), 400
 
     try:
         phone = data['phone']
         task = data['task']
-        memcell = db.create(phone, task)
+        memcell = db.create(phone, task, due = data.get('due'))
         heimdahl(f'[NEW MEMCELL] id: {memcell["id"]}', unveil = jotunbane, threat = 1)
         return jsonify({'created': memcell}), 201
 
@@ -57,6 +246,7 @@ def create_memcell():
 
 @laufeyspawn(summoned = False)
 @app.route('/memcells/<int:mem_id>', methods = ['GET'])
+@app.route('/<table>/memcells/<int:mem_id>', methods = ['GET'])
 def get_memcell(mem_id: int):
     '''
     Retrieve a specific memcell by ID.
@@ -64,14 +254,19 @@ def get_memcell(mem_id: int):
     Parameters:
     ----------
     mem_id : int
-        The ID of the memcell to retrieve.
+        The ID of the memcell to retrieve (an owner-scoped ID;
+        narrowed by the `phone` query parameter when given).
 
     Returns:
     -------
     JSON response with the memcell or error message.
     '''
     heimdahl(f'GET /memcells/{mem_id} called')
-    matches = db.where({'id': mem_id})
+    db = _db()
+    filters, ambiguous = _scope(mem_id)
+    if ambiguous:
+        return _ambiguous(mem_id)
+    matches = db.where(filters) if filters else []
 
     if not matches:
         heimdahl(f'[FIND ERROR] {mem_id}', unveil = jotunbane, threat = 2)
@@ -82,6 +277,7 @@ def get_memcell(mem_id: int):
 
 @laufeyspawn(summoned = False)
 @app.route('/memcells/<int:mem_id>', methods = ['DELETE'])
+@app.route('/<table>/memcells/<int:mem_id>', methods = ['DELETE'])
 def delete_memcell(mem_id: int):
     '''
     Delete a memcell by ID.
@@ -89,16 +285,21 @@ def delete_memcell(mem_id: int):
     Parameters:
     ----------
     mem_id : int
-        The ID of the memcell to delete.
+        The ID of the memcell to delete (an owner-scoped ID;
+        narrowed by the `phone` query parameter when given).
 
     Returns:
     -------
     JSON response with deletion status.
     '''
     heimdahl(f'DELETE /memcells/{mem_id} called', unveil = True, threat = 1)
-    cell = db.delete({'id': mem_id})
+    db = _db()
+    filters, ambiguous = _scope(mem_id)
+    if ambiguous:
+        return _ambiguous(mem_id)
+    cell = db.delete(filters) if filters else -1
 
-    if cell['id'] == -1:
+    if cell == -1:
         heimdahl(f'[DELETION ERROR] {mem_id}', unveil = True, threat = 3)
         return jsonify({'error': 'Nothing deleted'}), 404, {'Content-Type': 'application/json'}
 
@@ -107,6 +308,7 @@ def delete_memcell(mem_id: int):
 
 @laufeyspawn(summoned = False)
 @app.route('/memcells/<int:mem_id>', methods = ['PUT'])
+@app.route('/<table>/memcells/<int:mem_id>', methods = ['PUT'])
 def update_memcell(mem_id: int):
     '''
     Update a memcell by ID using JSON payload.
@@ -114,19 +316,209 @@ def update_memcell(mem_id: int):
     Parameters:
     ----------
     mem_id : int
-        The ID of the memcell to update.
+        The ID of the memcell to update (an owner-scoped ID;
+        narrowed by the `phone` query parameter when given).
 
     Returns:
     -------
     JSON response with update status.
     '''
     heimdahl(f'PUT /memcells/{mem_id} called', unveil = True, threat = 1)
+    db = _db()
     data = request.get_json()
-    updated = db.update(data, {'id': mem_id})
+    if (error := _due_error(data)) is not None:
+        return jsonify({'error': error}), 400
+    filters, ambiguous = _scope(mem_id)
+    if ambiguous:
+        return _ambiguous(mem_id)
+    try:
+        updated = db.update(data, filters) if filters else []
+    except ValueError as e:
+        heimdahl(f'[UPDATE ERROR] {e}', unveil = True, threat = 3)
+        return jsonify({'error': str(e)}), 400
 
-    if updated == 0:
+    if not updated:
         heimdahl(f'[UPDATE ERROR] {mem_id}', unveil = True, threat = 3)
         return jsonify({'error': 'No memcell updated'}), 404, {'Content-Type': 'application/json'}
 
     heimdahl(f'[UPDATED] {mem_id}', unveil = jotunbane, threat = 1)
-    return jsonify({'updated': updated})
\ No newline at end of file
+    return jsonify({'updated': updated})
+
+@laufeyspawn(summoned = False)
+@app.route('/memcells/batch', methods = ['POST'])
+@app.route('/<table>/memcells/batch', methods = ['POST'])
+def batch_memcells():
+    '''
+    Apply a batch of mixed operations in one transaction (a single storage write).
+
+    Payload is a list (or `{'ops': [...]}`) of items such as
+    `{'op': 'create', 'phone': ..., 'task': ..., 'due': ...}` (`due` optional),
+    `{'op': 'update', 'id': ..., 'data': {...}}` and
+    `{'op': 'delete', 'id': ...}`; updates and deletes should carry the
+    owner's `phone`, as IDs are only unique per owner. Without it, an item
+    whose ID several owners use fails with `status` 409.
+
+    Items are applied in request order, each seeing the effect of the ones
+    before it (a delete frees its ID for a later create). A failing item is
+    reported in its own result and does not stop the others.
+
+    Returns:
+    -------
+    JSON response with one result per item, in input order
+    (207 if any item failed).
+    '''
+    heimdahl('POST /memcells/batch called', unveil = True, threat = 1)
+    db = _db()
+    data = request.get_json(silent = True)
+    ops = data.get('ops') if isinstance(data, dict) else data
+    if not isinstance(ops, list):
+        return jsonify({'error': 'Expected a list of operations'}), 400
+
+    results = [None] * len(ops)
+    valid = []
+    for i, op in enumerate(ops):
+        kind = op.get('op') if isinstance(op, dict) else None
+        if kind not in ('create', 'update', 'delete'):
+            results[i] = {'error': f'unknown op: {kind}'}
+        elif kind == 'create' and not {'phone', 'task'} <= op.keys():
+            results[i] = {'op': kind, 'error': 'phone and task are required'}
+        elif kind != 'create' and not isinstance(op.get('id'), int):
+            results[i] = {'op': kind, 'error': 'integer id is required'}
+        elif kind == 'update' and not isinstance(op.get('data'), dict):
+            results[i] = {'op': kind, 'error': 'data must be an object'}
+        elif (error := _due_error(op if kind == 'create' else op.get('data'))) is not None:
+            results[i] = {'op': kind, 'error': error}
+        else:
+            valid.append(i)
+
+    # the transaction buffers every item, so the batch still costs one write
+    calls = {
+        'create': lambda op, _: db.create(op['phone'], op['task'], due = op.get('due')),
+        'update': lambda op, filters: db.update_many([(op['data'], filters)])[0] if filters else 0,
+        'delete': lambda op, filters: db.delete_many([filters])[0] if filters else None
+    }
+    with db.transaction():
+        for i in valid:
+            kind = ops[i]['op']
+            filters, ambiguous = (None, False) if kind == 'create' else _owner(db, ops[i]['id'], ops[i].get('phone'))
+            if ambiguous:
+                heimdahl(f'[AMBIGUOUS ID] item {i} ({kind}): {ops[i]["id"]}', unveil = True, threat = 2)
+                results[i] = {'op': kind, 'error': 'Memcell ID is used by several owners; pass phone', 'status': 409}
+                continue
+            try:
+                results[i] = {'op': kind, {'create': 'created', 'update': 'updated', 'delete': 'deleted'}[kind]: calls[kind](ops[i], filters)}
+            except Exception as e:
+                heimdahl(f'[BATCH ERROR] item {i} ({kind}): {e}', unveil = True, threat = 3)
+                results[i] = {'op': kind, 'error': str(e)}
+
+    failed = any('error' in r for r in results)
+    heimdahl(f'[BATCH] {len(ops)} ops, failed: {failed}', unveil = jotunbane, threat = 1)
+    return jsonify({'results': results}), 207 if failed else 200
+
+@laufeyspawn(summoned = False)
+@app.route('/memcells/events', methods = ['GET'])
+@app.route('/<table>/memcells/events', methods = ['GET'])
+def memcell_events():
+    '''
+    Server-Sent Events stream of memcell inserts, updates and deletes.
+
+    Each event carries its ID; a reconnecting client sends it back as
+    `Last-Event-ID` (or `?last_id=`) and receives what it missed. A `reset`
+    event means the missed changes are no longer available and the client
+    should refetch `GET /memcells`.
+
+    Query parameters:
+    ----------
+    phone : str, optional
+        Only stream this owner's memcells.
+
+    Returns:
+    -------
+    `text/event-stream` response.
+    '''
+    heimdahl('GET /memcells/events called', unveil = True, threat = 1)
+    db = _db()
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('last_id')
+    phone = request.args.get('phone')
+    sub = db.subscribe(last_id)
+
+    def events() -> Iterator[str]:
+        try:
+            yield 'retry: 3000\n\n'
+            while sub.alive:
+                event = sub.get(timeout = _KEEPALIVE)
+                if event is None:
+                    yield ': keep-alive\n\n'
+                    continue
+                if phone is not None and event.cell is not None and event.cell.get('phone') != phone:
+                    continue
+                yield f'id: {event.id}\nevent: {event.kind}\ndata: {json.dumps(event.cell, ensure_ascii = False)}\n\n'
+        finally:
+            sub.close()
+
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    return Response(stream_with_context(events()), mimetype = 'text/event-stream', headers = headers)
+
+@laufeyspawn(summoned = False)
+@app.route('/memcells/search', methods = ['GET'])
+@app.route('/<table>/memcells/search', methods = ['GET'])
+def search_memcells():
+    '''
+    Full-text search over memcell tasks.
+
+    Query parameters:
+    ----------
+    q : str
+        Words to look for; each must appear in the task (as a word prefix,
+        ignoring case).
+
+    phone : str, optional
+        Only search this owner's memcells.
+
+    Returns:
+    -------
+    JSON response containing the matching memcells in ID order.
+    '''
+    heimdahl('GET /memcells/search called', unveil = True, threat = 1)
+    db = _db()
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'missing search query'}), 400
+    cells = db.search(query, phone = request.args.get('phone'))
+    return jsonify([dict(cell) for cell in cells])
+
+@laufeyspawn(summoned = False)
+@app.route('/memcells/stats', methods = ['GET'])
+@app.route('/<table>/memcells/stats', methods = ['GET'])
+def memcell_stats():
+    '''
+    Memcell counts in total and by status (and by owner, unless scoped).
+
+    Query parameters:
+    ----------
+    phone : str, optional
+        Only count this owner's memcells.
+
+    Returns:
+    -------
+    JSON response with the counts.
+    '''
+    heimdahl('GET /memcells/stats called', unveil = True, threat = 1)
+    db = _db()
+    return jsonify(db.stats(phone = request.args.get('phone')))
+
+@laufeyspawn(summoned = False)
+@app.route('/memcells/stats/locks', methods = ['GET'])
+@app.route('/<table>/memcells/stats/locks', methods = ['GET'])
+def memcell_lock_stats():
+    '''
+    Lock contention metrics of the database.
+
+    Returns:
+    -------
+    JSON response with wait-time and hold-time histograms per method and
+    lock mode.
+    '''
+    heimdahl('GET /memcells/stats/locks called', unveil = True, threat = 1)
+    db = _db()
+    return jsonify(db.lock_stats)
@@ -12,6 +12,8 @@ class Highlander(type):
     def __call__(cls, *args, **kwargs):
         if cls not in cls._instances:
             with cls._lock:
+                # double-checked: another thread may have won the race for the lock
+                if cls not in cls._instances:
                     cls._instances[cls] = super().__call__(*args, **kwargs)
         return cls._instances[cls]
     
@@ -45,6 +45,15 @@ def test_yamel(session):
     session.run("pytest", "tests/test_yamel.py", "--junit-xml=tests/results/yamel.xml")
 
 
+@nox.session
+def test_ystore(session):
+    '''
+    Run only storage engine tests.
+    '''
+    _prepare_env(session)
+    session.run("pytest", "tests/test_ystore.py", "--junit-xml=tests/results/ystore.xml")
+
+
 @nox.session
 def test_routes(session):
     '''
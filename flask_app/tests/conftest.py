@@ -0,0 +1,81 @@
+import os
+import pytest
+from pathlib import Path
+import tempfile
+from api.utils import GoodDog
+from api.models.db.yamel import Yamel
+from api.models.db.registry import Registry
+
+# file each engine opens inside the temporary directory
+FILES = {'sqlite': "memcells.sqlite3"}
+
+@pytest.fixture
+def temp_dir():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+@pytest.fixture
+def temp_path(temp_dir):
+    path = temp_dir / "memcells.yaml"
+    path.touch()
+    yield path
+
+@pytest.fixture
+def open_yamel(temp_dir):
+    '''
+    Open (or reopen) the test database; keyword arguments go to `Yamel`.
+    '''
+    def open_yamel(engine="yaml", **options):
+        path = temp_dir / FILES.get(engine, "memcells.yaml")
+        path.touch()
+        return Yamel(path=str(path), tb="memcells", engine=engine, **options)
+    return open_yamel
+
+@pytest.fixture
+def yamel(request, open_yamel):
+    '''
+    Fresh database; parametrize indirectly with a dict of `Yamel` options,
+    e.g. `@pytest.mark.parametrize("yamel", [{"engine": "sqlite"}], indirect=True)`.
+    '''
+    return open_yamel(**getattr(request, 'param', {}))
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory):
+    '''
+    The Flask app, configured from environment variables instead of `api/.env`.
+    '''
+    path = tmp_path_factory.mktemp("config") / "memcells.yaml"
+    path.touch()
+    env = {"EMAIL": "bot@example.com", "PASSWORD": "pw", "PHONE": "0000000000", "IP": "127.0.0.1", "PORT": "5000", "TABLE": "memcells", "DB_PATH": str(path)}
+    with pytest.MonkeyPatch.context() as mp:
+        for key, value in env.items():
+            mp.setenv(key, value)
+        mp.setattr(GoodDog, "fetch", lambda dir, *evars: [os.environ[ev] for ev in evars])
+        mp.setattr(GoodDog, "where_is_it_boy", lambda fpath, **kwargs: Path(fpath))
+        from api import routes
+    return routes.app
+
+@pytest.fixture
+def registry(app, temp_path, monkeypatch):
+    '''
+    Fresh registry the routes open tables from, backed by `temp_path`.
+    '''
+    from api import routes
+    registry = Registry()
+    monkeypatch.setattr(routes, "registry", registry)
+    monkeypatch.setattr(routes, "PATH", temp_path)
+    monkeypatch.setattr(routes, "db", registry.open(temp_path, "memcells"))
+    yield registry
+    registry.close()
+
+@pytest.fixture
+def api_db(registry):
+    '''
+    Database behind `/memcells`.
+    '''
+    from api import routes
+    return routes.db
+
+@pytest.fixture
+def client(app, registry):
+    return app.test_client()
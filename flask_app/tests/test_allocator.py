@@ -0,0 +1,96 @@
+import pytest
+import time
+from api.models.db.allocator import IdAllocator
+
+def test_allocator_hands_out_lowest_free():
+    ids = IdAllocator([1, 2, 5], capacity=6)
+    assert len(ids) == 3
+    assert [ids.allocate() for _ in range(3)] == [3, 4, 6]
+    assert ids.allocate() == -1
+
+    ids.release(2)
+    ids.release(2)
+    assert 2 in ids
+    assert ids.allocate() == 2
+    assert ids.allocate() == -1
+
+def test_allocator_large_capacity_is_lazy():
+    ids = IdAllocator([], capacity=5_000_000)
+    assert len(ids) == 5_000_000
+    assert ids.allocate() == 1
+
+def test_yamel_reclaims_ids_and_respects_capacity(open_yamel):
+    yam = open_yamel(capacity=3)
+    for task in ('Feed cat', 'Fold clothes', 'Paint garage'):
+        yam.create('alice@example.com', task)
+
+    with pytest.raises(RuntimeError):
+        yam.create('alice@example.com', 'One too many')
+
+    yam.delete({'id': 2})
+    assert yam.create('alice@example.com', 'Reuse slot')['id'] == 2
+
+def test_yamel_ids_and_quotas_are_per_owner(open_yamel):
+    yam = open_yamel(capacity=2)
+    assert [yam.create('alice', t)['id'] for t in ('a', 'b')] == [1, 2]
+    with pytest.raises(RuntimeError):
+        yam.create('alice', 'c')
+
+    # alice being full does not affect bob
+    assert yam.create('bob', 'x')['id'] == 1
+    assert yam.usage('alice') == {'used': 2, 'free': 0, 'quota': 2}
+    assert yam.usage('bob') == {'used': 1, 'free': 1, 'quota': 2}
+
+    yam.delete({'phone': 'alice', 'id': 1})
+    assert yam.usage('alice')['used'] == 1
+    assert yam.where({'id': 1}) == [{'id': 1, 'phone': 'bob', 'task': 'x', 'status': 'pending'}]
+
+def test_rewriting_id_or_owner_keeps_pairs_unique(yamel):
+    yamel.create_many([{'phone': 'alice', 'task': 'a'}, {'phone': 'alice', 'task': 'b'}, {'phone': 'bob', 'task': 'x'}])
+
+    with pytest.raises(ValueError):
+        yamel.update({'phone': 'alice'}, {'id': 1, 'phone': 'bob'})
+    with pytest.raises(ValueError):
+        yamel.update({'id': 2}, {'id': 1, 'phone': 'alice'})
+    with pytest.raises(ValueError):
+        yamel.update_many([({'phone': 'carol'}, {'id': 1, 'phone': 'alice'}), ({'phone': 'carol'}, {'id': 1, 'phone': 'bob'})])
+    assert sorted((c['id'], c['phone']) for c in yamel.all) == [(1, 'alice'), (1, 'bob'), (2, 'alice')]
+
+    # a free pair is fine, and the moved ID is handed out again
+    assert yamel.update({'id': 3}, {'id': 1, 'phone': 'alice'}) != []
+    assert yamel.update_many([({'phone': 'carol'}, {'id': 1, 'phone': 'bob'})]) == [1]
+    assert yamel.create('alice', 'c')['id'] == 1
+    assert yamel.create('carol', 'y')['id'] == 2
+
+def test_routes_need_a_phone_for_shared_ids(client, api_db):
+    api_db.create('alice', 'Feed cat')
+    api_db.create('bob', 'Fold clothes')
+    api_db.create('alice', 'Paint garage')
+
+    for method in ('get', 'put', 'delete'):
+        res = getattr(client, method)('/memcells/1', json={'status': 'done'})
+        assert res.status_code == 409
+
+    assert client.get('/memcells/1', query_string={'phone': 'bob'}).get_json()['task'] == 'Fold clothes'
+    # an ID only one owner has is resolved to that owner
+    assert client.put('/memcells/2', json={'status': 'done'}).get_json() == {'updated': [3]}
+    assert client.put('/memcells/9', json={'status': 'done'}).status_code == 404
+    assert client.delete('/memcells/9').status_code == 404
+    assert client.delete('/memcells/1', query_string={'phone': 'bob'}).get_json() == {'deleted': {'id': 1, 'task': 'Fold clothes'}}
+    assert client.get('/memcells/1').get_json()['phone'] == 'alice'
+
+def test_batch_reports_shared_ids_per_item(client, api_db):
+    api_db.create('alice', 'Feed cat')
+    api_db.create('bob', 'Fold clothes')
+
+    res = client.post('/memcells/batch', json=[
+        {'op': 'update', 'id': 1, 'data': {'status': 'done'}},
+        {'op': 'delete', 'id': 1},
+        {'op': 'delete', 'id': 1, 'phone': 'bob'},
+        {'op': 'update', 'id': 1, 'data': {'status': 'done'}},
+    ])
+    assert res.status_code == 207
+    results = res.get_json()['results']
+    assert [r.get('status') for r in results] == [409, 409, None, None]
+    assert results[3] == {'op': 'update', 'updated': 1}
+    assert [(c['phone'], c['status']) for c in api_db.all] == [('alice', 'done')]
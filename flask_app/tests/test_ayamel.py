@@ -0,0 +1,52 @@
+import asyncio
+import threading
+import pytest
+from api.models.db.ayamel import AsyncYamel
+
+@pytest.mark.parametrize("yamel", [{"capacity": 100}], indirect=True)
+def test_async_calls_run_off_the_loop(yamel):
+    async def main():
+        async with AsyncYamel(yamel) as adb:
+            created = await asyncio.gather(*(adb.create('alice', f'task {i}') for i in range(20)))
+            assert sorted(c['id'] for c in created) == list(range(1, 21))
+            await adb.create('bob', 'remind me', due=1_700_000_000)
+            assert (await adb.where({'phone': 'bob'}))[0]['due'] == 1_700_000_000
+            assert (await adb.delete({'phone': 'bob'}))['task'] == 'remind me'
+
+            writers = await asyncio.gather(*(adb.transaction(lambda db: threading.get_ident()) for _ in range(5)))
+            assert len(set(writers)) == 1 and threading.get_ident() not in writers
+
+            assert len(await adb.where({'phone': 'alice'})) == 20
+            assert [c['id'] for c in await adb.page(limit=3)] == [1, 2, 3]
+            assert await adb.delete_many([{'id': 1}, {'id': 2}]) == [{'id': 1, 'task': 'task 0'}, {'id': 2, 'task': 'task 1'}]
+            assert (await adb.usage('alice'))['used'] == 18
+    asyncio.run(main())
+
+@pytest.mark.parametrize("yamel", [{"capacity": 100}], indirect=True)
+def test_backpressure_and_cancellation(yamel):
+    async def main():
+        adb = AsyncYamel(yamel, max_pending=2)
+        gate = threading.Event()
+        started = []
+        def slow(db):
+            started.append(1)
+            gate.wait()
+
+        first = asyncio.ensure_future(adb.transaction(slow))
+        second = asyncio.ensure_future(adb.transaction(slow))
+        third = asyncio.ensure_future(adb.create('alice', 'late'))
+        await asyncio.sleep(0.1)
+
+        # two calls hold the slots; the third waits for one without queueing
+        assert adb.pending == 2 and started == [1]
+        second.cancel()
+        third.cancel()
+        await asyncio.sleep(0.05)
+        gate.set()
+        await first
+        await asyncio.sleep(0.05)
+
+        assert started == [1] and adb.pending == 0
+        assert yamel.all == []
+        await adb.aclose()
+    asyncio.run(main())
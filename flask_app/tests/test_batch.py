@@ -0,0 +1,75 @@
+import pytest
+
+def count_writes(yam, monkeypatch):
+    writes = []
+    storage = yam._db.storage
+    write = storage.write
+    monkeypatch.setattr(storage, 'write', lambda data: (writes.append(1), write(data))[1])
+    return writes
+
+def test_bulk_ops_use_one_write_each(open_yamel, monkeypatch):
+    yam = open_yamel(capacity=10_000)
+    writes = count_writes(yam, monkeypatch)
+
+    created = yam.create_many([{'phone': f'user{i % 7}', 'task': f'task {i}'} for i in range(10_000)])
+    assert [c['id'] for c in created[:3]] == [1, 1, 1] and created[7]['id'] == 2
+    assert len(writes) == 1
+
+    assert yam.update_many([({'status': 'done'}, {'phone': 'user1'}), ({'task': 'renamed'}, {'id': 2, 'phone': 'user1'})]) == [1429, 1]
+    assert len(writes) == 2
+
+    deleted = yam.delete_many([{'id': 2, 'phone': 'user1'}, {'phone': 'user3'}, {'id': 99_999}])
+    assert deleted[0] == {'id': 2, 'task': 'renamed'} and deleted[2] is None
+    assert len(writes) == 3
+
+    reopened = open_yamel(capacity=10_000)
+    assert len(reopened.all) == 10_000 - 1 - 1429
+    assert len(reopened.where({'status': 'done'})) == 1428
+
+def test_create_many_is_all_or_nothing(open_yamel):
+    yam = open_yamel(capacity=3)
+    with pytest.raises(ValueError):
+        yam.create_many([{'phone': 'a', 'task': 'ok'}, {'phone': 'a', 'task': 'x' * 101}])
+    with pytest.raises(RuntimeError):
+        yam.create_many([{'phone': 'a', 'task': str(i)} for i in range(4)])
+    assert yam.all == []
+    assert [c['id'] for c in yam.create_many([{'phone': 'a', 'task': str(i)} for i in range(3)])] == [1, 2, 3]
+
+@pytest.mark.parametrize("engine", ["sqlite", "shards"])
+def test_bulk_ops_on_table_engines(open_yamel, engine):
+    yam = open_yamel(engine=engine)
+    yam.create_many([{'phone': 'alice', 'task': 'Feed cat'}, {'phone': 'bob', 'task': 'Fold clothes'}])
+    assert yam.update_many([({'phone': 'carol', 'status': 'done'}, {'id': 1, 'phone': 'alice'}), ({'task': 'Iron'}, {'id': 1, 'phone': 'bob'})]) == [1, 1]
+    assert yam.where({'phone': 'carol'})[0]['status'] == 'done'
+    assert yam.delete_many([{'phone': 'carol'}, {'phone': 'bob'}]) == [{'id': 1, 'task': 'Feed cat'}, {'id': 1, 'task': 'Iron'}]
+    assert len(yam._db) == 0
+
+def test_batch_route_applies_items_in_order(client, api_db):
+    api_db.create('alice', 'Feed cat')
+    res = client.post('/memcells/batch', json=[
+        {'op': 'delete', 'id': 1, 'phone': 'alice'},
+        {'op': 'create', 'phone': 'alice', 'task': 'Reuse slot'},
+        {'op': 'update', 'id': 1, 'phone': 'alice', 'data': {'status': 'done'}},
+    ])
+    assert res.status_code == 200
+    assert res.get_json()['results'] == [
+        {'op': 'delete', 'deleted': {'id': 1, 'task': 'Feed cat'}},
+        {'op': 'create', 'created': {'id': 1, 'task': 'Reuse slot'}},
+        {'op': 'update', 'updated': 1},
+    ]
+    assert [(c['task'], c['status']) for c in api_db.all] == [('Reuse slot', 'done')]
+
+def test_batch_route_reports_failing_items(client, api_db):
+    res = client.post('/memcells/batch', json={'ops': [
+        {'op': 'create', 'phone': 'alice', 'task': 'Feed cat'},
+        {'op': 'create', 'phone': 'alice'},
+        {'op': 'update', 'id': 1, 'phone': 'alice', 'data': {'task': 'x' * 101}},
+        {'op': 'rename'},
+    ]})
+    assert res.status_code == 207
+    results = res.get_json()['results']
+    assert results[0] == {'op': 'create', 'created': {'id': 1, 'task': 'Feed cat'}}
+    assert [('error' in r) for r in results] == [False, True, True, True]
+    assert [c['task'] for c in api_db.all] == ['Feed cat']
+
+    assert client.post('/memcells/batch', json={'op': 'create'}).status_code == 400
@@ -0,0 +1,34 @@
+import pytest
+from api.models.db.cache import ResultCache
+
+def test_result_cache_lru_and_normalized_keys():
+    cache = ResultCache(maxsize=2)
+    assert cache.key(1, 'where', {'a': 1, 'b': 2}) == cache.key(1, 'where', {'b': 2, 'a': 1})
+    assert cache.key(1, 'where', {'a': [1]}) is None
+
+    cache.put(cache.key(1, 'all'), ['x'])
+    cache.put(cache.key(1, 'where', {'a': 1}), ['y'])
+    assert cache.get(cache.key(1, 'all')) == ['x']
+    cache.put(cache.key(2, 'all'), ['z'])
+
+    assert cache.get(cache.key(1, 'where', {'a': 1})) is None
+    assert cache.stats == {'hits': 1, 'misses': 1, 'evictions': 1, 'size': 2}
+
+def test_yamel_reads_are_cached_until_a_write(yamel):
+    yam = yamel
+    yam.create('alice@example.com', 'Feed cat')
+
+    first = yam.all
+    assert yam.all is first
+    assert yam.where({'phone': 'alice@example.com'}) is yam.where({'phone': 'alice@example.com'})
+    assert yam.cache_stats['hits'] == 2
+
+    yam.update({'status': 'done'}, {'id': 1})
+    assert yam.all is not first
+    assert yam.all[0]['status'] == 'done'
+
+def test_yamel_cache_opt_out(open_yamel):
+    yam = open_yamel(cache=False)
+    yam.create('alice@example.com', 'Feed cat')
+    assert yam.all is not yam.all
+    assert yam.cache_stats is None
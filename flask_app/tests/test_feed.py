@@ -0,0 +1,79 @@
+import pytest
+import json
+from api.models.db.feed import ChangeFeed
+
+def drain(sub):
+    events = []
+    while (event := sub.get(timeout=0)) is not None:
+        events.append(event)
+    return events
+
+def test_yamel_publishes_changes(yamel):
+    sub = yamel.subscribe()
+    yamel.create('alice', 'Feed cat')
+    yamel.update({'status': 'done'}, {'id': 1})
+    yamel.delete({'id': 1})
+
+    events = drain(sub)
+    assert [(e.kind, e.cell['status']) for e in events] == [('insert', 'pending'), ('update', 'done'), ('delete', 'done')]
+    assert len({e.id for e in events}) == 3
+    sub.close()
+
+def test_transaction_publishes_on_commit_only(yamel):
+    sub = yamel.subscribe()
+    with pytest.raises(RuntimeError):
+        with yamel.transaction():
+            yamel.create('alice', 'Rolled back')
+            raise RuntimeError('boom')
+    assert drain(sub) == []
+
+    with yamel.transaction():
+        yamel.create('alice', 'Kept')
+        assert drain(sub) == []
+    assert [e.cell['task'] for e in drain(sub)] == ['Kept']
+    sub.close()
+
+def test_resume_and_overflow():
+    feed = ChangeFeed(history=3)
+    first = feed.publish('insert', {'id': 1})
+    for i in range(2, 5):
+        feed.publish('insert', {'id': i})
+
+    # id 2..4 still in history, so a client that saw id 1 resumes cleanly
+    assert [e.cell['id'] for e in drain(feed.subscribe(first.id))] == [2, 3, 4]
+    assert [e.kind for e in drain(feed.subscribe('stale-7'))] == ['reset']
+
+    slow = feed.subscribe(maxsize=1)
+    feed.publish('insert', {'id': 5})
+    feed.publish('insert', {'id': 6})
+    assert slow.overflowed and slow.alive
+    assert slow.get(timeout=0).cell['id'] == 5
+    assert not slow.alive
+
+def read_events(res, count):
+    chunks = iter(res.response)
+    assert next(chunks).startswith(b'retry:')
+    events = []
+    while len(events) < count:
+        fields = dict(line.split(': ', 1) for line in next(chunks).decode().strip().split('\n'))
+        events.append((fields['id'], fields['event'], json.loads(fields['data'])))
+    res.close()
+    return events
+
+def test_events_route_resumes_after_last_event_id(client, api_db):
+    sub = api_db.subscribe()
+    api_db.create('alice', 'Feed cat')
+    api_db.create('bob', 'Fold clothes')
+    api_db.update({'status': 'done'}, {'id': 1, 'phone': 'alice'})
+    seen = drain(sub)
+    sub.close()
+
+    res = client.get('/memcells/events', headers={'Last-Event-ID': seen[0].id})
+    assert res.mimetype == 'text/event-stream'
+    assert [(i, kind, cell['task']) for i, kind, cell in read_events(res, 2)] == [
+        (seen[1].id, 'insert', 'Fold clothes'),
+        (seen[2].id, 'update', 'Feed cat'),
+    ]
+
+    res = client.get('/memcells/events', query_string={'last_id': seen[0].id, 'phone': 'alice'})
+    assert [(kind, cell['status']) for _, kind, cell in read_events(res, 1)] == [('update', 'done')]
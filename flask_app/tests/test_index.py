@@ -0,0 +1,41 @@
+import pytest
+from api.models.db.index import HashIndex
+
+def test_hash_index_intersects_and_filters_residuals():
+    index = HashIndex(('id', 'phone'), [
+        (1, {'id': 1, 'phone': 'a', 'task': 'x'}),
+        (2, {'id': 2, 'phone': 'a', 'task': 'y'}),
+        (3, {'id': 3, 'phone': 'b', 'task': 'x'}),
+    ])
+    assert index.lookup({'phone': 'a'}) == [1, 2]
+    assert index.lookup({'phone': 'a', 'task': 'x'}) == [1]
+    assert index.lookup({'phone': 'a', 'id': 3}) == []
+    assert index.lookup({'task': 'x'}) is None
+
+    index.add(1, {'id': 1, 'phone': 'b', 'task': 'x'})
+    index.discard(3)
+    assert index.lookup({'phone': 'b'}) == [1]
+    assert sorted(index.values('phone')) == ['a', 'b']
+
+def test_yamel_indexed_filters_skip_storage(yamel, monkeypatch):
+    yamel.create('alice@example.com', 'Feed cat')
+    yamel.create('bob@example.com', 'Fold clothes')
+    yamel.create('alice@example.com', 'Paint garage')
+
+    def scan(*args, **kwargs):
+        raise AssertionError('indexed filter fell back to a scan')
+    monkeypatch.setattr(yamel._db, 'search', scan)
+
+    assert [cell['task'] for cell in yamel.where({'phone': 'alice@example.com'})] == ['Feed cat', 'Paint garage']
+    yamel.update({'status': 'done'}, {'id': 1, 'phone': 'alice@example.com'})
+    assert [cell['task'] for cell in yamel.where({'status': 'done'})] == ['Feed cat']
+    assert yamel.delete({'id': 1, 'phone': 'bob@example.com'})['task'] == 'Fold clothes'
+    assert yamel.where({'phone': 'bob@example.com'}) == []
+
+def test_yamel_indexes_rebuilt_on_open(yamel, open_yamel):
+    yamel.create('alice@example.com', 'Feed cat')
+    yamel.update({'status': 'done'}, {'id': 1})
+
+    reopened = open_yamel()
+    assert reopened.where({'status': 'done', 'phone': 'alice@example.com'})[0]['task'] == 'Feed cat'
+    assert reopened.where({'task': 'Feed cat'})[0]['id'] == 1
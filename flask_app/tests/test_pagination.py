@@ -0,0 +1,56 @@
+import pytest
+import types
+import json
+
+@pytest.mark.parametrize("yamel", [{"capacity": 100}], indirect=True)
+def test_iter_all_is_lazy_and_id_ordered(yamel):
+    yamel.create_many([{'phone': 'alice', 'task': f'task {i}'} for i in range(10)])
+    yamel.delete_many([{'id': 3}, {'id': 7}])
+
+    cells = yamel.iter_all()
+    assert isinstance(cells, types.GeneratorType)
+    assert [cell['id'] for cell in cells] == [1, 2, 4, 5, 6, 8, 9, 10]
+
+@pytest.mark.parametrize("yamel", [{"capacity": 100}], indirect=True)
+def test_iter_all_pages_with_cursor(yamel):
+    yamel.create_many([{'phone': 'alice', 'task': f'task {i}'} for i in range(10)])
+
+    pages, after = [], None
+    while True:
+        page = [cell['id'] for cell in yamel.iter_all(after=after, limit=4)]
+        if not page:
+            break
+        pages.append(page)
+        after = page[-1]
+    assert pages == [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10]]
+
+def test_route_pages_with_next_cursor(client, api_db):
+    api_db.create_many([{'phone': phone, 'task': f'{phone} {i}'} for i in range(3) for phone in ('alice', 'bob')])
+
+    pages, after = [], None
+    while True:
+        res = client.get('/memcells', query_string={'limit': 4, **({'after': after} if after else {})})
+        assert res.status_code == 200
+        pages.append([(c['id'], c['phone']) for c in res.get_json()])
+        after = res.headers.get('X-Next-Cursor')
+        if after is None:
+            break
+    assert pages == [
+        [(1, 'alice'), (1, 'bob'), (2, 'alice'), (2, 'bob')],
+        [(3, 'alice'), (3, 'bob')],
+    ]
+
+    res = client.get('/memcells', query_string={'phone': 'bob', 'id__gte': 2})
+    assert [(c['id'], c['phone']) for c in res.get_json()] == [(2, 'bob'), (3, 'bob')]
+    assert client.get('/memcells', query_string={'after': 'nope'}).status_code == 400
+    assert client.get('/memcells', query_string={'limit': 0}).status_code == 400
+
+def test_route_streams_a_json_array(client, api_db):
+    api_db.create_many([{'phone': 'alice', 'task': f'task {i}'} for i in range(5)])
+
+    res = client.get('/memcells', query_string={'stream': 1, 'limit': 3})
+    assert res.is_streamed and res.mimetype == 'application/json'
+    chunks = list(res.response)
+    assert len(chunks) == 5 # '[', three cells, ']'
+    assert [c['id'] for c in json.loads(b''.join(chunks))] == [1, 2, 3]
+    assert res.headers['X-Next-Cursor']
@@ -0,0 +1,53 @@
+import pytest
+from api.models.db.index import HashIndex
+from api.models.db.planner import QueryPlanner, predicates, _compile
+
+DOCS = [
+    (1, {'id': 1, 'phone': 'alice', 'status': 'pending', 'task': 'Buy milk', 'due': 100}),
+    (2, {'id': 2, 'phone': 'alice', 'status': 'done', 'task': 'Buy eggs', 'due': 200}),
+    (3, {'id': 1, 'phone': 'bob', 'status': 'pending', 'task': 'Walk dog'}),
+    (4, {'id': 2, 'phone': 'bob', 'status': 'pending', 'task': 'buy bread', 'due': 300}),
+]
+
+@pytest.fixture
+def planner():
+    return QueryPlanner(HashIndex(('id', 'phone', 'status'), DOCS))
+
+def test_operators(planner):
+    run = lambda filters: planner.plan(filters).run()
+    assert run({'phone': 'alice'}) == [1, 2]
+    assert run({'status': {'in': ['done', 'gone']}}) == [2]
+    assert run({'due': {'gte': 200}}) == [2, 4]
+    assert run({'due': {'gt': 100, 'lt': 300}}) == [2]
+    assert run({'task': {'prefix': 'Buy'}}) == [1, 2]
+    assert run({'phone': 'bob', 'task': {'prefix': 'buy'}}) == [4]
+    assert run({'task': {'gt': 5}}) == []
+    with pytest.raises(ValueError):
+        predicates({'task': {'like': 'x'}})
+
+def test_plan_picks_most_selective_index(planner):
+    plan = planner.plan({'status': 'done', 'phone': 'alice'})
+    assert plan.explain()['strategy'] == 'index'
+    assert (plan.field, plan.estimate) == ('status', 1)
+    assert planner.plan({'task': {'prefix': 'Buy'}}).explain()['strategy'] == 'scan'
+    assert planner.plan({'id': {'lte': 1}}).keys == (1,)
+
+def test_compiled_once_per_shape(planner):
+    planner.plan({'phone': 'alice', 'due': {'lt': 1}}).run()
+    hits = _compile.cache_info().hits
+    planner.plan({'phone': 'bob', 'due': {'lt': 999}}).run()
+    assert _compile.cache_info().hits > hits
+
+def test_yamel_rich_filters(yamel):
+    yamel.create('alice', 'Buy milk', due=100)
+    yamel.create('alice', 'Buy eggs', due=200)
+    yamel.create('bob', 'Walk dog')
+
+    assert [c['task'] for c in yamel.where({'due': {'lt': 150}})] == ['Buy milk']
+    assert yamel.update({'status': 'done'}, {'phone': 'alice', 'task': {'prefix': 'Buy'}}) == [1, 2]
+    assert [c['task'] for c in yamel.iter_all(filters={'status': {'in': ['pending']}})] == ['Walk dog']
+    assert yamel.explain({'phone': 'bob'})['strategy'] == 'index'
+
+    with yamel.transaction():
+        yamel.create('bob', 'Buy bread', due=50)
+        assert [c['task'] for c in yamel.where({'due': {'lte': 100}})] == ['Buy bread', 'Buy milk']
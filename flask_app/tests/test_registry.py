@@ -0,0 +1,118 @@
+import threading
+import pytest
+from api.utils import Highlander
+from api.models.db.registry import Registry
+
+def test_tables_are_independent_and_shared_per_key(temp_path):
+    reg = Registry()
+    with reg.lease(temp_path, "a") as a, reg.lease(str(temp_path), "b") as b:
+        assert a is not b
+        a.create("1", "only in a")
+        assert [c["task"] for c in a.all] == ["only in a"]
+        assert b.all == []
+        with reg.lease(temp_path.parent / "." / temp_path.name, "a") as again:
+            assert again is a
+    assert len(reg) == 2
+    reg.close()
+
+@pytest.mark.parametrize("engine", ["yaml", "cache", "journal", "shards", "sqlite"])
+def test_tables_of_one_file_keep_concurrent_writes(temp_path, engine):
+    reg = Registry(engine = engine, capacity = 1000)
+
+    def fill(table):
+        with reg.lease(temp_path, table) as db:
+            for i in range(50):
+                db.create(f"user{i % 3}", f"{table} {i}")
+
+    threads = [threading.Thread(target = fill, args = (table,)) for table in ("a", "b")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    reg.close()
+
+    reopened = Registry(engine = engine, capacity = 1000)
+    for table in ("a", "b"):
+        with reopened.lease(temp_path, table) as db:
+            assert sorted(c["task"] for c in db.all) == sorted(f"{table} {i}" for i in range(50))
+    reopened.close()
+
+def test_idle_and_over_cap_tables_are_closed(temp_path):
+    now = [0.0]
+    reg = Registry(handles = 2, idle = 10, clock = lambda: now[0])
+
+    held = reg.open(temp_path, "held")
+    for table in ("x", "y"):
+        with reg.lease(temp_path, table) as db:
+            db.create("1", table)
+    # cap of 2: the least recently used unleased table went first
+    assert (temp_path, "x") not in reg and (temp_path, "y") in reg and (temp_path, "held") in reg
+
+    now[0] = 60
+    assert reg.sweep() == 1
+    assert (temp_path, "held") in reg and len(reg) == 1
+
+    # a closed table reopens from disk
+    with reg.lease(temp_path, "x") as db:
+        assert [c["task"] for c in db.all] == ["x"]
+    reg.release(temp_path, "held")
+    assert not held.closed
+    now[0] = 120
+    reg.sweep()
+    assert held.closed and len(reg) == 0
+    with pytest.raises(RuntimeError):
+        held.create("1", "late")
+    reg.close()
+
+def test_highlander_creates_one_instance_under_contention():
+    calls = []
+    barrier = threading.Barrier(8)
+
+    class Once(metaclass = Highlander):
+        def __init__(self):
+            calls.append(1)
+
+    def make(out):
+        barrier.wait()
+        out.append(Once())
+
+    out = []
+    threads = [threading.Thread(target = make, args = (out,)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1 and all(o is out[0] for o in out)
+    Highlander._instances.pop(Once, None)
+
+def test_table_names_every_engine_accepts(temp_path):
+    reg = Registry(engine = "sqlite")
+    for bad in ("bad-name", "1st", "x" * 65, "", "a.b"):
+        with pytest.raises(ValueError):
+            reg.open(temp_path, bad)
+    with reg.lease(temp_path, "_Work_2") as db:
+        db.create("1", "ok")
+    assert len(reg) == 1
+    reg.close()
+
+def test_table_routes(client, api_db, registry):
+    assert client.post("/work/memcells", json = {"phone": "alice", "task": "Ship it"}).status_code == 201
+    assert [c["task"] for c in client.get("/work/memcells").get_json()] == ["Ship it"]
+    assert client.get("/work/memcells/1", query_string = {"phone": "alice"}).get_json()["task"] == "Ship it"
+    assert client.get("/memcells").get_json() == [] and api_db.all == []
+
+    # the configured table is the same database under either URL
+    client.post("/memcells/batch", json = [{"op": "create", "phone": "bob", "task": "Default", "due": 2_000_000_000}])
+    assert [c["task"] for c in client.get("/memcells/memcells").get_json()] == ["Default"]
+
+    for bad in ("bad-name", "1st", "x" * 65):
+        assert client.get(f"/{bad}/memcells").status_code == 404
+
+    # reminders are only scheduled for the configured table
+    assert client.post("/work/memcells", json = {"phone": "alice", "task": "Later", "due": 2_000_000_000}).status_code == 400
+    assert client.put("/work/memcells/1", query_string = {"phone": "alice"}, json = {"due": 2_000_000_000}).status_code == 400
+    res = client.post("/work/memcells/batch", json = [{"op": "update", "id": 1, "phone": "alice", "data": {"due": 2_000_000_000}}])
+    assert res.status_code == 207 and "error" in res.get_json()["results"][0]
+
+    # every request returned its lease
+    assert all(entry.users == (1 if key[1] == "memcells" else 0) for key, entry in registry._entries.items())
@@ -0,0 +1,79 @@
+import threading
+import time
+import pytest
+from api.models.db.rwlock import RWLock
+
+def test_writers_are_exclusive_and_fifo():
+    lock = RWLock()
+    order, inside = [], []
+    release = threading.Event()
+
+    def writer(n):
+        with lock.update('w'):
+            inside.append(n)
+            assert len(inside) == 1
+            order.append(n)
+            if n == 0:
+                release.wait(5)
+            inside.remove(n)
+
+    threads = [threading.Thread(target=writer, args=(0,))]
+    threads[0].start()
+    time.sleep(0.05)
+    for n in range(1, 5):
+        threads.append(threading.Thread(target=writer, args=(n,)))
+        threads[-1].start()
+        time.sleep(0.02)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert order == [0, 1, 2, 3, 4]
+    assert lock.stats()['w']['update']['wait']['count'] == 5
+
+def test_readers_pass_writers_but_queue_behind_exclusive():
+    lock = RWLock()
+    with lock.update('w'):
+        # a writer holding the update slot does not block readers
+        done = threading.Event()
+        def read():
+            with lock.shared('r'):
+                done.set()
+        threading.Thread(target=read).start()
+        assert done.wait(5)
+
+    lock = RWLock()
+    reading, release, events = threading.Event(), threading.Event(), []
+    def reader(tag, hold):
+        with lock.shared('r'):
+            events.append(tag)
+            if hold:
+                reading.set()
+                release.wait(5)
+    def publisher():
+        with lock.exclusive('x'):
+            events.append('x')
+
+    first = threading.Thread(target=reader, args=('r1', True))
+    first.start()
+    assert reading.wait(5)
+    upgrade = threading.Thread(target=publisher)
+    upgrade.start()
+    time.sleep(0.05)
+    late = threading.Thread(target=reader, args=('r2', False))
+    late.start()
+    time.sleep(0.05)
+    assert events == ['r1']
+    release.set()
+    for t in (first, upgrade, late):
+        t.join(5)
+    assert events == ['r1', 'x', 'r2']
+
+def test_yamel_records_lock_metrics(yamel):
+    yamel.create('alice', 'Task')
+    yamel.update({'status': 'done'}, {'id': 1, 'phone': 'alice'})
+    yamel.where({'phone': 'alice'})
+    stats = yamel.lock_stats
+    assert stats['create']['update']['hold']['count'] == 1
+    assert stats['publish']['exclusive']['wait']['count'] >= 3
+    assert stats['where']['shared']['wait']['count'] == 1
+    assert sum(stats['update']['update']['wait']['buckets'].values()) == 1
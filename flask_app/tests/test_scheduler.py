@@ -0,0 +1,94 @@
+import pytest
+from api.models import Smtp
+from api.controllers.scheduler import Scheduler
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+class Outbox(Smtp):
+    def __init__(self):
+        super().__init__('bot@example.com', 'pw', '0000000000')
+        self.sent = []
+        self.down = False
+
+    def send(self, body, phone=None):
+        if self.down:
+            return False
+        self.sent.append((phone, body))
+        return True
+
+@pytest.fixture
+def parts(yamel):
+    clock, outbox = Clock(), Outbox()
+    return yamel, clock, outbox, Scheduler(yamel, outbox, clock=clock)
+
+def test_rebuild_and_fire_in_due_order(parts):
+    yamel, clock, outbox, scheduler = parts
+    yamel.create('alice', 'Later', due=1200)
+    yamel.create('bob', 'Sooner', due=1100)
+    yamel.create('alice', 'No reminder')
+    scheduler.rebuild()
+    assert len(scheduler) == 2 and scheduler.next_due == 1100
+
+    assert scheduler.tick() == []
+    clock.now = 1250
+    fired = scheduler.tick()
+    assert [(c['phone'], c['task']) for c in fired] == [('bob', 'Sooner'), ('alice', 'Later')]
+    assert [phone for phone, _ in outbox.sent] == ['bob', 'alice']
+    assert '[REMINDER]' in outbox.sent[0][1]
+
+    # fires once: the due time is cleared on the record
+    assert all('due' not in c for c in yamel.all)
+    assert scheduler.tick() == [] and len(scheduler) == 0
+
+def test_follows_updates_and_deletes(parts):
+    yamel, clock, outbox, scheduler = parts
+    scheduler.rebuild()
+    yamel.create('alice', 'Moved', due=1100)
+    yamel.create('alice', 'Deleted', due=1100)
+    yamel.create('alice', 'Finished', due=1100)
+    yamel.update({'due': 1500}, {'id': 1, 'phone': 'alice'})
+    yamel.delete({'id': 2, 'phone': 'alice'})
+    yamel.update({'status': 'done'}, {'id': 3, 'phone': 'alice'})
+    for bad in ({'due': 'soon'}, {'task': None}):
+        with pytest.raises(ValueError):
+            yamel.update(bad, {'id': 1, 'phone': 'alice'})
+
+    clock.now = 1200
+    assert scheduler.tick() == []
+    assert scheduler.next_due == 1500
+    clock.now = 1500
+    assert [c['task'] for c in scheduler.tick()] == ['Moved']
+    assert len(outbox.sent) == 1
+
+def test_stale_entries_are_compacted(parts):
+    yamel, clock, outbox, scheduler = parts
+    scheduler.rebuild()
+    yamel.create('alice', 'Busy', due=2000)
+    for i in range(500):
+        yamel.update({'due': 2000 + i}, {'id': 1, 'phone': 'alice'})
+        scheduler.tick()
+    assert len(scheduler) == 1
+    assert len(scheduler._heap) < 200
+    assert scheduler.next_due == 2499
+
+def test_failed_send_keeps_the_reminder(parts):
+    yamel, clock, outbox, scheduler = parts
+    yamel.create('alice', 'Retry me', due=1100)
+    scheduler.rebuild()
+
+    outbox.down = True
+    clock.now = 1100
+    assert scheduler.tick() == []
+    assert yamel.all[0]['due'] == 1100
+    assert len(scheduler) == 1 and scheduler.next_due == 1100 + Scheduler.RETRY
+
+    outbox.down = False
+    assert scheduler.tick() == []
+    clock.now = 1100 + Scheduler.RETRY
+    assert [c['task'] for c in scheduler.tick()] == ['Retry me']
+    assert len(outbox.sent) == 1 and 'due' not in yamel.all[0]
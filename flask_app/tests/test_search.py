@@ -0,0 +1,55 @@
+import pytest
+from api.models.db.index import TextIndex
+
+def test_text_index_prefix_and():
+    index = TextIndex()
+    index.add(1, 'Buy milk and eggs')
+    index.add(2, 'buy Bread')
+    index.add(3, 'Call mom')
+
+    assert index.search('buy') == [1, 2]
+    assert index.search('BU mil') == [1]
+    assert index.search('buy call') == []
+    assert index.search('') == []
+
+    index.add(1, 'Sell milk')
+    assert index.search('buy') == [2]
+    index.discard(2)
+    assert index.search('buy') == []
+    assert 'buy' not in index._vocab
+
+def test_yamel_search_tracks_writes(yamel):
+    yamel.create('alice', 'Buy milk')
+    yamel.create('bob', 'Buy bread')
+    yamel.create('alice', 'Walk dog')
+
+    assert [c['task'] for c in yamel.search('buy')] == ['Buy milk', 'Buy bread']
+    assert [c['task'] for c in yamel.search('buy', phone='bob')] == ['Buy bread']
+
+    yamel.update({'task': 'Walk cat'}, {'id': 1, 'phone': 'bob'})
+    assert [c['task'] for c in yamel.search('buy')] == ['Buy milk']
+    assert [c['task'] for c in yamel.search('walk')] == ['Walk cat', 'Walk dog']
+
+    yamel.delete({'id': 1, 'phone': 'alice'})
+    assert yamel.search('milk') == []
+
+def test_search_rolls_back_with_transaction(yamel):
+    yamel.create('alice', 'Buy milk')
+    with pytest.raises(RuntimeError):
+        with yamel.transaction():
+            yamel.update({'task': 'Sell milk'}, {'id': 1})
+            assert [c['task'] for c in yamel.search('sell')] == ['Sell milk']
+            raise RuntimeError('boom')
+    assert yamel.search('sell') == []
+    assert [c['task'] for c in yamel.search('buy')] == ['Buy milk']
+
+def test_search_route(client, api_db):
+    api_db.create('alice', 'Buy milk')
+    api_db.create('bob', 'buy bread')
+    api_db.create('alice', 'Call mom')
+
+    res = client.get('/memcells/search', query_string={'q': 'BUY'})
+    assert [(c['id'], c['phone']) for c in res.get_json()] == [(1, 'alice'), (1, 'bob')]
+    res = client.get('/memcells/search', query_string={'q': 'buy', 'phone': 'bob'})
+    assert [c['task'] for c in res.get_json()] == ['buy bread']
+    assert client.get('/memcells/search', query_string={'q': ' '}).status_code == 400
@@ -0,0 +1,37 @@
+import pytest
+from pathlib import Path
+from api.models.db.yamel import Yamel
+from api.models.db.shards import ShardedTable
+
+@pytest.mark.parametrize("yamel", [{"engine": "shards"}], indirect=True)
+def test_writes_touch_only_owner_shard(yamel, temp_path):
+    yam = yamel
+    yam.create('alice@example.com', 'Feed cat')
+    yam.create('bob@example.com', 'Fold clothes')
+
+    shards = Path(f'{temp_path}.shards')
+    bob = shards / 'bob@example.com.yaml'
+    before = bob.stat().st_mtime_ns
+
+    yam.create('alice@example.com', 'Paint garage')
+    yam.update({'status': 'done'}, {'phone': 'alice@example.com', 'id': 1})
+
+    assert bob.stat().st_mtime_ns == before
+    assert [cell['task'] for cell in yam.where({'phone': 'alice@example.com'})] == ['Feed cat', 'Paint garage']
+    assert [(cell['phone'], cell['id']) for cell in yam.all] == [('alice@example.com', 1), ('bob@example.com', 1), ('alice@example.com', 2)]
+
+def test_shards_reopen_and_merge_in_order(temp_path):
+    table = ShardedTable(str(temp_path), 'memcells')
+    ids = table.insert_multiple([
+        {'id': 1, 'phone': 'a', 'task': 'one', 'status': 'pending'},
+        {'id': 2, 'phone': 'b', 'task': 'two', 'status': 'pending'},
+        {'id': 3, 'phone': 'a', 'task': 'three', 'status': 'pending'},
+    ])
+    assert ids == [1, 2, 3]
+
+    table.update({'phone': 'b'}, doc_ids=[3])
+    table.remove(doc_ids=[1])
+
+    reopened = ShardedTable(str(temp_path), 'memcells')
+    assert [(doc.doc_id, doc['phone']) for doc in reopened] == [(2, 'b'), (3, 'b')]
+    assert reopened.insert({'id': 4, 'phone': 'c', 'task': 'four', 'status': 'pending'}) == 4
@@ -0,0 +1,75 @@
+import threading
+import pytest
+from api.models.db.index import HashIndex
+
+def test_fork_is_copy_on_write():
+    docs = [(i, {'id': i, 'phone': 'alice' if i % 2 else 'bob', 'status': 'pending', 'task': f'Task {i}'}) for i in range(1, 200)]
+    base = HashIndex(('id', 'phone', 'status'), docs, text='task', tally=('phone', 'status'))
+    snap = base.fork()
+
+    base.add(1, {'id': 1, 'phone': 'carol', 'status': 'done', 'task': 'Moved'})
+    base.discard(2)
+    base.add(500, {'id': 500, 'phone': 'alice', 'status': 'pending', 'task': 'New'})
+
+    assert len(snap) == 199 and len(base) == 199
+    assert snap.get(1)['phone'] == 'alice' and snap.get(2) is not None and snap.get(500) is None
+    assert snap.lookup({'phone': 'carol'}) == [] and base.lookup({'phone': 'carol'}) == [1]
+    assert snap.search('moved') == [] and base.search('moved') == [1]
+    assert snap.tally('bob')['pending'] == 99 and base.tally('bob')['pending'] == 98
+
+    # untouched chunks are still shared, not copied
+    assert snap._docs[100 >> HashIndex.CHUNK] is base._docs[100 >> HashIndex.CHUNK]
+
+def test_reads_do_not_wait_for_a_slow_write(yamel, monkeypatch):
+    yamel.create('alice', 'Existing')
+    entered, release = threading.Event(), threading.Event()
+    update_table = yamel._db._update_table
+    def slow_write(updater):
+        entered.set()
+        release.wait(5)
+        return update_table(updater)
+    monkeypatch.setattr(yamel._db, '_update_table', slow_write)
+
+    writer = threading.Thread(target=yamel.create, args=('alice', 'Slow'))
+    writer.start()
+    assert entered.wait(5)
+
+    # the write is in flight: readers see the last published version at once
+    assert [c['task'] for c in yamel.all] == ['Existing']
+    assert [c['task'] for c in yamel.where({'phone': 'alice'})] == ['Existing']
+    assert yamel.stats('alice')['total'] == 1
+
+    release.set()
+    writer.join(5)
+    assert [c['task'] for c in yamel.all] == ['Existing', 'Slow']
+
+def test_transaction_is_invisible_to_other_threads(yamel):
+    yamel.create('alice', 'Committed')
+    opened, done = threading.Event(), threading.Event()
+    seen = []
+
+    def work():
+        with yamel.transaction():
+            yamel.create('alice', 'Pending')
+            seen.append(len(yamel.all))
+            opened.set()
+            done.wait(5)
+
+    worker = threading.Thread(target=work)
+    worker.start()
+    assert opened.wait(5)
+    assert seen == [2]
+    assert [c['task'] for c in yamel.all] == ['Committed']
+    assert yamel.search('pending') == []
+
+    done.set()
+    worker.join(5)
+    assert [c['task'] for c in yamel.all] == ['Committed', 'Pending']
+
+def test_iterators_keep_their_snapshot(yamel):
+    yamel.create_many([{'phone': 'alice', 'task': f'Task {i}'} for i in range(3)])
+    pages = yamel.iter_all()
+    first = next(pages)
+    yamel.delete({'id': 2, 'phone': 'alice'})
+    assert [first['id']] + [c['id'] for c in pages] == [1, 2, 3]
+    assert [c['id'] for c in yamel.iter_all()] == [1, 3]
@@ -0,0 +1,45 @@
+import pytest
+from pathlib import Path
+from tinydb import TinyDB
+from api.models.db.yamel import Yamel
+from api.models.db.ystore import YStorage
+from api.models.db.sqlite import SqliteTable, migrate
+
+@pytest.mark.parametrize("yamel", [{"engine": "sqlite"}], indirect=True)
+def test_yamel_on_sqlite(yamel):
+    yam = yamel
+    yam.create('alice@example.com', 'Feed cat')
+    yam.create('bob@example.com', 'Fold clothes')
+    yam.create('alice@example.com', 'Paint garage')
+
+    assert [cell['id'] for cell in yam.all] == [1, 1, 2]
+    assert [cell['task'] for cell in yam.where({'phone': 'alice@example.com'})] == ['Feed cat', 'Paint garage']
+
+    yam.update({'status': 'done'}, {'phone': 'bob@example.com', 'id': 1})
+    assert yam.where({'status': 'done'})[0]['task'] == 'Fold clothes'
+
+    deleted = yam.delete({'phone': 'bob@example.com', 'id': 1})
+    assert deleted == {'id': 1, 'task': 'Fold clothes'}
+    assert all(cell['phone'] != 'bob@example.com' for cell in yam.all)
+
+    indexes = yam._db._conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'").fetchall()
+    assert sorted(name for name, in indexes) == ["memcells_id", "memcells_phone", "memcells_status"]
+
+def test_migrate_from_yaml(temp_dir):
+    src = temp_dir / "memcells.yaml"
+    src.touch()
+    db = TinyDB(str(src), storage=YStorage)
+    db.table('memcells').insert_multiple([
+        {'id': 1, 'phone': '555', 'task': 'Feed cat', 'status': 'pending'},
+        {'id': 2, 'phone': '555', 'task': 'Fold clothes', 'status': 'done'},
+    ])
+    db.close()
+
+    dst = migrate(src, temp_dir / "memcells.sqlite3")
+    table = SqliteTable(str(dst), 'memcells')
+    assert [doc.doc_id for doc in table.all()] == [1, 2]
+    assert [doc['task'] for doc in table.all() if doc['status'] == 'done'] == ['Fold clothes']
+    table.close()
+
+    with pytest.raises(FileExistsError):
+        migrate(src, dst)
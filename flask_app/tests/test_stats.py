@@ -0,0 +1,39 @@
+import pytest
+
+def test_stats_follow_writes(open_yamel):
+    db = open_yamel()
+    db.create_many([{'phone': 'alice', 'task': 'One'}, {'phone': 'alice', 'task': 'Two'}, {'phone': 'bob', 'task': 'Three'}])
+    db.update({'status': 'done'}, {'id': 1, 'phone': 'alice'})
+
+    assert db.stats() == {'total': 3, 'by_status': {'pending': 2, 'done': 1}, 'by_phone': {'alice': 2, 'bob': 1}}
+    assert db.stats('alice') == {'total': 2, 'by_status': {'pending': 1, 'done': 1}}
+
+    db.delete({'id': 1, 'phone': 'bob'})
+    assert db.stats('bob') == {'total': 0, 'by_status': {}}
+    assert db.stats()['by_phone'] == {'alice': 2}
+
+def test_stats_rollback_and_reopen(open_yamel):
+    db = open_yamel()
+    db.create('alice', 'Keep')
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.create('alice', 'Drop')
+            db.update({'status': 'done'}, {'id': 1, 'phone': 'alice'})
+            assert db.stats('alice')['by_status'] == {'pending': 1, 'done': 1}
+            raise RuntimeError('boom')
+    assert db.stats('alice') == {'total': 1, 'by_status': {'pending': 1}}
+
+    db = open_yamel()
+    assert db.stats() == {'total': 1, 'by_status': {'pending': 1}, 'by_phone': {'alice': 1}}
+
+def test_stats_routes(client, api_db):
+    api_db.create('alice', 'One')
+    api_db.create('bob', 'Two')
+    api_db.update({'status': 'done'}, {'id': 1, 'phone': 'bob'})
+
+    assert client.get('/memcells/stats').get_json() == {'total': 2, 'by_status': {'pending': 1, 'done': 1}, 'by_phone': {'alice': 1, 'bob': 1}}
+    assert client.get('/memcells/stats', query_string={'phone': 'bob'}).get_json() == {'total': 1, 'by_status': {'done': 1}}
+
+    locks = client.get('/memcells/stats/locks').get_json()
+    assert {'create', 'update'} <= locks.keys()
+    assert {'wait', 'hold'} <= locks['create']['update'].keys()
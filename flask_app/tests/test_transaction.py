@@ -0,0 +1,52 @@
+import pytest
+
+def test_transaction_commits_once_and_reads_overlay(open_yamel, monkeypatch):
+    yam = open_yamel()
+    yam.create('alice@example.com', 'Feed cat')
+
+    writes = []
+    storage = yam._db.storage
+    write = storage.write
+    monkeypatch.setattr(storage, 'write', lambda data: (writes.append(1), write(data))[1])
+
+    with yam.transaction():
+        yam.create('bob@example.com', 'Fold clothes')
+        yam.update({'status': 'done'}, {'id': 1, 'phone': 'alice@example.com'})
+        assert yam.where({'phone': 'bob@example.com'})[0]['id'] == 1
+        assert [cell['status'] for cell in yam.all] == ['done', 'pending']
+        yam.create('carol@example.com', 'Short-lived')
+        yam.delete({'phone': 'carol@example.com'})
+        assert writes == []
+    assert len(writes) == 1
+
+    reopened = open_yamel()
+    assert [(cell['id'], cell['status']) for cell in reopened.all] == [(1, 'done'), (1, 'pending')]
+    assert reopened.create('alice@example.com', 'Next')['id'] == 2
+
+def test_transaction_rolls_back_on_error(open_yamel):
+    yam = open_yamel()
+    yam.create('alice@example.com', 'Feed cat')
+
+    with pytest.raises(KeyError):
+        with yam.transaction():
+            yam.delete({'id': 1})
+            yam.create('bob@example.com', 'Fold clothes')
+            raise KeyError('boom')
+
+    assert [(cell['id'], cell['task']) for cell in yam.all] == [(1, 'Feed cat')]
+    assert yam.create('alice@example.com', 'Fold clothes')['id'] == 2
+
+    reopened = open_yamel()
+    assert [cell['id'] for cell in reopened.all] == [1, 2]
+
+@pytest.mark.parametrize("engine", ["sqlite", "shards"])
+def test_transaction_on_table_engines(open_yamel, engine):
+    yam = open_yamel(engine=engine)
+    yam.create('alice', 'Feed cat')
+    with yam.transaction():
+        yam.delete({'id': 1})
+        yam.create('bob', 'Fold clothes')
+        yam.update({'phone': 'carol'}, {'id': 1})
+
+    reopened = open_yamel(engine=engine)
+    assert [(cell['id'], cell['phone']) for cell in reopened.all] == [(1, 'carol')]
@@ -0,0 +1,306 @@
+import pytest
+import os
+import json
+import multiprocessing
+import time
+import threading
+from pathlib import Path
+import tempfile
+from tinydb import TinyDB, Query
+from api.models.db.journal import JStorage
+from api.models.db.ystore import YStorage, GroupCommit, codec_for, convert
+from api.models.db.middlewares import WriteBack
+from api.models.db.yamel import Yamel
+
+@pytest.fixture
+def temp_path():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir) / "memcells.yaml"
+
+def test_journal_replays_after_reopen(temp_path):
+    db = TinyDB(str(temp_path), storage=JStorage)
+    tb = db.table('memcells')
+    tb.insert({'id': 1, 'phone': '555', 'task': 'Feed cat', 'status': 'pending'})
+    tb.insert({'id': 2, 'phone': '555', 'task': 'Fold clothes', 'status': 'pending'})
+    tb.update({'status': 'done'}, Query().id == 1)
+    tb.remove(Query().id == 2)
+    db.close()
+
+    # one record per mutation, snapshot untouched
+    lines = Path(f'{temp_path}.journal').read_text().splitlines()
+    assert len(lines) == 4
+    assert not temp_path.exists()
+
+    db = TinyDB(str(temp_path), storage=JStorage)
+    docs = db.table('memcells').all()
+    assert [d['id'] for d in docs] == [1]
+    assert docs[0]['status'] == 'done'
+    db.close()
+
+def test_journal_ignores_torn_tail(temp_path):
+    db = TinyDB(str(temp_path), storage=JStorage)
+    db.table('memcells').insert({'id': 1, 'phone': '555', 'task': 'Feed cat', 'status': 'pending'})
+    db.close()
+
+    with open(f'{temp_path}.journal', 'a') as f:
+        f.write('{"op":"put","tb":"memc')
+
+    db = TinyDB(str(temp_path), storage=JStorage)
+    assert len(db.table('memcells')) == 1
+    db.close()
+
+def test_journal_compacts_into_snapshot(temp_path):
+    db = TinyDB(str(temp_path), storage=JStorage, threshold=512)
+    tb = db.table('memcells')
+    for i in range(1, 51):
+        tb.insert({'id': i, 'phone': '555', 'task': f'Task {i}', 'status': 'pending'})
+    db.close()
+
+    assert temp_path.exists()
+    assert not Path(f'{temp_path}.journal.old').exists()
+    assert len(Path(f'{temp_path}.journal').read_text().splitlines()) < 50
+
+    db = TinyDB(str(temp_path), storage=JStorage)
+    assert sorted(d['id'] for d in db.table('memcells').all()) == list(range(1, 51))
+    db.close()
+
+def test_yamel_journals_only_touched_records(open_yamel, temp_dir, monkeypatch):
+    yam = open_yamel(engine="journal", capacity=100)
+    yam.create_many([{'phone': 'alice', 'task': f'Task {i}'} for i in range(50)])
+    log = temp_dir / "memcells.yaml.journal"
+    before = len(log.read_text().splitlines())
+    assert before == 50
+
+    # Yamel names the documents it writes, so the state is never copied
+    monkeypatch.setattr('api.models.db.journal._clone', lambda data: pytest.fail('state copied'))
+    yam.update({'status': 'done'}, {'id': 7, 'phone': 'alice'})
+    yam.delete({'id': 8, 'phone': 'alice'})
+    yam.create('alice', 'Reuse slot')
+    records = [json.loads(line) for line in log.read_text().splitlines()[before:]]
+    assert [(r['op'], r['id']) for r in records] == [('put', '7'), ('del', '8'), ('put', '51')]
+    yam.close()
+
+    reopened = open_yamel(engine="journal", capacity=100)
+    assert len(reopened.all) == 50
+    assert reopened.where({'id': 8, 'phone': 'alice'})[0]['task'] == 'Reuse slot'
+    assert reopened.where({'status': 'done'})[0]['id'] == 7
+
+def test_codec_inferred_from_extension(temp_path):
+    json_path = temp_path.with_suffix('.json')
+    json_path.touch()
+    db = TinyDB(str(json_path), storage=YStorage)
+    db.table('memcells').insert({'id': 1, 'phone': '555', 'task': 'Feed cat', 'status': 'pending'})
+    db.close()
+
+    assert json.loads(json_path.read_text())['memcells']['1']['task'] == 'Feed cat'
+
+def test_convert_keeps_source_and_journal_history(temp_path):
+    db = TinyDB(str(temp_path), storage=JStorage)
+    db.table('memcells').insert({'id': 1, 'phone': '555', 'task': 'Feed cat', 'status': 'pending'})
+    db.close()
+
+    dst = convert(temp_path, temp_path.with_suffix('.json'))
+    assert YStorage(str(dst)).read()['memcells']['1']['task'] == 'Feed cat'
+    assert Path(f'{temp_path}.journal').exists()
+
+    with pytest.raises(FileExistsError):
+        convert(temp_path, dst)
+
+def test_writeback_coalesces_flushes(temp_path):
+    temp_path.touch()
+    cache = WriteBack(YStorage, delay=0.2)
+    db = TinyDB(str(temp_path), storage=cache)
+    tb = db.table('memcells')
+    for i in range(1, 21):
+        tb.insert({'id': i, 'phone': '555', 'task': f'Task {i}', 'status': 'pending'})
+
+    # nothing persisted yet, reads served from memory
+    assert YStorage(str(temp_path)).read() == {}
+    assert len(tb) == 20
+
+    time.sleep(0.5)
+    assert cache.writes == 20
+    assert cache.flushes == 1
+    assert len(YStorage(str(temp_path)).read()['memcells']) == 20
+    db.close()
+
+def test_writeback_flushes_on_close(temp_path):
+    temp_path.touch()
+    db = TinyDB(str(temp_path), storage=WriteBack(YStorage, delay=60))
+    db.table('memcells').insert({'id': 1, 'phone': '555', 'task': 'Feed cat', 'status': 'pending'})
+    db.close()
+
+    assert YStorage(str(temp_path)).read()['memcells']['1']['task'] == 'Feed cat'
+
+def test_writeback_shares_its_cache_and_copies_on_flush(temp_path):
+    temp_path.touch()
+    cache = WriteBack(YStorage, delay=60)
+    db = TinyDB(str(temp_path), storage=cache)
+    tb = db.table('memcells')
+    tb.insert({'id': 1, 'phone': '555', 'task': 'Feed cat', 'status': 'pending'})
+    assert cache.read() is cache.read()
+
+    cache.flush()
+    # an in-place update after the flush leaves the written copy alone
+    tb.update({'status': 'done'})
+    assert YStorage(str(temp_path)).read()['memcells']['1']['status'] == 'pending'
+    db.close()
+    assert YStorage(str(temp_path)).read()['memcells']['1']['status'] == 'done'
+
+def test_writeback_retries_failed_flush(temp_path):
+    temp_path.touch()
+    cache = WriteBack(YStorage, delay=0.05)
+    db = TinyDB(str(temp_path), storage=cache)
+    tb = db.table('memcells')
+    tb.insert({'id': 1, 'phone': '555', 'task': 'Feed cat', 'status': 'pending'})
+
+    write, fails = cache.storage.write, [1]
+    def flaky(data):
+        if fails:
+            fails.pop()
+            raise OSError('disk full')
+        write(data)
+    cache.storage.write = flaky
+
+    time.sleep(0.3)
+    assert not fails and cache._flusher.is_alive()
+    tb.insert({'id': 2, 'phone': '555', 'task': 'Walk dog', 'status': 'pending'})
+    time.sleep(0.3)
+    assert len(YStorage(str(temp_path)).read()['memcells']) == 2
+    db.close()
+
+def test_snapshot_cache_hits_until_file_changes(temp_path):
+    temp_path.write_text("memcells:\n  '1': {id: 1, phone: '555', status: pending, task: Feed cat}\n")
+    store = YStorage(str(temp_path))
+
+    first = store.read()
+    first['memcells']['1']['task'] = 'mutated by caller'
+    assert store.read()['memcells']['1']['task'] == 'Feed cat'
+    assert store.stats == {'hits': 1, 'misses': 1}
+
+    # an external writer changes size/mtime -> re-parse
+    temp_path.write_text("memcells:\n  '1': {id: 1, phone: '555', status: done, task: Feed the cat}\n")
+    assert store.read()['memcells']['1']['status'] == 'done'
+    assert store.stats == {'hits': 1, 'misses': 2}
+
+    # own writes refresh the snapshot without a re-parse
+    store.write({'memcells': {}})
+    assert store.read() == {'memcells': {}}
+    assert store.stats == {'hits': 2, 'misses': 2}
+
+def test_group_commit_batches_concurrent_writers(temp_path):
+    temp_path.touch()
+    store = YStorage(str(temp_path), window=0.01)
+    docs = [{'memcells': {str(i): {'id': i, 'phone': '555', 'task': f'Task {i}', 'status': 'pending'}}} for i in range(1, 33)]
+
+    workers = [threading.Thread(target=store.write, args=(doc,)) for doc in docs]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    stats = store.commits
+    assert stats['writes'] == 32
+    assert 1 <= stats['fsyncs'] < 32
+    assert YStorage(str(temp_path)).read() in docs
+    assert list(temp_path.parent.glob('*.tmp')) == []
+
+def test_group_commit_coalesces_writers_queued_behind_a_commit(temp_path, monkeypatch):
+    group = GroupCommit(str(temp_path), window=10)
+    codec = codec_for(str(temp_path))
+    docs = [{'memcells': {'1': {'id': 1, 'task': f'Task {i}'}}} for i in range(6)]
+
+    # an uncontended write does not wait out the window
+    started = time.monotonic()
+    group.commit(docs[0], codec)
+    assert time.monotonic() - started < 5 and group.fsyncs == 1
+
+    entered, release = threading.Event(), threading.Event()
+    write = GroupCommit._write
+    def slow_write(self, data, codec):
+        entered.set()
+        release.wait(5)
+        return write(self, data, codec)
+    monkeypatch.setattr(GroupCommit, '_write', slow_write)
+
+    first = threading.Thread(target=group.commit, args=(docs[1], codec))
+    first.start()
+    assert entered.wait(5)
+    monkeypatch.setattr(group, '_window', 0.01)
+    queued = [threading.Thread(target=group.commit, args=(doc, codec)) for doc in docs[2:]]
+    for w in queued:
+        w.start()
+    while group.writes < len(docs):
+        time.sleep(0.001)
+    release.set()
+    for w in [first, *queued]:
+        w.join()
+
+    # the four writers queued behind the slow commit shared one fsync
+    assert group.writes == 6 and group.fsyncs == 3
+    assert YStorage(str(temp_path)).read() in docs[2:]
+
+def _increment(path, times):
+    db = TinyDB(path, storage=YStorage, lock=True)
+    tb = db.table('counters')
+    for _ in range(times):
+        with db.storage.exclusive():
+            doc = tb.get(doc_id=1)
+            tb.update({'n': doc['n'] + 1}, doc_ids=[1])
+
+def _create(path, times):
+    yam = Yamel(path=path, tb='memcells', lock=True)
+    for i in range(times):
+        yam.create('shared@example.com', f'Task {os.getpid()}-{i}')
+
+def test_locked_storage_has_no_lost_updates(temp_path):
+    temp_path.touch()
+    db = TinyDB(str(temp_path), storage=YStorage, lock=True)
+    db.table('counters').insert({'n': 0})
+
+    ctx = multiprocessing.get_context('fork')
+    procs = [ctx.Process(target=_increment, args=(str(temp_path), 25)) for _ in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+    assert all(p.exitcode == 0 for p in procs)
+    assert YStorage(str(temp_path)).read()['counters']['1']['n'] == 100
+    assert db.storage.generation == 101
+
+def test_yamel_workers_never_duplicate_ids(temp_path):
+    temp_path.touch()
+    ctx = multiprocessing.get_context('fork')
+    procs = [ctx.Process(target=_create, args=(str(temp_path), 2)) for _ in range(5)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+    assert all(p.exitcode == 0 for p in procs)
+    ids = [doc['id'] for doc in YStorage(str(temp_path)).read()['memcells'].values()]
+    assert sorted(ids) == list(range(1, 11))
+
+def test_stream_yields_documents_incrementally(temp_path):
+    temp_path.touch()
+    db = TinyDB(str(temp_path), storage=YStorage)
+    db.table('other').insert({'ignored': [1, 2, {'nested': True}]})
+    db.table('memcells').insert_multiple(
+        {'id': i, 'phone': '555', 'task': f'Task {i}', 'status': 'pending'} for i in range(1, 6)
+    )
+    db.close()
+
+    # fresh storage: nothing cached, parsed event by event
+    store = YStorage(str(temp_path))
+    stream = store.stream('memcells')
+    doc_id, doc = next(stream)
+    assert (doc_id, doc['task']) == ('1', 'Task 1')
+    assert [d['id'] for _, d in stream] == [2, 3, 4, 5]
+    assert list(store.stream('missing')) == []
+    assert store.stats == {'hits': 0, 'misses': 2}
+
+    # warm snapshot is served from memory
+    store.read()
+    assert len(list(store.stream('memcells'))) == 5
+    assert store.stats['hits'] == 1